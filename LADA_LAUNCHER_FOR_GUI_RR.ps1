@@ -236,6 +236,12 @@ do {
         $DetectSuffix = "D3"
     }
     
+    # Device override from the GUI (eg, per-eye parallel VR processing on cuda:0 / cuda:1)
+    if (-not [string]::IsNullOrWhiteSpace($env:LADA_DEVICE)) {
+        $DeviceChoice = $env:LADA_DEVICE
+        Write-Host "Device override from GUI: $DeviceChoice" -ForegroundColor Cyan
+    }
+
     # Prepare output paths with a numerical suffix and detection model suffix
     $FileNameWithoutExt = [System.IO.Path]::GetFileNameWithoutExtension($VideoFile)
     $FileExt = [System.IO.Path]::GetExtension($VideoFile)
@@ -346,7 +352,6 @@ do {
                     "-map", "0:a?",
                     "-map_metadata:s:a:0", "0:s:a:0",
                     "-c:a", "copy",
-                    "-bsf:a:0", "aac_adtstoasc",
                     "-map_metadata", "0",
                     "-map_metadata:s:v", "0:s:v",
                     "-fps_mode:v", "passthrough",
@@ -0,0 +1,239 @@
+"""processing_main / batch_process_main のエンドツーエンドベンチマーク
+
+lada-cli の代わりに fake_lada_launcher.py を使い、エンコーダーはCPU（libx264）に固定して
+実際のパイプライン（切り出し、VR中央抽出、復元、合成、リネーム）を実行する。
+工程ごとの所要時間、ディスク書き込み量、キューのスループット（件/時）を表示する。
+
+使い方（ディスプレイのないLinuxでは xvfb-run 経由で実行）:
+    python bench/benchmark_pipeline.py --items 3 --duration 20 --delay 2
+    python bench/benchmark_pipeline.py --input sample.mp4 --vr --mode filter --json result.json
+    python bench/benchmark_pipeline.py --tvai            # 復元→ファイル→画質向上の2段階
+    python bench/benchmark_pipeline.py --tvai --chain    # ストリーム連結（計測用、GUIには組み込まない）
+    python bench/benchmark_pipeline.py --vr --per-eye     # VR左右分割の並列処理
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from tkinterdnd2 import TkinterDnD  # noqa: E402
+import lada_gui  # noqa: E402
+
+STAGE_ORDER = ['trim', 'roi_detect', 'roi_crop', 'vr_crop', 'restore', 'overlay', 'rename']
+
+
+def generate_sample(path, duration, size):
+    """テストパターン＋正弦波音声のサンプル動画を生成する"""
+    command = [
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f'testsrc2=size={size}:rate=30:duration={duration}',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-g', '60',
+        '-c:a', 'aac', '-shortest', path
+    ]
+    subprocess.run(command, check=True)
+
+
+def create_app(work_dir, args):
+    root = TkinterDnD.Tk()
+    root.withdraw()
+    app = lada_gui.MosaicRemoverApp(root)
+    # ウィンドウ表示後の初期化（設定と保存済み状態の読み込み）を済ませてから設定を上書きする
+    root.update()
+    app.startup_loaded.wait(10)
+    app.output_dir = os.path.join(work_dir, 'output')
+    os.makedirs(app.output_dir, exist_ok=True)
+    app.log_file = os.path.join(work_dir, 'LOG_LADA_GUI.txt')
+    app.ps_script_path = os.path.join(BENCH_DIR, 'fake_lada_launcher.py')
+    app.use_cpu_encoder = True
+    # 同一入力を繰り返し処理するため結果キャッシュは無効化する
+    app.use_result_cache = False
+    app.show_completion_dialog_var.set(False)
+    app.ffmpeg_option_var.set(args.trim_option)
+    app.vr_processing_var.set(args.vr)
+    app.vr_per_eye_var.set(args.per_eye)
+    app.tvai_var.set('1' if args.tvai else '2')
+    if args.chain:
+        run_launcher = app.run_launcher
+
+        def chained_launcher(input_path, settings):
+            if settings['tvai'] == "1":
+                return run_stream_chain(app, input_path, settings, args.enhance_filter)
+            return run_launcher(input_path, settings)
+        app.run_launcher = chained_launcher
+    return root, app
+
+
+def run_stream_chain(app, input_path, settings, enhance_filter):
+    """復元と画質向上をパイプで連結して実行し、終了コードを返す（app.run_launcher の代わり）
+    
+    疑似ランチャーを--stream付きで起動して標準出力に書き出された映像（NUT形式の非圧縮映像）を
+    そのまま画質向上用ffmpegの標準入力に渡すため、2つの工程が並行して進み中間ファイルも作らない。
+    音声は入力ファイルから直接コピーする。lada-cliはファイル出力のみのため、GUIではなくここで比較のためだけに使う。
+    中断時に両方を終了できるよう、2つのプロセスは app.active_processes に登録する。
+    """
+    base, _ = os.path.splitext(input_path)
+    output_path = app.generate_unique_filepath(
+        f"{base}_lada_D{settings['model']}Q{settings['quality']}+enhance.mp4")
+    input_data = f"{input_path}\n{settings['model']}\n{settings['tvai']}\n{settings['quality']}\n"
+
+    producer = subprocess.Popen(
+        app.build_launcher_command() + ['--stream'],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    consumer_command = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+        '-f', 'nut', '-i', 'pipe:0',
+        '-i', input_path,
+        '-map', '0:v', '-map', '1:a?',
+        '-vf', app.get_video_filter('final', enhance_filter),
+        *app.get_video_encoder_args('final', settings['quality']),
+        *app.get_audio_args(input_path, '.mp4'),
+        '-shortest', output_path
+    ]
+    app.active_processes.append(producer)
+    try:
+        consumer = subprocess.Popen(consumer_command, stdin=producer.stdout, stderr=subprocess.PIPE)
+    except OSError:
+        producer.kill()
+        app.active_processes.remove(producer)
+        raise
+    app.active_processes.append(consumer)
+    try:
+        # 画質向上側が異常終了した場合に復元側が書き込みエラーで止まるよう、親プロセスのパイプは閉じる
+        producer.stdout.close()
+        try:
+            producer.stdin.write(input_data.encode('utf-8'))
+            producer.stdin.close()
+        except OSError:
+            pass  # 中断で復元側が終了済み
+        for line in iter(producer.stderr.readline, b''):
+            app.show_launcher_line(line.decode('utf-8', errors='replace'))
+        producer.stderr.close()
+        producer.wait()
+        _, consumer_errors = consumer.communicate()
+        for line in consumer_errors.decode('utf-8', errors='replace').splitlines():
+            app.show_launcher_line(line + "\n")
+    finally:
+        for process in (producer, consumer):
+            if process in app.active_processes:
+                app.active_processes.remove(process)
+
+    returncode = producer.returncode or consumer.returncode
+    if returncode != 0 and os.path.exists(output_path):
+        os.remove(output_path)
+    return returncode
+
+
+def summarize(records):
+    totals = defaultdict(float)
+    written = defaultdict(int)
+    for record in records:
+        totals[record['stage']] += record['elapsed']
+        written[record['stage']] += record.get('bytes_written', 0)
+    stages = [s for s in STAGE_ORDER if s in totals] + sorted(set(totals) - set(STAGE_ORDER))
+    return {stage: {'seconds': totals[stage], 'bytes_written': written[stage]} for stage in stages}
+
+
+def print_report(title, summary, wall_time, items):
+    print(f"\n== {title} ==")
+    print(f"{'stage':<15}{'seconds':>10}{'MB written':>14}")
+    for stage, values in summary.items():
+        print(f"{stage:<15}{values['seconds']:>10.2f}{values['bytes_written'] / 1e6:>14.1f}")
+    total_bytes = sum(v['bytes_written'] for v in summary.values())
+    print(f"{'wall time':<15}{wall_time:>10.2f}{total_bytes / 1e6:>14.1f}")
+    if items and wall_time > 0:
+        print(f"throughput: {items / wall_time * 3600:.1f} items/hour")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', help='入力動画（省略時はテストパターンを生成）')
+    parser.add_argument('--duration', type=float, default=10.0, help='生成するサンプルの長さ（秒）')
+    parser.add_argument('--size', default='1920x1080', help='生成するサンプルの解像度')
+    parser.add_argument('--items', type=int, default=3, help='一括処理に登録するジョブ数')
+    parser.add_argument('--delay', type=float, default=1.0, help='疑似lada-cliの遅延（秒）')
+    parser.add_argument('--mode', choices=['copy', 'filter'], default='copy', help='疑似lada-cliの処理方法')
+    parser.add_argument('--trim-option', choices=['auto', 'copy', 'copy_genpts', 're_encode'], default='re_encode')
+    parser.add_argument('--vr', action='store_true', help='VR処理モードで実行')
+    parser.add_argument('--per-eye', action='store_true', help='VRの左右を分けて並列処理（--vrと併用）')
+    parser.add_argument('--tvai', action='store_true', help='TVAIの代わりに画質向上フィルターを掛ける')
+    parser.add_argument('--chain', action='store_true', help='復元と画質向上をパイプで連結して実行（--tvaiと併用、計測用）')
+    parser.add_argument('--enhance-filter', default='scale=iw*2:ih*2:flags=bicubic',
+                        help='tvai_upの代わりに使うffmpegフィルター')
+    parser.add_argument('--skip-single', action='store_true', help='単一処理の計測を省略')
+    parser.add_argument('--json', help='結果をJSONで保存するパス')
+    args = parser.parse_args()
+
+    os.environ['FAKE_LADA_DELAY'] = str(args.delay)
+    os.environ['FAKE_LADA_MODE'] = args.mode
+    os.environ['FAKE_ENHANCE_FILTER'] = args.enhance_filter
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    work_dir = tempfile.mkdtemp(prefix='lada_bench_')
+    input_file = os.path.abspath(args.input) if args.input else os.path.join(work_dir, 'sample.mp4')
+    # キューファイル等はカレントディレクトリに作られるため作業ディレクトリへ移動する
+    os.chdir(work_dir)
+    if not args.input:
+        generate_sample(input_file, args.duration, args.size)
+
+    root, app = create_app(work_dir, args)
+    probe = lada_gui.cv2.VideoCapture(input_file)
+    fps = probe.get(lada_gui.cv2.CAP_PROP_FPS) or 30.0
+    total_frames = int(probe.get(lada_gui.cv2.CAP_PROP_FRAME_COUNT))
+    probe.release()
+    duration = total_frames / fps
+
+    results = {'input': input_file, 'duration': duration, 'vr': args.vr, 'mode': args.mode,
+               'delay': args.delay, 'trim_option': args.trim_option, 'tvai': args.tvai, 'chain': args.chain,
+               'per_eye': args.per_eye}
+
+    if not args.skip_single:
+        app.stage_timings = []
+        started = time.perf_counter()
+        app.is_running = True
+        app.processing_main(input_file, 0, duration)
+        wall_time = time.perf_counter() - started
+        summary = summarize(app.stage_timings)
+        print_report('processing_main', summary, wall_time, 1)
+        results['single'] = {'wall_time': wall_time, 'stages': summary}
+
+    app.stage_timings = []
+    app.processing_queue = [{
+        'video_path': input_file,
+        'model': '1', 'tvai': '1' if args.tvai else '2', 'quality': 15,
+        'start_frame': 0, 'end_frame': total_frames,
+        'ffmpeg_option': args.trim_option, 'save_trimmed': False,
+        'timestamp': '', 'fps': fps, 'crf_value': 19,
+        'vr_processing': args.vr, 'vr_simple_mode': True,
+        'vr_per_eye': args.per_eye
+    } for _ in range(args.items)]
+    app.is_batch_processing = True
+    app.is_running = True
+    started = time.perf_counter()
+    app.batch_process_main()
+    wall_time = time.perf_counter() - started
+    summary = summarize(app.stage_timings)
+    print_report(f'batch_process_main ({args.items} items)', summary, wall_time, args.items)
+    results['batch'] = {'wall_time': wall_time, 'items': args.items,
+                        'items_per_hour': args.items / wall_time * 3600 if wall_time > 0 else 0,
+                        'stages': summary}
+
+    print(f"\nwork dir: {work_dir}")
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""processing_main の回帰チェック
+
+benchmark_pipeline.py と同じく lada-cli の代わりに fake_lada_launcher.py を使い、エンコーダーはCPU（libx264）に固定して
+実際のパイプラインを実行し、出力ファイルを確認する。TVAIの代わりには FAKE_ENHANCE_FILTER（既定は2倍拡大）を掛ける。
+
+使い方（ディスプレイのないLinuxでは xvfb-run 経由で実行）:
+    python bench/check_pipeline.py             # すべてのチェック
+    python bench/check_pipeline.py roi_tvai    # 指定したチェックのみ
+失敗したチェックがあれば終了コード1で終了する。
+"""
+import argparse
+import glob
+import os
+import subprocess
+import sys
+import tempfile
+import traceback
+from types import SimpleNamespace
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import benchmark_pipeline  # noqa: E402
+from benchmark_pipeline import lada_gui  # noqa: E402
+
+cv2 = lada_gui.cv2
+ENHANCE_FILTER = 'scale=iw*2:ih*2:flags=bicubic'
+
+
+def generate_mosaic_sample(path, duration, size='1280x720'):
+    """テストパターンの一部（中央右寄り 320x240）を16画素のブロックでモザイク化したサンプル動画を生成する"""
+    mosaic = ('[0:v]split[bg][fg];[fg]crop=320:240:720:240,scale=20:15:flags=neighbor,'
+              'scale=320:240:flags=neighbor[m];[bg][m]overlay=720:240[v]')
+    command = [
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f'testsrc2=size={size}:rate=30:duration={duration}',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+        '-filter_complex', mosaic, '-map', '[v]', '-map', '1:a',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '10', '-g', '60',
+        '-c:a', 'aac', '-shortest', path
+    ]
+    subprocess.run(command, check=True)
+
+
+def video_info(path):
+    cap = cv2.VideoCapture(path)
+    info = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            cap.get(cv2.CAP_PROP_FPS) or 30.0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+    cap.release()
+    return info
+
+
+def make_app(work_dir, tvai=False):
+    args = SimpleNamespace(trim_option='re_encode', vr=False, per_eye=False, tvai=tvai, chain=False,
+                           enhance_filter=os.environ['FAKE_ENHANCE_FILTER'])
+    return benchmark_pipeline.create_app(work_dir, args)
+
+
+def outputs(app):
+    return sorted(glob.glob(os.path.join(app.output_dir, '*_unmosaiced*.mp4')))
+
+
+def check_roi_tvai(work_dir):
+    """モザイク領域のみ処理とTVAI（2倍拡大）を併用しても、出力は全体を2倍にした映像になる"""
+    input_file = os.path.join(work_dir, 'mosaic.mp4')
+    generate_mosaic_sample(input_file, 3)
+    width, height, _, total_frames = video_info(input_file)
+    root, app = make_app(work_dir, tvai=True)
+    try:
+        app.roi_crop_var.set(True)
+        app.is_running = True
+        app.processing_main(input_file, 0, total_frames / 30.0)
+        results = outputs(app)
+        assert len(results) == 1, f"出力ファイルが1つではありません: {results}"
+        out_width, out_height, _, _ = video_info(results[0])
+        assert (out_width, out_height) == (width * 2, height * 2), \
+            f"出力解像度 {out_width}x{out_height} が全体の2倍 {width * 2}x{height * 2} ではありません"
+        leftovers = [f for f in os.listdir(app.output_dir) if '_roi' in f]
+        assert not leftovers, f"ROIの中間ファイルが残っています: {leftovers}"
+    finally:
+        root.destroy()
+
+
+def check_vr_coverage(work_dir):
+    """VRの既定の処理範囲が各目の中央70%を覆い、投影変換のビューが検出したモザイク領域をすべて覆う"""
+    np = lada_gui.np
+    root, app = make_app(work_dir)
+    try:
+        width, height = 1600, 800
+        eye_width = width // 2
+        for projection in ('hequirect', 'fisheye'):
+            # モザイク領域がなければ中央切り出し（従来の中央70%）で処理する
+            assert app.vr_views(width, height, None, projection) is None, f"{projection}: 既定が中央切り出しではありません"
+            for eye, (x, y, w, h) in app.vr_eye_regions(width, height):
+                assert w * h >= 0.69 * eye_width * height, f"{eye}: 中央切り出しの面積 {w}x{h} が70%未満です"
+            
+            for roi in ((900, 300, 200, 150), (100, 100, 150, 120), (600, 200, 400, 300)):
+                views = app.vr_views(width, height, roi, projection)
+                assert views, f"{projection} {roi}: ビューがありません"
+                for view in views:
+                    maps = lada_gui.vr_view_maps(eye_width, height, view)
+                    rect_x, rect_y, rect_w, rect_h = maps['rect']
+                    # モザイク領域のうちこの目に含まれる部分（魚眼は円の外に映像がないので除く）
+                    x0 = max(roi[0], view['offset']) - view['offset']
+                    x1 = min(roi[0] + roi[2], view['offset'] + eye_width) - view['offset']
+                    ys, xs = np.mgrid[roi[1]:roi[1] + roi[3], x0:x1]
+                    inside = ~np.isnan(lada_gui.vr_source_to_ray(xs, ys, eye_width, height, projection)[2])
+                    covered = np.zeros(xs.shape, dtype=bool)
+                    in_rect = (xs >= rect_x) & (xs < rect_x + rect_w) & (ys >= rect_y) & (ys < rect_y + rect_h)
+                    covered[in_rect] = maps['weight'][ys[in_rect] - rect_y, xs[in_rect] - rect_x] >= 1
+                    missing = int((inside & ~covered).sum())
+                    assert missing == 0, f"{projection} {roi} {view['eye']}: {missing}画素がビューに含まれません"
+    finally:
+        root.destroy()
+
+
+def check_result_cache_hit(work_dir):
+    """同じ範囲・設定を2回処理すると、2回目は結果キャッシュから通常と同じ名前の出力ファイルが作られる"""
+    input_file = os.path.join(work_dir, 'mosaic.mp4')
+    generate_mosaic_sample(input_file, 2)
+    _, _, _, total_frames = video_info(input_file)
+    root, app = make_app(work_dir)
+    try:
+        app.use_result_cache = True
+        for _ in range(2):
+            app.is_running = True
+            app.processing_main(input_file, 0, total_frames / 30.0)
+        statuses = [record['status'] for record in app.metrics_history]
+        assert statuses == ['success', 'cached'], f"2回目が結果キャッシュを使っていません: {statuses}"
+        assert not any(record['stage'] == 'restore' for record in app.stage_timings
+                       if record['job'] == app.metrics_history[-1]['job']), "2回目にLADAを実行しています"
+        results = outputs(app)
+        assert len(results) == 2, f"出力ファイルが2つではありません: {results}"
+        first, second = results
+        assert os.path.getsize(first) == os.path.getsize(second), "再利用した出力のサイズが元の出力と異なります"
+        assert os.path.basename(second).startswith(os.path.splitext(os.path.basename(first))[0]), \
+            f"再利用した出力の名前が通常の名前と異なります: {os.path.basename(second)}"
+    finally:
+        root.destroy()
+
+
+CHECKS = {
+    'roi_tvai': check_roi_tvai,
+    'vr_coverage': check_vr_coverage,
+    'result_cache_hit': check_result_cache_hit,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('checks', nargs='*', help=f"実行するチェック（{', '.join(CHECKS)}。省略時はすべて）")
+    args = parser.parse_args()
+    unknown = [name for name in args.checks if name not in CHECKS]
+    if unknown:
+        parser.error(f"不明なチェック: {', '.join(unknown)}")
+
+    os.environ.setdefault('FAKE_LADA_DELAY', '0')
+    os.environ.setdefault('FAKE_LADA_MODE', 'copy')
+    os.environ.setdefault('FAKE_ENHANCE_FILTER', ENHANCE_FILTER)
+
+    failed = []
+    for name in args.checks or list(CHECKS):
+        work_dir = tempfile.mkdtemp(prefix=f'lada_check_{name}_')
+        # キューファイル等はカレントディレクトリに作られるため作業ディレクトリへ移動する
+        os.chdir(work_dir)
+        try:
+            CHECKS[name](work_dir)
+            print(f"OK    {name}")
+        except Exception:
+            failed.append(name)
+            print(f"FAIL  {name}")
+            traceback.print_exc()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
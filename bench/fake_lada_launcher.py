@@ -0,0 +1,112 @@
+"""LADA_LAUNCHER_FOR_GUI.ps1 の代替（ベンチマーク用）
+
+GUIと同じく標準入力から「入力ファイル/検出モデル/TVAI/品質」の4行を受け取り、
+lada-cli の代わりに ffmpeg で動画をコピーまたはフィルタ処理して
+ps1と同じ命名規則（<名前>_lada_D<モデル>Q<品質><拡張子>）で出力する。
+
+TVAIに1が指定された場合はps1と同じく復元結果を一旦ファイルに書き出し、
+FAKE_ENHANCE_FILTER のffmpegフィルターを tvai_up の代わりに掛けて再エンコードする。
+
+--stream を付けると出力ファイルを作らず、復元結果をNUT形式の非圧縮映像として標準出力に書き出す
+（GUIのストリーム連結モード用。ログと進捗は標準エラーに出力する）。
+
+環境変数:
+    FAKE_LADA_DELAY      処理時間に加算する遅延秒数（既定: 0）
+    FAKE_LADA_MODE       copy（ストリームコピー）または filter（CPUで再エンコード）（既定: copy）
+    FAKE_ENHANCE_FILTER  TVAIの代わりに掛けるフィルター（既定: scale=iw*2:ih*2:flags=bicubic）
+"""
+import os
+import subprocess
+import sys
+import time
+
+
+DEFAULT_ENHANCE_FILTER = 'scale=iw*2:ih*2:flags=bicubic'
+
+
+def report_progress(delay, log):
+    # 遅延中はlada-cliと同形式の進捗行を出力する
+    steps = 10
+    for i in range(1, steps + 1):
+        time.sleep(delay / steps)
+        print(f"Processing frames: {i * 10}%| {i}/{steps}", file=log, flush=True)
+
+
+def stream(video_file, mode, delay):
+    """復元結果を標準出力にNUT形式（rawvideo）で書き出す"""
+    print("Running LADA restoration (stream)...", file=sys.stderr, flush=True)
+    report_progress(delay, sys.stderr)
+    video_filter = ['-vf', 'boxblur=2:1'] if mode == 'filter' else []
+    command = ['ffmpeg', '-loglevel', 'error', '-i', video_file, *video_filter,
+               '-an', '-c:v', 'rawvideo', '-f', 'nut', 'pipe:1']
+    result = subprocess.run(command)
+    if result.returncode == 0:
+        print("LADA restoration completed successfully!", file=sys.stderr, flush=True)
+    else:
+        print("LADA restoration failed!", file=sys.stderr, flush=True)
+    return result.returncode
+
+
+def enhance(input_file, output_file, quality):
+    """tvai_upの代わりにFAKE_ENHANCE_FILTERを掛けて再エンコードする"""
+    enhance_filter = os.environ.get('FAKE_ENHANCE_FILTER', DEFAULT_ENHANCE_FILTER)
+    print(f"Running TVAI enhancement ({enhance_filter})...", flush=True)
+    command = ['ffmpeg', '-y', '-loglevel', 'error', '-i', input_file,
+               '-vf', enhance_filter, '-c:v', 'libx264', '-preset', 'veryfast', '-crf', quality,
+               '-map', '0:v', '-map', '0:a?', '-c:a', 'copy', output_file]
+    return subprocess.run(command).returncode
+
+
+def main():
+    lines = [sys.stdin.readline().strip() for _ in range(4)]
+    video_file, detect_choice, tvai_choice, quality = lines
+    if not os.path.isfile(video_file):
+        print(f"ERROR: Invalid file name or file not found! {video_file}", file=sys.stderr)
+        return 1
+
+    delay = float(os.environ.get('FAKE_LADA_DELAY', '0'))
+    mode = os.environ.get('FAKE_LADA_MODE', 'copy')
+    if '--stream' in sys.argv[1:]:
+        return stream(video_file, mode, delay)
+
+    base, ext = os.path.splitext(video_file)
+    base_output = f"{base}_lada_D{detect_choice}Q{quality}"
+    output_file = f"{base_output}{ext}"
+    suffix = 0
+    while os.path.exists(output_file):
+        suffix += 1
+        output_file = f"{base_output}_{suffix}{ext}"
+
+    print("Running LADA restoration...", flush=True)
+    print(f"Input: {video_file}", flush=True)
+    print(f"Output: {output_file}", flush=True)
+
+    report_progress(delay, sys.stdout)
+
+    if mode == 'filter':
+        command = ['ffmpeg', '-y', '-loglevel', 'error', '-i', video_file,
+                   '-vf', 'boxblur=2:1', '-c:v', 'libx264', '-preset', 'veryfast', '-crf', quality,
+                   '-c:a', 'copy', output_file]
+    else:
+        command = ['ffmpeg', '-y', '-loglevel', 'error', '-i', video_file, '-c', 'copy', output_file]
+
+    result = subprocess.run(command)
+    if result.returncode != 0:
+        print("LADA restoration failed!", flush=True)
+        return result.returncode
+    print("LADA restoration completed successfully!", flush=True)
+
+    if tvai_choice == '1':
+        enhanced_file = f"{base_output}+enhance{ext}"
+        returncode = enhance(output_file, enhanced_file, quality)
+        # GUIが出力を一意に見つけられるよう、TVAI前の中間ファイルは削除する
+        os.remove(output_file)
+        if returncode != 0:
+            print("TVAI enhancement failed!", flush=True)
+            return returncode
+        print("TVAI enhancement completed successfully!", flush=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,23 +1,1704 @@
+import time
+MODULE_LOAD_STARTED = time.perf_counter()
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, Checkbutton
 import subprocess
 import os
-import cv2
-from PIL import Image, ImageTk
+import sys
+import importlib
 import threading
 import shutil
 import uuid
-import time
 import json
+import hashlib
 from datetime import datetime
 from tkinterdnd2 import DND_FILES, TkinterDnD
 import re
-import numpy as np
+import bisect
 from queue import Queue
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# --profile-startup で表示する起動処理の所要時間 (項目, 秒)
+STARTUP_TIMINGS = []
+
+
+@contextmanager
+def startup_phase(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS.append((name, time.perf_counter() - started))
+
+
+class LazyModule:
+    """最初に属性を参照したときにimportするモジュールの代理
+    
+    OpenCV・NumPy・Pillowの読み込みには時間がかかるため、起動時ではなく最初の動画読み込み時にimportする。
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    with startup_phase(f"import {self._name}（初回使用時）"):
+                        self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+cv2 = LazyModule('cv2')
+np = LazyModule('numpy')
+Image = LazyModule('PIL.Image')
+ImageTk = LazyModule('PIL.ImageTk')
+
+# Windows以外ではCREATE_NO_WINDOWが存在しないため0で代用する
+CREATE_NO_WINDOW = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+
+# 処理時間推定モデルの初期値（動画1秒・1080p換算あたりの処理秒数）。実績で随時補正する
+DEFAULT_THROUGHPUT_RATES = {'2d': 1.5, 'vr': 1.2, '2d_tvai': 4.0, 'vr_tvai': 3.5}
+REFERENCE_MEGAPIXELS = 1920 * 1080 / 1e6
+
+# キューのスケジューリング方針（設定値: 表示名）と優先度クラス
+SCHEDULE_POLICIES = {
+    'fifo': '登録順 (FIFO)',
+    'sjf': '推定時間の短い順',
+    'priority': '優先度順',
+    'fair': 'フォルダ均等'
+}
+PRIORITY_LABELS = {0: '高', 1: '通常', 2: '低'}
+
+# 映像エンコーダー候補（起動時に実際にテストエンコードして使えるものを調べる）
+# role: intermediate=LADAに渡す中間ファイル（VR中央抽出）, final=切り出し・合成の出力
+# intermediateは使えるもののうち最速を選ぶ。finalは出力をH.264に固定し、従来のh264_nvenc（p4）と同等以上の画質の
+# プリセットだけを並べた順（優先順）に選ぶ（速度では選ばない。品質値はいずれもH.264の量子化値と同じ尺度）
+# {cq}は品質値に置き換える。extは必要なコンテナ（省略時はMP4）
+ENCODER_CANDIDATES = [
+    {'name': 'h264_nvenc', 'codec': 'h264_nvenc', 'args': ['-preset', 'p4', '-cq', '{cq}'],
+     'roles': ('intermediate', 'final')},
+    {'name': 'h264_qsv', 'codec': 'h264_qsv', 'args': ['-preset', 'veryfast', '-global_quality', '{cq}'],
+     'roles': ('intermediate',)},
+    {'name': 'h264_qsv_medium', 'codec': 'h264_qsv', 'args': ['-preset', 'medium', '-global_quality', '{cq}'],
+     'roles': ('final',)},
+    {'name': 'h264_amf', 'codec': 'h264_amf', 'args': ['-quality', 'speed', '-rc', 'cqp', '-qp_i', '{cq}', '-qp_p', '{cq}'],
+     'roles': ('intermediate',)},
+    {'name': 'h264_amf_balanced', 'codec': 'h264_amf',
+     'args': ['-quality', 'balanced', '-rc', 'cqp', '-qp_i', '{cq}', '-qp_p', '{cq}'], 'roles': ('final',)},
+    {'name': 'h264_vaapi', 'codec': 'h264_vaapi', 'args': ['-vaapi_device', '/dev/dri/renderD128', '-qp', '{cq}'],
+     'filter': 'format=nv12,hwupload', 'roles': ('intermediate', 'final')},
+    {'name': 'libx264_ultrafast', 'codec': 'libx264', 'args': ['-preset', 'ultrafast', '-crf', '{cq}'],
+     'roles': ('intermediate',)},
+    {'name': 'libx264_veryfast', 'codec': 'libx264', 'args': ['-preset', 'veryfast', '-crf', '{cq}'],
+     'roles': ('intermediate',)},
+    {'name': 'libx264_medium', 'codec': 'libx264', 'args': ['-preset', 'medium', '-crf', '{cq}'],
+     'roles': ('final',)},
+    {'name': 'ffv1', 'codec': 'ffv1', 'args': ['-level', '3', '-slices', '16', '-g', '1'],
+     'ext': '.mkv', 'roles': ('intermediate',)},
+    {'name': 'utvideo', 'codec': 'utvideo', 'args': [], 'ext': '.mkv', 'roles': ('intermediate',)},
+]
+# ハードウェアエンコーダーが使えない場合の役割ごとの既定（CPU）
+FALLBACK_ENCODERS = {'intermediate': 'libx264_veryfast', 'final': 'libx264_medium'}
+# 起動直後でエンコーダーの検出が終わっていない場合に待つ秒数（超えたら検出完了まで既定のエンコーダーを使う）
+ENCODER_WAIT_TIMEOUT = 30
+
+# モザイク領域検出（縮小したサンプルフレームをタイル単位で判定する）
+MOSAIC_ANALYSIS_WIDTH = 960   # 解析時の横幅（最近傍縮小でブロック境界の段差を保つ）
+MOSAIC_TILE = 16              # 判定タイルの大きさ（解析画像の画素）
+MOSAIC_SAMPLE_SECONDS = 2.0   # 範囲内からこの秒数ごとにフレームを取り出す（動くモザイクを取りこぼさない間隔）
+MOSAIC_MIN_SAMPLES = 24       # 短い範囲でも最低限取り出すフレーム数
+MOSAIC_MAX_SAMPLES = 1800     # 長い範囲で取り出すフレーム数の上限（1時間で2秒ごと）
+MOSAIC_MAX_AREA = 0.7         # 検出領域がこれより広い場合は切り出さずに全体を処理する
+
+# VR映像の投影変換（各目の映像から透視投影のビューを切り出してLADAで処理し、元の投影に戻して合成する）
+VR_PROJECTIONS = {
+    'hequirect': '正距円筒(180度)',
+    'fisheye': '魚眼(180度)',
+    'crop': '中央切り出し'
+}
+VR_MAX_VIEW_FOV = 120     # 必要な視野角がこれを超える場合は中央切り出しで処理する
+VR_VIEW_MARGIN = 1.1      # モザイク領域を覆う視野角に加える余裕
+VR_BLEND_FEATHER = 24     # ビューの縁を元映像となだらかに合成する幅（ビューの画素）
+VR_MAP_CACHE_LIMIT = 4    # メモリに保持する変換マップの数
+
+# プレビュー再生のリングバッファ（スロット数は解像度とメモリ予算から決める）
+PREVIEW_BUFFER_MB = 256
+PREVIEW_BUFFER_MIN_SLOTS = 2
+PREVIEW_BUFFER_MAX_SLOTS = 8
+# シーク用デコーダーの直近フレームキャッシュとホバープレビュー（縮小）の設定
+SCRUB_CACHE_MB = 128
+SCRUB_CACHE_MAX_FRAMES = 16
+HOVER_PREVIEW_WIDTH = 320
+# 一時停止中の前後先読み（画面幅に縮小して保持する）
+PREFETCH_CACHE_MB = 512
+PREFETCH_MAX_FRAMES = 300
+# プレビューの表示範囲（VR動画は片目または指定範囲だけを切り取ってから縮小する。動画ごとに preview_settings.json に保存）
+PREVIEW_VIEWS = {'full': '全体', 'left': '左目', 'right': '右目', 'viewport': '指定範囲'}
+PREVIEW_SETTINGS_LIMIT = 500
+# 早送り・巻き戻しの速度（[ ]キーで切り替え）。SKIM_GRAB_MAX_SPEED以下の早送りは全フレームをデコードして間引き、
+# それより速い場合と巻き戻しはキーフレームだけをデコードする
+SKIM_SPEEDS = [-32, -16, -8, -4, -2, 1, 2, 4, 8, 16, 32]
+SKIM_GRAB_MAX_SPEED = 4
+KEYFRAME_PROBE_TIMEOUT = 60   # キーフレーム一覧の取得を諦める秒数（取得できなければ1秒間隔の位置で代用する）
+
+# シーンチェンジ検出（ffmpegで縮小したグレースケール映像を読み、前フレームとの差分で判定する）
+SCENE_ANALYSIS_SIZE = (64, 36)
+SCENE_CHUNK_FRAMES = 240      # まとめて差分を計算するフレーム数（この単位で進捗バーに反映する）
+SCENE_MIN_DIFF = 12.0         # 画素あたりの平均差分（0-255）がこれ未満ならカットとみなさない
+SCENE_RATIO = 3.0             # 直前SCENE_WINDOWフレームの平均差分の何倍でカットとみなすか
+SCENE_WINDOW = 15
+SCENE_MIN_GAP_SECONDS = 0.5   # これより短い間隔のカットは最初の1つだけ採用する
+SCENE_CACHE_LIMIT = 500
+
+# 切り出し方法の自動判定（ffprobeのパケットのタイムスタンプから判定し、ファイルごとにキャッシュ）
+TRIM_PROBE_SECONDS = 20        # 先頭・中央・末尾からこの秒数ずつパケットを調べる
+TRIM_MAX_KEYFRAME_GAP = 5.0    # キーフレーム間隔がこれより長いとストリームコピーでは開始位置がずれすぎる
+TRIM_VFR_TOLERANCE = 0.02      # パケット間隔の平均からのずれがこの割合を超えたら可変フレームレートとみなす
+TRIM_HEALTH_CACHE_LIMIT = 500
+TRIM_PROBE_TIMEOUT = 60        # ffprobeの1回の実行を打ち切る秒数（超えたら判定不能として再エンコードにする）
+
+# 一括処理中、次に処理する項目のソース（ネットワーク上の動画）の切り出しに必要な部分をローカルへ先にコピーする
+STAGING_AHEAD = 2               # 先にコピーしておく項目数
+STAGING_BUDGET_GB = 20          # ステージング領域の合計サイズの上限
+STAGING_BANDWIDTH_MBPS = 50     # コピーの帯域上限（MB/秒、0で無制限）
+STAGING_CHUNK = 4 * 1024 * 1024
+STAGING_PADDING = 8 * 1024 * 1024  # 切り出し範囲の前後に余分にコピーするバイト数
+STAGING_MP4_EXTENSIONS = ('.mp4', '.mov', '.m4v')
+STAGING_PROBE_TIMEOUT = 60      # パケット位置を調べるffprobeを打ち切る秒数（ネットワーク上の巨大なファイル対策）
+NETWORK_FILESYSTEMS = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'sshfs', 'fuse.sshfs', '9p', 'davfs', 'fuse.rclone'}
+
+# キューに登録できる動画の拡張子
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.ts', '.wmv', '.flv')
+
+# 監視フォルダ（新しい動画を自動でキューに登録する）
+HOTFOLDER_POLL_SECONDS = 5      # 走査間隔
+HOTFOLDER_STABLE_SECONDS = 10   # サイズと更新時刻がこの秒数変わらなければ書き込み完了とみなす
+HOTFOLDER_PROBE_WORKERS = 2     # メタデータ取得の並列数
+
+# プレビュー用プロキシ（巨大な動画を縮小・短いGOPで変換してプレビューに使う）
+PROXY_MAX_WIDTH = 1920    # これより横幅の大きい動画はこの幅に縮小したプロキシを作る
+PROXY_GOP = 12            # キーフレーム間隔（シーク時にデコードし直すフレーム数の上限）
+PROXY_CACHE_MB = 8192     # プロキシの合計サイズの上限（超えたら最後に使ったのが古いものから削除）
+BELOW_NORMAL_PRIORITY_CLASS = getattr(subprocess, 'BELOW_NORMAL_PRIORITY_CLASS', 0)
+
+# クイック確認（カーソル付近の短い区間だけを復元して処理前と並べて表示する）
+QUICKLOOK_SECONDS = 3
+QUICKLOOK_REDUCED_HEIGHT = 540   # 縮小する場合の高さ
+QUICKLOOK_CACHE_LIMIT = 30       # キャッシュに残す結果の数（古いものから削除）
+QUICKLOOK_DISPLAY_WIDTH = 1280
+
+# キュー確認画面（見えている行だけを描画する）
+QUEUE_ROW_HEIGHT = 18
+QUEUE_REDRAW_MS = 500   # 実行中の項目の進捗表示を描き直す間隔
+
+# MP4/MOVにストリームコピーできる音声コーデック（それ以外はAACに変換する）
+MP4_AUDIO_COPY_CODECS = {'aac', 'mp3', 'ac3', 'eac3', 'opus', 'alac'}
+
+
+def hw_accel_name(accel):
+    """OpenCVのVIDEO_ACCELERATION_*の値を名前（D3D11、VAAPI等）に変換する"""
+    for name in dir(cv2):
+        if name.startswith('VIDEO_ACCELERATION_') and getattr(cv2, name) == accel:
+            return name[len('VIDEO_ACCELERATION_'):]
+    return str(accel)
+
+
+def open_video_capture(file_path, hw_accel=True, threads=0):
+    """プレビュー用のVideoCaptureを開く（ハードウェアデコードを試し、使えなければソフトウェアに戻す）
+
+    戻り値は (VideoCapture, 使用中のデコード方式の表示名)。threads=0はCPUコア数（最大16）。
+    開けなかった場合もVideoCaptureを返すので呼び出し側でisOpened()を確認すること。
+    """
+    threads = threads or min(os.cpu_count() or 1, 16)
+    hw_prop = getattr(cv2, 'CAP_PROP_HW_ACCELERATION', None)
+    thread_prop = getattr(cv2, 'CAP_PROP_N_THREADS', None)
+    params = [thread_prop, threads] if thread_prop is not None else []
+    
+    # OpenCV 4.5.2未満はパラメータ付きのコンストラクターがないため通常の方法で開く
+    try:
+        if hw_accel and hw_prop is not None:
+            cap = cv2.VideoCapture(file_path, cv2.CAP_FFMPEG, [hw_prop, cv2.VIDEO_ACCELERATION_ANY, *params])
+            if cap.isOpened():
+                accel = int(cap.get(hw_prop))
+                # 初期化に成功しても最初のデコードで失敗する環境があるため1フレーム読んで確認する
+                if accel != cv2.VIDEO_ACCELERATION_NONE and cap.read()[0]:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    return cap, f"HW ({hw_accel_name(accel)})"
+            cap.release()
+        if params:
+            cap = cv2.VideoCapture(file_path, cv2.CAP_FFMPEG, params)
+            if cap.isOpened():
+                return cap, f"ソフトウェア ({threads}スレッド)"
+            cap.release()
+    except (TypeError, cv2.error):
+        pass
+    return cv2.VideoCapture(file_path), "ソフトウェア"
+
+
+def preview_view_box(view):
+    """プレビューの表示範囲を動画に対する比率 (x, y, w, h) で返す（プロキシでも同じ範囲になる）"""
+    mode = view.get('mode') if view else None
+    if mode == 'left':
+        return (0.0, 0.0, 0.5, 1.0)
+    if mode == 'right':
+        return (0.5, 0.0, 0.5, 1.0)
+    if mode == 'viewport' and view.get('viewport'):
+        return tuple(view['viewport'])
+    return (0.0, 0.0, 1.0, 1.0)
+
+
+def preview_crop_rect(view, width, height):
+    """表示範囲を画素の矩形 (x, y, w, h) に変換する（全体表示はNone）"""
+    box = preview_view_box(view)
+    if box == (0.0, 0.0, 1.0, 1.0):
+        return None
+    x = min(width - 2, max(0, int(box[0] * width)))
+    y = min(height - 2, max(0, int(box[1] * height)))
+    w = max(2, min(width - x, int(round(box[2] * width))))
+    h = max(2, min(height - y, int(round(box[3] * height))))
+    return (x, y, w, h)
+
+
+class FrameRingBuffer:
+    """プレビュー再生用のフレームリングバッファ
+    
+    デコードスレッドは事前確保したスロットに直接デコードし（cap.read(image=...)）、
+    フレーム番号とシーク世代を付けてUIスレッドに渡す。受け渡しはdeque（append/popleftはスレッドセーフ）で行い、ロックは使わない。
+    シーク時は世代を進めるだけで、古い世代のフレームは受け取り時に捨ててスロットを再利用する。
+    """
+    def __init__(self, width, height, budget_mb=PREVIEW_BUFFER_MB):
+        frame_bytes = max(1, width * height * 3)
+        self.depth = max(PREVIEW_BUFFER_MIN_SLOTS, min(PREVIEW_BUFFER_MAX_SLOTS, budget_mb * 1024 * 1024 // frame_bytes))
+        self.slots = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(self.depth)]
+        self.free = deque(range(self.depth))
+        self.ready = deque()
+        self.generation = 0
+
+    def acquire(self):
+        """空きスロット番号を返す。すべて表示待ちならNone"""
+        try:
+            return self.free.popleft()
+        except IndexError:
+            return None
+
+    def publish(self, slot, frame_index, generation):
+        self.ready.append((slot, frame_index, generation))
+
+    def release(self, slot):
+        self.free.append(slot)
+
+    def take(self):
+        """現在の世代の次のフレーム (スロット番号, フレーム番号) を返す。なければNone"""
+        while True:
+            try:
+                slot, frame_index, generation = self.ready.popleft()
+            except IndexError:
+                return None
+            if generation == self.generation:
+                return slot, frame_index
+            self.free.append(slot)
+
+    def invalidate(self):
+        """シーク時に呼ぶ。表示待ちのフレームを捨て、デコードスレッドに位置の読み直しを促す"""
+        self.generation += 1
+        while True:
+            try:
+                slot, _, _ = self.ready.popleft()
+            except IndexError:
+                break
+            self.free.append(slot)
+
+
+class PreviewDecoder:
+    """VideoCaptureを1つ持ち、専用のロック・読み出し位置・直近フレームのキャッシュを管理する
+    
+    position は次のread()で得られるフレーム番号。要求位置と一致すればシークせずに読む。
+    crop (x, y, w, h) を設定すると、read_at() は縮小の前にその範囲だけを切り取って返す（プレビューの表示範囲）。
+    """
+    def __init__(self, file_path, hw_accel=True, threads=0, cache_frames=0, width=None):
+        self.cap, self.name = open_video_capture(file_path, hw_accel, threads)
+        self.lock = threading.Lock()
+        self.position = 0
+        self.generation = None  # 再生用: 最後にデコードしたリングバッファの世代
+        self.width = width      # 指定時は縮小してから返す（ホバープレビュー用）
+        self.crop = None
+        self.cache_frames = cache_frames
+        self.cache = OrderedDict()
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def seek(self, index):
+        if index != self.position:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            self.position = index
+
+    def read_next(self, image=None):
+        """現在位置のフレームを読む (ret, frame, フレーム番号)。呼び出し側でlockを取ること"""
+        index = self.position
+        if self.cap is None:
+            return False, None, index
+        ret, frame = self.cap.read(image=image) if image is not None else self.cap.read()
+        if ret:
+            self.position += 1
+        else:
+            self.position = -1  # 位置不明。次の要求で必ずシークする
+        return ret, frame, index
+
+    def read_at(self, index):
+        """指定フレームを返す (ret, frame)。キャッシュにあればデコードしない"""
+        frame = self.cache.get(index)
+        if frame is not None:
+            self.cache.move_to_end(index)
+            return True, frame
+        with self.lock:
+            self.seek(index)
+            ret, frame, _ = self.read_next()
+        if not ret:
+            return False, None
+        if self.crop:
+            x, y, w, h = self.crop
+            frame = frame[y:y + h, x:x + w]
+        if self.width and frame.shape[1] > self.width:
+            height = max(1, frame.shape[0] * self.width // frame.shape[1])
+            frame = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        if self.cache_frames:
+            self.cache[index] = frame
+            while len(self.cache) > self.cache_frames:
+                self.cache.popitem(last=False)
+        return True, frame
+
+    def release(self):
+        with self.lock:
+            if self.cap is not None:
+                self.cap.release()
+                self.cap = None
+        self.cache.clear()
+
+
+class FramePrefetcher:
+    """一時停止中に現在位置の前後を専用デコーダーでバックグラウンドにデコードし、縮小して保持する
+    
+    コマ送り（j/l）や1秒移動（h/;）で戻る方向に動いても、キーフレームからのデコードをやり直さずに済む。
+    先読み範囲はキャッシュ容量に収まる枚数で、直近の移動方向を広めに取り、その方向から先にデコードする。
+    """
+    def __init__(self, file_path, hw_accel, width, height, max_width, crop=None):
+        # 表示範囲が指定されていれば、その範囲を切り取ってから画面幅に縮小する
+        self.crop = crop
+        if crop:
+            width, height = crop[2], crop[3]
+        scale_width = max(1, min(width, max_width))
+        scale_height = max(1, height * scale_width // max(1, width))
+        self.size = (scale_width, scale_height) if scale_width < width else None
+        frame_bytes = scale_width * scale_height * 3
+        self.capacity = max(8, min(PREFETCH_MAX_FRAMES, PREFETCH_CACHE_MB * 1024 * 1024 // frame_bytes))
+        self.decoder = PreviewDecoder(file_path, hw_accel)
+        self.frames = {}
+        self.frames_lock = threading.Lock()
+        self.request = None
+        self.thread = None
+
+    def get(self, index):
+        with self.frames_lock:
+            return self.frames.get(index)
+
+    def prefetch(self, index, direction):
+        """index を中心に先読みする。direction は直近の移動方向（-1, 0, 1）"""
+        self.request = (index, direction)
+        if not self.thread or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.request = None
+
+    def window(self, index, direction):
+        span = self.capacity - 1
+        if direction < 0:
+            back = span * 3 // 4
+        elif direction > 0:
+            back = span // 4
+        else:
+            back = span // 2
+        start = max(0, index - back)
+        return start, start + span + 1
+
+    def run(self):
+        while self.decoder.isOpened():
+            request = self.request
+            if request is None:
+                return
+            index, direction = request
+            start, end = self.window(index, direction)
+            segments = [(start, index + 1), (index + 1, end)] if direction < 0 else [(index, end), (start, index)]
+            for segment_start, segment_end in segments:
+                if not self.fill(segment_start, segment_end, start, end):
+                    break
+            if self.request is request:
+                self.request = None
+
+    def fill(self, segment_start, segment_end, window_start, window_end):
+        """[segment_start, segment_end) の未取得フレームをデコードする
+        
+        先読み範囲外への移動要求が来たか、末尾に達した場合はFalseを返す。
+        """
+        with self.frames_lock:
+            missing = [i for i in range(segment_start, segment_end) if i not in self.frames]
+        if not missing:
+            return True
+        for frame_index in range(missing[0], missing[-1] + 1):
+            request = self.request
+            if request is None or not window_start <= request[0] < window_end:
+                return False
+            with self.decoder.lock:
+                if not self.decoder.isOpened():
+                    return False
+                self.decoder.seek(frame_index)
+                if self.get(frame_index) is not None:
+                    # 取得済みのフレームはデコードだけして進める（変換と縮小を省く）
+                    ret = self.decoder.cap.grab()
+                    self.decoder.position = frame_index + 1 if ret else -1
+                    frame = None
+                else:
+                    ret, frame, _ = self.decoder.read_next()
+            if not ret:
+                return False
+            if frame is not None:
+                self.store(frame_index, frame)
+        return True
+
+    def store(self, index, frame):
+        if self.crop:
+            x, y, w, h = self.crop
+            frame = frame[y:y + h, x:x + w]
+        if self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        with self.frames_lock:
+            self.frames[index] = frame
+            # 容量を超えたら現在位置から最も遠いフレームを捨てる
+            request = self.request
+            center = request[0] if request else index
+            while len(self.frames) > self.capacity:
+                del self.frames[max(self.frames, key=lambda i: abs(i - center))]
+
+    def release(self):
+        self.request = None
+        self.decoder.release()
+        with self.frames_lock:
+            self.frames.clear()
+
+
+def probe_video_info(file_path):
+    """キュー登録用のメタデータ (総フレーム数, FPS, 幅, 高さ) を返す。開けなければNone"""
+    cap = cv2.VideoCapture(file_path)
+    try:
+        if not cap.isOpened():
+            return None
+        return (int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS) or 30.0,
+                int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    finally:
+        cap.release()
+
+
+class HotFolderWatcher:
+    """監視フォルダ以下を定期的に走査し、書き込みが終わった新しい動画を通知する
+    
+    更新時刻が変わったフォルダだけをos.scandirで読み直す（ファイルの追加・削除・名前変更でフォルダの更新時刻が変わる）。
+    見つけたファイルはサイズと更新時刻がHOTFOLDER_STABLE_SECONDS変わらなくなるまで待ち、
+    メタデータはスレッドプールで取得してon_ready(パス, メタデータ)を呼ぶ（開けなかった場合メタデータはNone）。
+    seen は通知済みファイルの {パス: [サイズ, 更新時刻]}。baseline=Trueなら最初の走査で見つけたファイルは通知しない。
+    """
+    def __init__(self, folder, seen, on_ready, log, exclude=(), baseline=False):
+        self.folder = folder
+        self.seen = seen
+        self.seen_lock = threading.Lock()
+        self.on_ready = on_ready
+        self.log = log
+        self.exclude = {os.path.normcase(os.path.abspath(path)) for path in exclude}
+        self.baseline = baseline
+        self.dir_mtimes = {}
+        self.subdirs = {}
+        self.pending = {}   # パス: (サイズ, 更新時刻, 変化が止まった時刻)
+        self.probing = set()
+        self.stop_event = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=HOTFOLDER_PROBE_WORKERS)
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot_seen(self):
+        with self.seen_lock:
+            return dict(self.seen)
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.scan()
+                self.baseline = False
+                self.check_pending()
+            except Exception as e:
+                self.log(f"監視フォルダ走査エラー: {e}")
+            self.stop_event.wait(HOTFOLDER_POLL_SECONDS)
+
+    def scan(self):
+        visited = set()
+        stack = [self.folder]
+        while stack:
+            directory = stack.pop()
+            visited.add(directory)
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            if self.dir_mtimes.get(directory) == mtime:
+                # このフォルダ直下は変化なし。サブフォルダだけ確認する
+                stack.extend(self.subdirs.get(directory, ()))
+                continue
+            subdirs = []
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if os.path.normcase(os.path.abspath(entry.path)) not in self.exclude:
+                            subdirs.append(entry.path)
+                    elif entry.name.lower().endswith(VIDEO_EXTENSIONS):
+                        self.found(entry)
+            self.dir_mtimes[directory] = mtime
+            self.subdirs[directory] = subdirs
+            stack.extend(subdirs)
+        for directory in set(self.dir_mtimes) - visited:
+            del self.dir_mtimes[directory]
+            self.subdirs.pop(directory, None)
+
+    def found(self, entry):
+        path = entry.path
+        if path in self.pending or path in self.probing:
+            return
+        try:
+            stat = entry.stat()
+        except OSError:
+            return
+        state = [stat.st_size, stat.st_mtime_ns]
+        with self.seen_lock:
+            if self.seen.get(path) == state:
+                return
+            if self.baseline:
+                self.seen[path] = state
+                return
+        self.pending[path] = (stat.st_size, stat.st_mtime_ns, time.time())
+
+    def check_pending(self):
+        now = time.time()
+        for path, (size, mtime, since) in list(self.pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self.pending[path]
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime) or stat.st_size == 0:
+                self.pending[path] = (stat.st_size, stat.st_mtime_ns, now)
+            elif now - since >= HOTFOLDER_STABLE_SECONDS:
+                del self.pending[path]
+                self.probing.add(path)
+                self.executor.submit(self.probe, path, [size, mtime])
+
+    def probe(self, path, state):
+        try:
+            info = probe_video_info(path)
+        except Exception as e:
+            self.log(f"監視フォルダ: メタデータ取得エラー {path}: {e}")
+            info = None
+        with self.seen_lock:
+            self.seen[path] = state
+        self.probing.discard(path)
+        if not self.stop_event.is_set():
+            self.on_ready(path, info)
+
+
+def probe_keyframes(file_path, fps):
+    """ffprobeのパケット一覧（デコードなし）からキーフレームのフレーム番号を昇順で返す。取得できなければNone"""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', file_path],
+            capture_output=True, text=True, timeout=KEYFRAME_PROBE_TIMEOUT, creationflags=CREATE_NO_WINDOW
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    packets = []
+    for line in result.stdout.splitlines():
+        fields = line.strip().split(',')
+        if len(fields) < 2:
+            continue
+        try:
+            packets.append((float(fields[0]), 'K' in fields[1]))
+        except ValueError:
+            continue
+    if not packets:
+        return None
+    first_pts = min(pts for pts, _ in packets)
+    return sorted({int(round((pts - first_pts) * fps)) for pts, keyframe in packets if keyframe})
+
+
+def parse_rate(value):
+    """ffprobeの 30000/1001 形式のフレームレートを数値にする（不明なら0）"""
+    try:
+        numerator, _, denominator = value.partition('/')
+        return float(numerator) / float(denominator or 1)
+    except (ValueError, ZeroDivisionError, AttributeError):
+        return 0.0
+
+
+def probe_timestamp_health(file_path):
+    """パケットのタイムスタンプ（デコードなし）を調べ、LADAに渡せる最も軽い切り出し方法を判定する
+    
+    戻り値は {'mode': 'copy'|'copy_genpts'|'re_encode', 'reasons': [理由, ...]}。
+    ffprobeが使えない場合やTRIM_PROBE_TIMEOUT秒以内に終わらない場合はNone（呼び出し側で再エンコードにする）。
+    - DTSの逆行・可変フレームレート・長すぎるGOP・映像の開始時刻のずれ（編集リスト等）: 再エンコード
+    - PTSの欠落・Bフレームによる並べ替え: +genptsでのストリームコピー
+    - いずれもなし: ストリームコピー
+    """
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries', 'stream=has_b_frames,r_frame_rate,avg_frame_rate,time_base,start_time:format=duration,start_time',
+             '-of', 'json', file_path],
+            capture_output=True, text=True, timeout=TRIM_PROBE_TIMEOUT, creationflags=CREATE_NO_WINDOW
+        )
+        info = json.loads(result.stdout) if result.returncode == 0 else None
+    except (OSError, subprocess.SubprocessError, ValueError):
+        # subprocess.TimeoutExpired（巨大なファイルやネットワーク上のファイル）も判定不能として扱う
+        return None
+    if not info or not info.get('streams'):
+        return None
+    stream = info['streams'][0]
+    container = info.get('format', {})
+    time_base = parse_rate(stream.get('time_base', '1/1000')) or 0.001
+    duration = float(container.get('duration', 0) or 0)
+    
+    command = ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+               '-show_entries', 'packet=pts,dts,flags', '-of', 'csv=p=0']
+    if duration > TRIM_PROBE_SECONDS * 3:
+        middle = duration / 2 - TRIM_PROBE_SECONDS / 2
+        command += ['-read_intervals', f"%+{TRIM_PROBE_SECONDS},{middle:.3f}%+{TRIM_PROBE_SECONDS},"
+                                       f"{duration - TRIM_PROBE_SECONDS:.3f}%+{TRIM_PROBE_SECONDS}"]
+    try:
+        result = subprocess.run(command + [file_path], capture_output=True, text=True, timeout=TRIM_PROBE_TIMEOUT,
+                                creationflags=CREATE_NO_WINDOW)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    
+    # 調べた区間ごとにパケットをまとめる（DTSが1秒以上飛んだら次の区間）
+    segments = [[]]
+    missing_pts = missing_dts = False
+    for line in result.stdout.splitlines():
+        fields = line.strip().split(',')
+        if len(fields) < 3:
+            continue
+        pts = int(fields[0]) if fields[0].lstrip('-').isdigit() else None
+        dts = int(fields[1]) if fields[1].lstrip('-').isdigit() else None
+        missing_pts |= pts is None
+        missing_dts |= dts is None
+        if segments[-1] and dts is not None and segments[-1][-1][1] is not None and \
+                (dts - segments[-1][-1][1]) * time_base > 1.0:
+            segments.append([])
+        segments[-1].append((pts, dts, 'K' in fields[2]))
+    packets = [packet for segment in segments for packet in segment]
+    if not packets:
+        return None
+    
+    reencode, genpts = [], []
+    for segment in segments:
+        dts_values = [dts for _, dts, _ in segment if dts is not None]
+        if any(b <= a for a, b in zip(dts_values, dts_values[1:])):
+            reencode.append('DTSが逆行・重複しています')
+            break
+    frame_rate = parse_rate(stream.get('r_frame_rate'))
+    average_rate = parse_rate(stream.get('avg_frame_rate'))
+    intervals = []
+    for segment in segments:
+        pts_values = sorted(pts for pts, _, _ in segment if pts is not None)
+        intervals += [b - a for a, b in zip(pts_values, pts_values[1:])]
+    if intervals:
+        mean = sum(intervals) / len(intervals)
+        # 時間単位の丸めによる1単位のずれは許容する
+        if mean > 0 and max(abs(d - mean) for d in intervals) > max(1.0, mean * TRIM_VFR_TOLERANCE):
+            reencode.append('可変フレームレートです')
+    elif frame_rate and average_rate and abs(frame_rate - average_rate) / frame_rate > TRIM_VFR_TOLERANCE:
+        reencode.append('可変フレームレートです')
+    for segment in segments:
+        keyframes = [pts for pts, _, keyframe in segment if keyframe and pts is not None]
+        segment_pts = [pts for pts, _, _ in segment if pts is not None]
+        if not segment_pts:
+            continue
+        span = (max(segment_pts) - min(segment_pts)) * time_base
+        gaps = [(b - a) * time_base for a, b in zip(keyframes, keyframes[1:])]
+        if (gaps and max(gaps) > TRIM_MAX_KEYFRAME_GAP) or (len(keyframes) < 2 and span > TRIM_MAX_KEYFRAME_GAP):
+            reencode.append(f'キーフレーム間隔が{TRIM_MAX_KEYFRAME_GAP:g}秒を超えています')
+            break
+    stream_start = float(stream.get('start_time', 0) or 0)
+    container_start = float(container.get('start_time', 0) or 0)
+    frame_time = 1 / (average_rate or frame_rate or 30)
+    if stream_start < -frame_time or abs(stream_start - container_start) > frame_time:
+        reencode.append('映像の開始時刻がずれています（編集リスト等）')
+    if missing_dts:
+        reencode.append('DTSがありません')
+    if missing_pts:
+        genpts.append('PTSが欠落しています')
+    if int(stream.get('has_b_frames', 0) or 0) > 0 or any(None not in (pts, dts) and pts != dts for pts, dts, _ in packets):
+        genpts.append('Bフレームの並べ替えがあります')
+    
+    if reencode:
+        return {'mode': 're_encode', 'reasons': reencode + genpts}
+    if genpts:
+        return {'mode': 'copy_genpts', 'reasons': genpts}
+    return {'mode': 'copy', 'reasons': []}
+
+
+def is_network_path(file_path):
+    """ファイルがネットワーク上（UNCパス、ネットワークドライブ、NFS/SMB等のマウント）にあるか"""
+    path = os.path.abspath(file_path)
+    if path.startswith(('\\\\', '//')):
+        return True
+    if os.name == 'nt':
+        import ctypes
+        drive = os.path.splitdrive(path)[0]
+        return bool(drive) and ctypes.windll.kernel32.GetDriveTypeW(drive + '\\') == 4  # DRIVE_REMOTE
+    try:
+        with open('/proc/mounts', 'r', encoding='utf-8') as f:
+            mounts = [line.split()[1:3] for line in f if len(line.split()) >= 3]
+    except OSError:
+        return False
+    matches = [(mount, fstype) for mount, fstype in mounts if path == mount or path.startswith(mount.rstrip('/') + '/')]
+    return bool(matches) and max(matches, key=lambda m: len(m[0]))[1] in NETWORK_FILESYSTEMS
+
+
+def mp4_top_level_boxes(file_path):
+    """MP4/MOVの最上位ボックスの一覧 [(種類, オフセット, サイズ)] を返す（解析できなければNone）"""
+    boxes = []
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        offset = 0
+        while offset < file_size:
+            f.seek(offset)
+            header = f.read(16)
+            if len(header) < 8:
+                return None
+            size = int.from_bytes(header[:4], 'big')
+            kind = header[4:8].decode('latin-1')
+            if size == 1 and len(header) == 16:
+                size = int.from_bytes(header[8:16], 'big')
+            elif size == 0:
+                size = file_size - offset
+            if size < 8:
+                return None
+            boxes.append((kind, offset, size))
+            offset += size
+    return boxes
+
+
+def probe_packets(file_path, intervals):
+    """ffprobeの -read_intervals の範囲で読まれる全ストリームのパケットのバイト範囲 [(先頭, 末尾)] を返す
+    
+    ffprobeが使えない場合やSTAGING_PROBE_TIMEOUT秒以内に終わらない場合はNone。
+    """
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-read_intervals', intervals,
+             '-show_entries', 'packet=pos,size', '-of', 'csv=p=0', file_path],
+            capture_output=True, text=True, timeout=STAGING_PROBE_TIMEOUT, creationflags=CREATE_NO_WINDOW
+        )
+    except (OSError, subprocess.SubprocessError):
+        # subprocess.TimeoutExpired もここで捕まえる（計画時は全体コピー、検証時はコピーを破棄する）
+        return None
+    if result.returncode != 0:
+        return None
+    spans = []
+    for line in result.stdout.splitlines():
+        fields = line.strip().split(',')
+        if len(fields) >= 2 and fields[0].isdigit() and fields[1].isdigit():
+            spans.append((int(fields[0]), int(fields[0]) + int(fields[1])))
+    return spans
+
+
+def probe_packet_span(file_path, start_sec, end_sec):
+    """切り出し範囲 [start_sec, end_sec] の全ストリームのパケットが収まるバイト範囲 (先頭, 末尾) を返す（見積もり）
+    
+    ffprobeで開始位置（直前のキーフレームへシークされる）と終了位置の前後2秒ずつだけパケット位置を読む。
+    インターリーブが正しければ両端の位置の最小・最大の間に範囲内のパケットがすべて入る（コピー後に確認する）。
+    """
+    spans = probe_packets(file_path, f"{start_sec:.3f}%+2,{end_sec:.3f}%+2")
+    if not spans:
+        return None
+    return min(start for start, _ in spans), max(end for _, end in spans)
+
+
+def ranges_cover(ranges, spans):
+    """バイト範囲 [(オフセット, 長さ)] が、パケットのバイト範囲 [(先頭, 末尾)] をすべて含むか"""
+    merged = []
+    for offset, length in sorted(ranges):
+        if merged and offset <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], offset + length)
+        else:
+            merged.append([offset, offset + length])
+    starts = [start for start, _ in merged]
+    for start, end in spans:
+        index = bisect.bisect_right(starts, start) - 1
+        if index < 0 or end > merged[index][1]:
+            return False
+    return True
+
+
+class SourceStager:
+    """一括処理中に、次に処理する項目のソース動画のうち切り出しに必要な部分だけをローカルへコピーしておく
+    
+    MP4/MOVはmdat以外のボックス（moov等）全体と、mdatのうち切り出し範囲のパケットを含む区間だけを
+    元と同じオフセットに書いたスパースファイルを作る。ファイル構造もオフセットも元と同じなので、
+    切り出し処理は同じ時刻指定でローカルのファイルを読める。コピー後、切り出しで読まれる全パケットが
+    コピーした範囲に入っているかをffprobeで確認し、入っていなければ破棄する（元のファイルを使う）。その他の形式は予算に収まればファイル全体をコピーする。
+    コピーは帯域 bandwidth（バイト/秒、0で無制限）に制限し、合計が budget バイトを超える項目はコピーしない。
+    """
+    def __init__(self, staging_dir, budget, bandwidth, log):
+        self.staging_dir = staging_dir
+        self.budget = budget
+        self.bandwidth = bandwidth
+        self.log = log
+        self.lock = threading.Lock()
+        self.staged = {}    # キー: {'path', 'bytes'}
+        self.jobs = []      # (キー, ソース, 開始秒, 終了秒)
+        self.thread = None
+
+    def key(self, source, start_sec, end_sec):
+        stat = os.stat(source)
+        data = f"{os.path.abspath(source)}|{stat.st_size}|{stat.st_mtime_ns}|{start_sec:.3f}|{end_sec:.3f}"
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()[:16]
+
+    def lookup(self, source, start_sec, end_sec):
+        """コピー済みならローカルのパスを返す"""
+        try:
+            key = self.key(source, start_sec, end_sec)
+        except OSError:
+            return None
+        with self.lock:
+            staged = self.staged.get(key)
+        return staged['path'] if staged and os.path.exists(staged['path']) else None
+
+    def schedule(self, jobs):
+        """コピーする (ソース, 開始秒, 終了秒) を処理順に指定する（一覧から外れた項目のコピー中なら中止する）"""
+        keyed = []
+        for source, start_sec, end_sec in jobs:
+            try:
+                keyed.append((self.key(source, start_sec, end_sec), source, start_sec, end_sec))
+            except OSError:
+                continue
+        with self.lock:
+            self.jobs = keyed
+        if keyed and (not self.thread or not self.thread.is_alive()):
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def discard(self, source, start_sec, end_sec):
+        """処理が終わった項目のコピーを削除する"""
+        try:
+            key = self.key(source, start_sec, end_sec)
+        except OSError:
+            return
+        with self.lock:
+            staged = self.staged.pop(key, None)
+        if staged:
+            self.remove(staged['path'])
+
+    def clear(self):
+        with self.lock:
+            self.jobs = []
+            staged, self.staged = self.staged, {}
+        for entry in staged.values():
+            self.remove(entry['path'])
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def is_scheduled(self, key):
+        with self.lock:
+            return any(job[0] == key for job in self.jobs)
+
+    def run(self):
+        while True:
+            with self.lock:
+                pending = [job for job in self.jobs if job[0] not in self.staged]
+                used = sum(entry['bytes'] for entry in self.staged.values())
+            if not pending:
+                return
+            key, source, start_sec, end_sec = pending[0]
+            try:
+                staged = self.stage(key, source, start_sec, end_sec, self.budget - used)
+            except Exception as e:
+                self.log(f"ステージングエラー: {os.path.basename(source)}: {e}")
+                staged = None
+            with self.lock:
+                if staged and any(job[0] == key for job in self.jobs):
+                    self.staged[key] = staged
+                else:
+                    if staged:
+                        self.remove(staged['path'])
+                    # コピーできない項目は一覧から外して次へ進む
+                    self.jobs = [job for job in self.jobs if job[0] != key]
+
+    def plan(self, source, start_sec, end_sec):
+        """コピーするバイト範囲 [(オフセット, 長さ)] と、スパースファイルにするかを返す"""
+        file_size = os.path.getsize(source)
+        if source.lower().endswith(STAGING_MP4_EXTENSIONS):
+            boxes = mp4_top_level_boxes(source)
+            span = probe_packet_span(source, start_sec, end_sec)
+            if boxes and span:
+                ranges = []
+                for kind, offset, size in boxes:
+                    if kind == 'mdat':
+                        begin = max(offset, span[0] - STAGING_PADDING)
+                        end = min(offset + size, span[1] + STAGING_PADDING)
+                        # mdatのヘッダーも元のまま残す
+                        ranges.append((offset, min(size, 16)))
+                        if end > begin:
+                            ranges.append((begin, end - begin))
+                    else:
+                        ranges.append((offset, size))
+                return ranges, True
+        return [(0, file_size)], False
+
+    def stage(self, key, source, start_sec, end_sec, available):
+        ranges, sparse = self.plan(source, start_sec, end_sec)
+        copy_bytes = sum(length for _, length in ranges)
+        file_size = os.path.getsize(source)
+        os.makedirs(self.staging_dir, exist_ok=True)
+        path = os.path.join(self.staging_dir, f"{key}{os.path.splitext(source)[1]}")
+        open(path, 'wb').close()
+        if sparse and os.name == 'nt':
+            # NTFSでは疎ファイル属性がないと、ファイルサイズ分の領域が確保されてしまう
+            result = subprocess.run(['fsutil', 'sparse', 'setflag', path], capture_output=True,
+                                    creationflags=CREATE_NO_WINDOW)
+            sparse = result.returncode == 0
+        used_bytes = copy_bytes if sparse else file_size
+        if used_bytes > available:
+            self.remove(path)
+            self.log(f"ステージング省略（容量不足）: {os.path.basename(source)} {used_bytes / 1e6:.0f}MB")
+            return None
+        
+        started = time.perf_counter()
+        copied = 0
+        with open(source, 'rb') as src, open(path, 'r+b') as dst:
+            dst.truncate(file_size)
+            for offset, length in ranges:
+                src.seek(offset)
+                dst.seek(offset)
+                remaining = length
+                while remaining > 0:
+                    if not self.is_scheduled(key):
+                        dst.close()
+                        self.remove(path)
+                        return None
+                    chunk = src.read(min(STAGING_CHUNK, remaining))
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    remaining -= len(chunk)
+                    copied += len(chunk)
+                    if self.bandwidth:
+                        delay = copied / self.bandwidth - (time.perf_counter() - started)
+                        if delay > 0:
+                            time.sleep(delay)
+        if ranges != [(0, file_size)]:
+            # 切り出しで実際に読まれるパケット（開始位置の直前のキーフレームから、全ストリーム）が
+            # コピーした範囲に収まっているかを、コピー済みのmoovの索引から確かめる。
+            # インターリーブが偏ったファイルで穴（0埋め）を読むと切り出しが壊れるため、その場合は元のファイルを使う
+            spans = probe_packets(path, f"{start_sec:.3f}%{end_sec + 1:.3f}")
+            if not spans or not ranges_cover(ranges, spans):
+                self.remove(path)
+                self.log(f"ステージング破棄（必要なデータが範囲外）: {os.path.basename(source)}、元のファイルから切り出します")
+                return None
+        elapsed = time.perf_counter() - started
+        self.log(f"ステージング完了: {os.path.basename(source)} {copied / 1e6:.0f}MB / {file_size / 1e6:.0f}MB "
+                 f"({elapsed:.1f}秒, {copied / 1e6 / max(elapsed, 1e-6):.0f}MB/秒)")
+        return {'path': path, 'bytes': used_bytes}
+
+
+class ProxyManager:
+    """巨大な動画のプレビュー用プロキシをバックグラウンドで作成し、容量上限付きで保持する
+    
+    プロキシは全フレームを間引かず（-vsync passthrough）縮小・短いGOPで変換するので、フレーム番号は元動画と一致する。
+    作成後にフレーム数とFPSが元動画と一致することを確認し、一致しなければ破棄する。
+    index は {キー: {source, proxy, width, height, frames, fps, size, last_used}}（キーはパス・サイズ・更新時刻から作る）。
+    合計サイズがPROXY_CACHE_MBを超えたら最後に使ったのが古いものから削除する。
+    """
+    def __init__(self, cache_dir, index_file, log):
+        self.cache_dir = cache_dir
+        self.index_file = index_file
+        self.log = log
+        self.lock = threading.Lock()
+        self.index = {}
+        self.process = None
+        self.building = None
+
+    def load(self):
+        index = self.load_index()
+        with self.lock:
+            self.index = {**index, **self.index}
+
+    def load_index(self):
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                self.log(f"プロキシ情報の読み込みエラー: {str(e)}")
+        return {}
+
+    def save_index(self):
+        try:
+            with self.lock, open(self.index_file, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            self.log(f"プロキシ情報の保存エラー: {str(e)}")
+
+    def key(self, file_path):
+        stat = os.stat(file_path)
+        source = f"{os.path.normcase(os.path.abspath(file_path))}|{stat.st_size}|{stat.st_mtime_ns}"
+        return hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]
+
+    def lookup(self, file_path):
+        """作成済みのプロキシ情報を返す（なければNone）"""
+        try:
+            key = self.key(file_path)
+        except OSError:
+            return None
+        with self.lock:
+            entry = self.index.get(key)
+            if entry and not (os.path.exists(entry['proxy']) and os.path.getsize(entry['proxy']) == entry['size']):
+                del self.index[key]
+                entry = None
+            if entry:
+                entry['last_used'] = time.time()
+        if entry:
+            self.save_index()
+        return entry
+
+    def build(self, file_path, info, on_progress, on_done):
+        """プロキシの作成を始める（作成中の別ファイルは中止する）
+        
+        info は元動画の (総フレーム数, FPS, 幅, 高さ)。on_progress(割合) と on_done(パス, 情報またはNone) は作業スレッドから呼ばれる。
+        """
+        self.cancel()
+        self.building = file_path
+        threading.Thread(target=self.run, args=(file_path, info, on_progress, on_done), daemon=True).start()
+
+    def cancel(self):
+        self.building = None
+        process = self.process
+        if process and process.poll() is None:
+            process.kill()
+
+    def run(self, file_path, info, on_progress, on_done):
+        total_frames, fps, width, height = info
+        entry = None
+        try:
+            key = self.key(file_path)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            proxy_path = os.path.join(self.cache_dir, f"{key}.mp4")
+            temp_path = os.path.join(self.cache_dir, f"{key}.tmp.mp4")
+            command = [
+                'ffmpeg', '-y', '-loglevel', 'error', '-nostats', '-progress', 'pipe:1',
+                '-i', file_path, '-map', '0:v:0', '-an', '-sn', '-vsync', 'passthrough',
+                '-vf', f'scale={PROXY_MAX_WIDTH}:-2:flags=fast_bilinear', '-pix_fmt', 'yuv420p',
+                '-c:v', 'libx264', '-preset', 'veryfast', '-tune', 'fastdecode', '-crf', '26',
+                '-g', str(PROXY_GOP), '-bf', '0', temp_path
+            ]
+            started = time.perf_counter()
+            process = self.process = subprocess.Popen(
+                command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                creationflags=CREATE_NO_WINDOW | BELOW_NORMAL_PRIORITY_CLASS)
+            for line in process.stdout:
+                if line.startswith('frame=') and total_frames > 0:
+                    on_progress(min(1.0, int(line[6:].strip() or 0) / total_frames))
+            process.wait()
+            if self.process is process:
+                self.process = None
+            if process.returncode != 0 or self.building != file_path:
+                raise RuntimeError(f"ffmpeg終了コード {process.returncode}" if self.building == file_path else "中止")
+            proxy_info = probe_video_info(temp_path)
+            if not proxy_info or proxy_info[0] != total_frames or abs(proxy_info[1] - fps) > 0.01:
+                raise RuntimeError(f"フレーム数またはFPSが元動画と一致しません: {proxy_info} / {info}")
+            os.replace(temp_path, proxy_path)
+            entry = {'source': file_path, 'proxy': proxy_path, 'width': width, 'height': height,
+                     'frames': total_frames, 'fps': fps, 'size': os.path.getsize(proxy_path), 'last_used': time.time()}
+            with self.lock:
+                self.index[key] = entry
+            self.evict(keep=key)
+            self.log(f"プロキシ作成完了: {os.path.basename(file_path)} ({time.perf_counter() - started:.1f}秒, "
+                     f"{entry['size'] / 1e6:.0f}MB)")
+        except Exception as e:
+            self.log(f"プロキシを作成できませんでした: {os.path.basename(file_path)}: {e}")
+            if 'temp_path' in locals() and os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+        finally:
+            if self.building == file_path:
+                self.building = None
+        on_done(file_path, entry)
+
+    def evict(self, keep=None):
+        with self.lock:
+            total = sum(entry['size'] for entry in self.index.values())
+            for key in sorted(self.index, key=lambda k: self.index[k]['last_used']):
+                if total <= PROXY_CACHE_MB * 1024 * 1024:
+                    break
+                if key == keep:
+                    continue
+                entry = self.index.pop(key)
+                total -= entry['size']
+                try:
+                    os.remove(entry['proxy'])
+                except OSError:
+                    pass
+                self.log(f"プロキシ削除（容量上限）: {os.path.basename(entry['source'])}")
+        self.save_index()
+
+
+class DecoderPool:
+    """プレビュー用デコーダーの組。用途ごとに別のデコーダーを使い、互いの読み出し位置を乱さない
+    
+    playback: 再生スレッドが順番に読む（リングバッファへ直接デコード）
+    scrub:    シーク・コマ送り・再描画などのランダムアクセス（初回要求時に開く）
+    hover:    進捗バーのホバープレビュー用の縮小フレーム（ソフトウェアデコード、初回要求時に開く）
+    prefetcher: 一時停止中の前後先読み（FramePrefetcher、初回要求時に開く）
+    
+    file_path がプロキシの場合は source_size に元動画の (幅, 高さ) を渡す（フレーム番号は元動画と共通）。
+    set_view() で表示範囲を設定すると、frame_at() と thumbnail_at() はその範囲だけを返す。
+    再生用のリングバッファは全体をデコードするので、表示前に crop_frame() で切り取る。
+    """
+    def __init__(self, file_path, hw_accel=True, source_size=None):
+        self.file_path = file_path
+        self.hw_accel = hw_accel
+        self.playback = PreviewDecoder(file_path, hw_accel)
+        self.width = int(self.playback.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.playback.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.is_proxy = source_size is not None
+        self.source_size = tuple(source_size) if source_size else (self.width, self.height)
+        self.crop = None
+        self.scrub = None
+        self.hover = None
+        self.prefetcher = None
+        self.keyframes = None
+        self.keyframe_thread = None
+        self.open_lock = threading.Lock()
+
+    def isOpened(self):
+        return self.playback.isOpened()
+
+    def get_scrub(self):
+        with self.open_lock:
+            if self.scrub is None:
+                frame_bytes = max(1, self.width * self.height * 3)
+                cache_frames = max(1, min(SCRUB_CACHE_MAX_FRAMES, SCRUB_CACHE_MB * 1024 * 1024 // frame_bytes))
+                self.scrub = PreviewDecoder(self.file_path, self.hw_accel, cache_frames=cache_frames)
+                self.scrub.crop = self.crop
+            return self.scrub
+
+    def frame_at(self, index):
+        """ランダムアクセス要求。先読み済みならそれを返し、なければシーク用デコーダーで読む
+        （シーク用が開けない場合は再生用で代用する）"""
+        if self.prefetcher:
+            frame = self.prefetcher.get(index)
+            if frame is not None:
+                return True, frame
+        decoder = self.get_scrub()
+        if not decoder.isOpened():
+            decoder = self.playback
+            decoder.generation = None  # 再生用の位置を動かしたので、再生再開時に位置を合わせ直させる
+        return decoder.read_at(index)
+
+    def thumbnail_at(self, index):
+        with self.open_lock:
+            if self.hover is None:
+                self.hover = PreviewDecoder(self.file_path, hw_accel=False, threads=2,
+                                            cache_frames=64, width=HOVER_PREVIEW_WIDTH)
+                self.hover.crop = self.crop
+        if not self.hover.isOpened():
+            return False, None
+        return self.hover.read_at(index)
+
+    def prefetch(self, index, direction, max_width):
+        with self.open_lock:
+            if self.prefetcher is None:
+                self.prefetcher = FramePrefetcher(self.file_path, self.hw_accel, self.width, self.height, max_width, self.crop)
+        if self.prefetcher.decoder.isOpened():
+            self.prefetcher.prefetch(index, direction)
+
+    def set_view(self, view):
+        """表示範囲を設定する（キャッシュ済みのフレームと先読みは範囲が変わるので捨てる）"""
+        crop = preview_crop_rect(view, self.width, self.height)
+        if crop == self.crop:
+            return
+        self.crop = crop
+        with self.open_lock:
+            for decoder in (self.playback, self.scrub, self.hover):
+                if decoder is not None:
+                    decoder.crop = crop
+                    decoder.cache.clear()
+            if self.prefetcher is not None:
+                self.prefetcher.release()
+                self.prefetcher = None
+
+    def crop_frame(self, frame):
+        """全体をデコードしたフレームを表示範囲で切り取る（コピーしない）"""
+        if self.crop is None or frame is None:
+            return frame
+        x, y, w, h = self.crop
+        return frame[y:y + h, x:x + w]
+
+    def get_keyframes(self, fps, total_frames):
+        """早送り用のキーフレーム番号リスト。初回はバックグラウンドでffprobeを実行し、
+        結果が出るまで（またはffprobeが使えない場合）は1秒間隔の位置で代用する"""
+        if self.keyframes:
+            return self.keyframes
+        if self.keyframe_thread is None:
+            def probe():
+                self.keyframes = probe_keyframes(self.file_path, fps)
+            self.keyframe_thread = threading.Thread(target=probe, daemon=True)
+            self.keyframe_thread.start()
+        return list(range(0, max(1, total_frames), max(1, int(round(fps)))))
+
+    def stop_prefetch(self):
+        if self.prefetcher:
+            self.prefetcher.stop()
+
+    def release(self):
+        for decoder in (self.playback, self.scrub, self.hover, self.prefetcher):
+            if decoder is not None:
+                decoder.release()
+
+
+class QuickLookWorker:
+    """クイック確認の要求を常駐スレッド1本で順に処理する
+    
+    スレッドは最初の要求で起動し、以降の要求でも使い回す。
+    処理中に届いた要求は最新の1件だけを残す（カーソルを動かして連打しても古い区間の復元を待たない）。
+    job(request) の戻り値か例外を on_done(request, result) に渡す（on_doneは作業スレッドから呼ばれる）。
+    """
+    def __init__(self, job, on_done):
+        self.job = job
+        self.on_done = on_done
+        self.condition = threading.Condition()
+        self.pending = None
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, request):
+        with self.condition:
+            self.pending = request
+            self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.pending = None
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                request, self.pending = self.pending, None
+            try:
+                result = self.job(request)
+            except Exception as e:
+                result = e
+            self.on_done(request, result)
+
+
+def mosaic_tile_mask(gray):
+    """縮小グレースケール画像からモザイクらしいタイルのマスクを返す
+    
+    モザイクは内部が平坦なブロックと、ブロック境界の急な段差が格子状に並ぶ。
+    平坦な画素の割合が高く、かつ縦横両方向に「両隣が平坦な段差が3画素以上揃って並ぶ箇所」
+    （ブロック境界）を含むタイルを候補とし、小さな塊（ノイズ）は除外する。
+    空や壁のような平坦な領域は段差がなく、ノイズによる段差は揃わないため候補にならない。
+    """
+    flat_threshold = 3
+    step_threshold = 5
+    tile = MOSAIC_TILE
+    g = gray.astype(np.int16)
+    dx = np.abs(np.diff(g, axis=1))
+    dy = np.abs(np.diff(g, axis=0))
+    
+    step_x = np.zeros(dx.shape, dtype=bool)
+    step_x[:, 1:-1] = (dx[:, 1:-1] >= step_threshold) & (dx[:, :-2] <= flat_threshold) & (dx[:, 2:] <= flat_threshold)
+    step_y = np.zeros(dy.shape, dtype=bool)
+    step_y[1:-1, :] = (dy[1:-1, :] >= step_threshold) & (dy[:-2, :] <= flat_threshold) & (dy[2:, :] <= flat_threshold)
+    # 縦の境界は上下に、横の境界は左右に段差が揃う
+    edge_x = np.zeros_like(step_x)
+    edge_x[1:-1, :] = step_x[:-2, :] & step_x[1:-1, :] & step_x[2:, :]
+    edge_y = np.zeros_like(step_y)
+    edge_y[:, 1:-1] = step_y[:, :-2] & step_y[:, 1:-1] & step_y[:, 2:]
+    flat = (dx[:-1, :] <= flat_threshold) & (dy[:, :-1] <= flat_threshold)
+    
+    rows = (g.shape[0] - 1) // tile
+    cols = (g.shape[1] - 1) // tile
+    if rows == 0 or cols == 0:
+        return np.zeros((max(rows, 1), max(cols, 1)), dtype=bool)
+    
+    def tile_ratio(values):
+        values = values[:rows * tile, :cols * tile]
+        return values.reshape(rows, tile, cols, tile).mean(axis=(1, 3))
+    
+    candidates = (tile_ratio(flat) >= 0.5) & (tile_ratio(edge_x) >= 0.02) & (tile_ratio(edge_y) >= 0.02)
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(candidates.astype(np.uint8), connectivity=8)
+    mask = np.zeros_like(candidates)
+    for label in range(1, count):
+        if stats[label, cv2.CC_STAT_AREA] >= 4:
+            mask |= labels == label
+    return mask
+
+
+def mosaic_sample_indices(total_frames, fps):
+    """モザイク検出に使うフレーム番号（範囲全体に均等、MOSAIC_SAMPLE_SECONDS秒に1枚で下限・上限あり）"""
+    if total_frames <= 0:
+        return []
+    seconds = total_frames / fps if fps and fps > 0 else total_frames / 30.0
+    count = min(MOSAIC_MAX_SAMPLES, max(MOSAIC_MIN_SAMPLES, int(np.ceil(seconds / MOSAIC_SAMPLE_SECONDS)) + 1))
+    return [int(index) for index in np.unique(np.linspace(0, total_frames - 1, count).astype(int))]
+
+
+def mosaic_roi_rect(union, scale, width, height):
+    """タイル単位の検出結果の和集合から処理する矩形 (x, y, w, h) を返す
+    
+    外接矩形に余白を加え、左上は16の倍数に切り捨て、幅と高さは16の倍数に切り上げる（画面端では偶数に切り捨て）。
+    モザイクがない場合や領域が画面のMOSAIC_MAX_AREAを超える場合はNoneを返す。
+    """
+    if not union.any():
+        return None
+    rows, cols = np.nonzero(union)
+    tile_size = MOSAIC_TILE / scale
+    padding = max(32, int(0.04 * max(width, height)))
+    x0 = max(0, int(cols.min() * tile_size) - padding) // 16 * 16
+    y0 = max(0, int(rows.min() * tile_size) - padding) // 16 * 16
+    x1 = min(width, int((cols.max() + 1) * tile_size) + padding)
+    y1 = min(height, int((rows.max() + 1) * tile_size) + padding)
+    roi_width = min(width - x0, -(-(x1 - x0) // 16) * 16) // 2 * 2
+    roi_height = min(height - y0, -(-(y1 - y0) // 16) * 16) // 2 * 2
+    
+    if roi_width * roi_height > MOSAIC_MAX_AREA * width * height:
+        return None
+    return (x0, y0, roi_width, roi_height)
+
+
+VR_MAP_CACHE = OrderedDict()
+VR_MAP_LOCK = threading.Lock()
+
+
+def vr_view_rotation(yaw, pitch):
+    """ビューの向き（ラジアン、右・下が正）から、ビュー座標を各目の視線方向へ回す行列を返す"""
+    cy, sy, cp, sp = np.cos(yaw), np.sin(yaw), np.cos(pitch), np.sin(pitch)
+    yaw_matrix = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]], dtype=np.float32)
+    pitch_matrix = np.array([[1, 0, 0], [0, cp, sp], [0, -sp, cp]], dtype=np.float32)
+    return yaw_matrix @ pitch_matrix
+
+
+def vr_focal_length(eye_width, height, projection):
+    """ビューの焦点距離（画素）。各目の映像の中心と同じ画素密度になる値を使う"""
+    if projection == 'fisheye':
+        return min(eye_width, height) / np.pi
+    return eye_width / np.pi
+
+
+def vr_source_to_ray(x, y, eye_width, height, projection):
+    """各目の映像内の画素座標を視線方向の単位ベクトル (x, y, z) に変換する（魚眼の円の外はNaN）"""
+    if projection == 'fisheye':
+        radius = min(eye_width, height) / 2
+        dx = (x + 0.5 - eye_width / 2) / radius
+        dy = (y + 0.5 - height / 2) / radius
+        r = np.hypot(dx, dy)
+        theta = np.where(r <= 1, r * (np.pi / 2), np.nan)
+        phi = np.arctan2(dy, dx)
+        return np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)
+    lon = ((x + 0.5) / eye_width - 0.5) * np.pi
+    lat = ((y + 0.5) / height - 0.5) * np.pi
+    return np.cos(lat) * np.sin(lon), np.sin(lat), np.cos(lat) * np.cos(lon)
+
+
+def vr_ray_to_source(rx, ry, rz, eye_width, height, projection):
+    """視線方向を各目の映像内の画素座標に変換する（vr_source_to_ray の逆）"""
+    if projection == 'fisheye':
+        radius = min(eye_width, height) / 2
+        theta = np.arccos(np.clip(rz, -1, 1))
+        phi = np.arctan2(ry, rx)
+        r = theta / (np.pi / 2) * radius
+        return eye_width / 2 + r * np.cos(phi) - 0.5, height / 2 + r * np.sin(phi) - 0.5
+    lon = np.arctan2(rx, rz)
+    lat = np.arcsin(np.clip(ry, -1, 1))
+    return (lon / np.pi + 0.5) * eye_width - 0.5, (lat / np.pi + 0.5) * height - 0.5
+
+
+def vr_view_maps(eye_width, height, view):
+    """ビューの変換マップを返す（解像度・投影・視野角・向きごとにキャッシュ）
+    
+    view: {'projection', 'yaw', 'pitch', 'fov': (水平, 垂直)}（角度は度）
+    'extract' は各目の映像からビュー（透視投影）を作る cv2.remap 用の固定小数点マップ、
+    'restore' はビューを各目の映像の 'rect' (x, y, w, h) の範囲へ戻すマップ、
+    'weight' と 'inverse_weight' はビューの縁で元映像となだらかに合成する重み（ビューの外は0）。
+    """
+    projection = view['projection']
+    key = (eye_width, height, projection, round(view['yaw'], 2), round(view['pitch'], 2),
+           round(view['fov'][0], 1), round(view['fov'][1], 1))
+    with VR_MAP_LOCK:
+        if key in VR_MAP_CACHE:
+            VR_MAP_CACHE.move_to_end(key)
+            return VR_MAP_CACHE[key]
+    
+    focal = vr_focal_length(eye_width, height, projection)
+    view_width = max(16, int(np.ceil(2 * focal * np.tan(np.radians(view['fov'][0]) / 2) / 16)) * 16)
+    view_height = max(16, int(np.ceil(2 * focal * np.tan(np.radians(view['fov'][1]) / 2) / 16)) * 16)
+    rotation = vr_view_rotation(np.radians(view['yaw']), np.radians(view['pitch']))
+    
+    # ビューの各画素の視線方向 → 各目の映像の座標
+    u, v = np.meshgrid((np.arange(view_width, dtype=np.float32) + 0.5 - view_width / 2) / focal,
+                       (np.arange(view_height, dtype=np.float32) + 0.5 - view_height / 2) / focal)
+    norm = np.sqrt(u * u + v * v + 1)
+    cam_x, cam_y, cam_z = u / norm, v / norm, 1 / norm
+    map_x, map_y = vr_ray_to_source(
+        rotation[0, 0] * cam_x + rotation[0, 1] * cam_y + rotation[0, 2] * cam_z,
+        rotation[1, 0] * cam_x + rotation[1, 1] * cam_y + rotation[1, 2] * cam_z,
+        rotation[2, 0] * cam_x + rotation[2, 1] * cam_y + rotation[2, 2] * cam_z,
+        eye_width, height, projection)
+    extract = cv2.convertMaps(map_x.astype(np.float32), map_y.astype(np.float32), cv2.CV_16SC2)
+    
+    # ビューが覆う範囲だけ、各目の映像の画素 → ビューの座標の逆変換を計算する
+    x0 = max(0, int(np.floor(np.nanmin(map_x))) - 1)
+    y0 = max(0, int(np.floor(np.nanmin(map_y))) - 1)
+    x1 = min(eye_width, int(np.ceil(np.nanmax(map_x))) + 2)
+    y1 = min(height, int(np.ceil(np.nanmax(map_y))) + 2)
+    ys, xs = np.mgrid[y0:y1, x0:x1].astype(np.float32)
+    ray_x, ray_y, ray_z = vr_source_to_ray(xs, ys, eye_width, height, projection)
+    cam_x = rotation[0, 0] * ray_x + rotation[1, 0] * ray_y + rotation[2, 0] * ray_z
+    cam_y = rotation[0, 1] * ray_x + rotation[1, 1] * ray_y + rotation[2, 1] * ray_z
+    cam_z = rotation[0, 2] * ray_x + rotation[1, 2] * ray_y + rotation[2, 2] * ray_z
+    with np.errstate(invalid='ignore', divide='ignore'):
+        restore_x = focal * cam_x / cam_z + view_width / 2 - 0.5
+        restore_y = focal * cam_y / cam_z + view_height / 2 - 0.5
+        edge = np.minimum(np.minimum(restore_x, view_width - 1 - restore_x),
+                          np.minimum(restore_y, view_height - 1 - restore_y))
+        weight = np.clip((edge + 1) / VR_BLEND_FEATHER, 0, 1)
+        weight[~(cam_z > 0)] = 0
+    weight = np.nan_to_num(weight).astype(np.float32)
+    restore_x[weight == 0] = -1
+    restore_y[weight == 0] = -1
+    restore = cv2.convertMaps(restore_x.astype(np.float32), restore_y.astype(np.float32), cv2.CV_16SC2)
+    
+    maps = {'size': (view_width, view_height), 'extract': extract, 'restore': restore,
+            'rect': (x0, y0, x1 - x0, y1 - y0), 'weight': weight, 'inverse_weight': 1 - weight}
+    with VR_MAP_LOCK:
+        VR_MAP_CACHE[key] = maps
+        while len(VR_MAP_CACHE) > VR_MAP_CACHE_LIMIT:
+            VR_MAP_CACHE.popitem(last=False)
+    return maps
+
+
+def queue_entry_id(entry):
+    """キュー項目のIDを返す（IDのない古いキューファイルの項目には割り当てる）"""
+    return entry.setdefault('id', uuid.uuid4().hex[:12])
+
+
+class QueueListView:
+    """キュー確認画面の仮想リスト
+    
+    Canvasに見えている行だけを描画するため、数万件のキューでも開く・スクロール・並べ替えの負荷は表示行数分で済む。
+    行の本文は項目IDごとにキャッシュし、invalidate で捨てた項目だけ次の描画で作り直す。
+    選択は項目IDの集合で持つので、並べ替えや削除の後も選択が項目に付いていく。
+    entries() は現在のキュー、format_row(entry) は行の本文、row_status(entry) は (行頭の表示, 進捗0-1またはNone) を返す。
+    """
+    def __init__(self, parent, entries, format_row, row_status, on_select=None):
+        self.entries = entries
+        self.format_row = format_row
+        self.row_status = row_status
+        self.on_select = on_select
+        self.top = 0
+        self.selected = set()
+        self.anchor = None
+        self.text_cache = {}
+        self.scrollbar = tk.Scrollbar(parent, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas = tk.Canvas(parent, bg='white', highlightthickness=1, takefocus=1)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind('<Configure>', lambda e: self.redraw())
+        self.canvas.bind('<MouseWheel>', lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.canvas.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.canvas.bind('<Button-5>', lambda e: self.scroll(3))
+        self.canvas.bind('<Button-1>', lambda e: self.click(e, 'single'))
+        self.canvas.bind('<Control-Button-1>', lambda e: self.click(e, 'toggle'))
+        self.canvas.bind('<Shift-Button-1>', lambda e: self.click(e, 'range'))
+        self.canvas.bind('<Control-a>', lambda e: self.select_all())
+        self.canvas.bind('<Up>', lambda e: self.move_cursor(-1))
+        self.canvas.bind('<Down>', lambda e: self.move_cursor(1))
+        self.canvas.bind('<Prior>', lambda e: self.scroll(-self.visible_rows()))
+        self.canvas.bind('<Next>', lambda e: self.scroll(self.visible_rows()))
+
+    def exists(self):
+        return self.canvas.winfo_exists()
+
+    def visible_rows(self):
+        return max(1, self.canvas.winfo_height() // QUEUE_ROW_HEIGHT)
+
+    def invalidate(self, entries=None):
+        if entries is None:
+            self.text_cache.clear()
+            return
+        for entry in entries:
+            self.text_cache.pop(queue_entry_id(entry), None)
+
+    def row_text(self, entry):
+        entry_id = queue_entry_id(entry)
+        text = self.text_cache.get(entry_id)
+        if text is None:
+            try:
+                text = self.format_row(entry)
+            except Exception as e:
+                text = f"表示エラー: {e}"
+            self.text_cache[entry_id] = text
+        return text
+
+    def redraw(self):
+        if not self.exists():
+            return
+        queue = self.entries()
+        total = len(queue)
+        rows = self.visible_rows()
+        self.top = min(max(self.top, 0), max(0, total - rows))
+        width = self.canvas.winfo_width()
+        self.canvas.delete('all')
+        for index in range(self.top, min(total, self.top + rows + 1)):
+            entry = queue[index]
+            y = (index - self.top) * QUEUE_ROW_HEIGHT
+            marker, fraction = self.row_status(entry)
+            if queue_entry_id(entry) in self.selected:
+                self.canvas.create_rectangle(0, y, width, y + QUEUE_ROW_HEIGHT, fill='#cce0ff', width=0)
+            if fraction is not None:
+                self.canvas.create_rectangle(0, y + QUEUE_ROW_HEIGHT - 4, width * fraction, y + QUEUE_ROW_HEIGHT,
+                                             fill='#4caf50', width=0)
+            self.canvas.create_text(4, y + QUEUE_ROW_HEIGHT // 2, anchor='w', font=("MS Gothic", 10),
+                                    text=f"{index + 1}. {marker}{self.row_text(entry)}")
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + rows) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def yview(self, *args):
+        total = len(self.entries())
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = self.visible_rows() if args[2] == 'pages' else 1
+            self.top += int(args[1]) * step
+        self.redraw()
+
+    def scroll(self, rows):
+        self.top += rows
+        self.redraw()
+
+    def see(self, index):
+        rows = self.visible_rows()
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + rows:
+            self.top = index - rows + 1
+
+    def index_of(self, entry_id):
+        for index, entry in enumerate(self.entries()):
+            if queue_entry_id(entry) == entry_id:
+                return index
+        return None
+
+    def click(self, event, mode):
+        self.canvas.focus_set()
+        queue = self.entries()
+        index = self.top + event.y // QUEUE_ROW_HEIGHT
+        if not 0 <= index < len(queue):
+            if mode == 'single':
+                self.selected.clear()
+        else:
+            entry_id = queue_entry_id(queue[index])
+            if mode == 'toggle':
+                self.selected ^= {entry_id}
+                self.anchor = entry_id
+            elif mode == 'range' and self.anchor is not None:
+                anchor_index = self.index_of(self.anchor)
+                if anchor_index is None:
+                    anchor_index = index
+                low, high = sorted((anchor_index, index))
+                self.selected = {queue_entry_id(e) for e in queue[low:high + 1]}
+            else:
+                self.selected = {entry_id}
+                self.anchor = entry_id
+        self.changed()
+        return 'break'
+
+    def move_cursor(self, delta):
+        queue = self.entries()
+        if not queue:
+            return 'break'
+        index = self.index_of(self.anchor) if self.anchor is not None else None
+        index = 0 if index is None else min(max(index + delta, 0), len(queue) - 1)
+        self.anchor = queue_entry_id(queue[index])
+        self.selected = {self.anchor}
+        self.see(index)
+        self.changed()
+        return 'break'
+
+    def select_all(self):
+        self.selected = {queue_entry_id(entry) for entry in self.entries()}
+        self.changed()
+        return 'break'
+
+    def selected_entries(self):
+        """選択中の項目をキューの並び順で返す（キューから消えた項目のIDは選択から外す）"""
+        selection = [entry for entry in self.entries() if queue_entry_id(entry) in self.selected]
+        self.selected = {queue_entry_id(entry) for entry in selection}
+        return selection
+
+    def changed(self):
+        self.redraw()
+        if self.on_select:
+            self.on_select()
+
 
 class MosaicRemoverApp:
-    def __init__(self, root):
+    def __init__(self, root, profile_startup=False):
         self.root = root
+        self.profile_startup = profile_startup
         self.root.title("動画モザイク除去 GUI (VR対応 20251002-6)")
         self.root.geometry("1000x1000")
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -41,6 +1722,7 @@ class MosaicRemoverApp:
         self.actual_fps = 30.0
         self.video_total_frames = 0
         self.process = None
+        self.active_processes = []  # 並列実行中のLADAプロセス（中断時に終了させる）
         self.start_frame = 0
         self.end_frame = 0
         self.video_path = ""
@@ -53,24 +1735,105 @@ class MosaicRemoverApp:
             "quality": "15",
             "crf_value": "19"
         }
-        self.processing_queue = self.load_queue()
+        # 保存済みのキューや実績はウィンドウ表示後にバックグラウンドで読み込む（load_startup_state）
+        self.startup_loaded = threading.Event()
+        self.processing_queue = []
+        self.queue_lock = threading.RLock()
+        self.queue_view = None
+        self.running_entry = None
         self.is_batch_processing = False
         self.is_running = False
         
-        self.frame_queue = Queue(maxsize=3)
+        self.frame_ring = None
+        self.decoders = None  # DecoderPool。self.capは再生用デコーダーのVideoCapture
+        self.playback_speed = 1  # SKIM_SPEEDSのいずれか
+        self.hover_request = None
+        self.hover_thread = None
+        self.hover_window = None
         self.frame_buffer_thread = None
         self.buffer_running = False
         self.cap_lock = threading.Lock()
         self.last_frame_time = time.time()
         
-        if not os.path.exists(self.ps_script_path):
-            messagebox.showerror("エラー", "PowerShellスクリプト 'LADA_LAUNCHER_FOR_GUI.ps1' が見つかりません。")
-            self.ps_script_path = None
+        # ベンチマーク用: CPUエンコーダーの強制と工程ごとの所要時間記録
+        self.use_cpu_encoder = False
+        self.current_job_id = None
+        self.current_job_frames = 0
+        self.stage_timings = []
+        self.rss_monitor_warned = False  # psutilがない旨のログは1回だけ出す
+        
+        # VR左右分割モードで左右の目に割り当てるデバイス（例: cuda:0, cuda:1。空なら起動スクリプトの自動選択）
+        self.vr_eye_devices = []
+        
+        # 映像エンコーダーの検出結果（バックグラウンドで検出し、結果はファイルに保存して再利用）
+        self.encoder_registry_file = "encoder_registry.json"
+        self.encoder_registry = {}
+        self.encoder_ready = threading.Event()
+        self.encoder_fallback = False  # 検出待ちがタイムアウトした（次のジョブ開始までは既定のエンコーダーを使う）
+        threading.Thread(target=self.probe_encoders, daemon=True).start()
+        
+        # 工程ごとの処理実績（キュー画面の内訳表示とバッチ残り時間の推定に使用）
+        self.metrics_file = "processing_metrics.jsonl"
+        self.metrics_history_limit = 500
+        self.metrics_history = []
+        self.throughput_model_file = "throughput_model.json"
+        self.throughput_model = {'rates': {}}
+        self.progress_state = None
+        
+        # 結果キャッシュ（同一ソース・範囲・設定の処理済み出力を再利用）
+        self.result_cache_file = "result_cache.json"
+        self.use_result_cache = True
+        self.result_cache = {}
+        
+        # シーンチェンジ検出結果（パス・サイズ・更新時刻ごとにキャッシュ）
+        self.scene_cache_file = "scene_cache.json"
+        self.scene_cache = {}
+        self.scene_cuts = []
+        self.scene_token = None
+        self.scene_process = None
+        self.scene_tick_width = 0
+        
+        # ネットワーク上のソースの先行コピー（一括処理中のみ。出力フォルダのstagingに置き、処理後に削除）
+        self.staging_ahead = STAGING_AHEAD
+        self.staging_budget_gb = STAGING_BUDGET_GB
+        self.staging_bandwidth = STAGING_BANDWIDTH_MBPS
+        self.stager = None
+        
+        # 切り出し方法の自動判定結果（パス・サイズ・更新時刻ごとにキャッシュ）
+        self.trim_health_file = "trim_health.json"
+        self.trim_health_cache = {}
+        
+        # 動画ごとのプレビュー表示範囲（全体・左目・右目・指定範囲）
+        self.preview_settings_file = "preview_settings.json"
+        self.preview_settings = {}
+        self.preview_view = None
+        self.preview_layout = None  # 表示中の画像の位置と大きさ (x, y, w, h)（範囲指定のドラッグ用）
+        self.preview_rgb = None
+        self.preview_drag = None
+        
+        # 監視フォルダ（新しい動画を現在の設定で自動的にキューへ登録する）
+        self.hot_folder_path = ""
+        self.hot_folder_autostart = True
+        self.hot_folder_state_file = "hotfolder_state.json"
+        self.hot_folder_watcher = None
+        
+        # プレビュー用プロキシ（出力フォルダのproxyに作成し、proxy_cache.jsonで管理）
+        self.proxy_manager = ProxyManager(os.path.join(self.output_dir, "proxy"), "proxy_cache.json", self.write_log)
+        self.proxy_progress = None
+        
+        # クイック確認（結果は区間・設定ごとに出力フォルダのquicklookにキャッシュ）
+        self.quick_look_dir = os.path.join(self.output_dir, "quicklook")
+        self.quick_look_worker = None
+        self.quick_look_process = None
+        self.quick_look_window = None
+        self.quick_look_caps = None
+        
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
         
-        self.create_widgets()
-        self.load_config()
+        with startup_phase("ウィジェット作成"):
+            self.create_widgets()
+        self.root.after(0, self.finish_startup)
         self.root.after(100, self.update_preview)
         
         self.fullscreen_window = None
@@ -80,6 +1843,54 @@ class MosaicRemoverApp:
         self.fullscreen_end_marker = None
         self.fullscreen_progress_text = None
 
+    def finish_startup(self):
+        """ウィンドウ表示後の初期化（設定の反映、起動スクリプトの確認、保存済み状態の読み込み開始）"""
+        STARTUP_TIMINGS.append(("ウィンドウ表示まで（起動から）", time.perf_counter() - MODULE_LOAD_STARTED))
+        with startup_phase("設定読み込み"):
+            self.load_config()
+        if not os.path.exists(self.ps_script_path):
+            messagebox.showerror("エラー", "PowerShellスクリプト 'LADA_LAUNCHER_FOR_GUI.ps1' が見つかりません。")
+            self.ps_script_path = None
+        threading.Thread(target=self.load_startup_state, daemon=True).start()
+
+    def load_startup_state(self):
+        """キュー、処理実績、処理時間推定モデル、各キャッシュを読み込む（作業スレッドで実行）"""
+        with startup_phase("状態ファイル読み込み（バックグラウンド）"):
+            queue = self.load_queue()
+            self.metrics_history = self.load_metrics_history() + self.metrics_history
+            self.throughput_model = self.load_throughput_model()
+            self.result_cache = {**self.load_result_cache(), **self.result_cache}
+            self.scene_cache = {**self.load_scene_cache(), **self.scene_cache}
+            self.trim_health_cache = {**self.load_trim_health_cache(), **self.trim_health_cache}
+            self.preview_settings = {**self.load_preview_settings(), **self.preview_settings}
+            self.proxy_manager.load()
+        with self.queue_lock:
+            # 読み込み中に追加された項目は保存済みのキューの後ろに並べる
+            added = len(self.processing_queue)
+            self.processing_queue[:0] = queue
+            self.startup_loaded.set()
+            if added:
+                self.save_queue()
+        self.root.after(0, self.on_startup_state_loaded)
+
+    def on_startup_state_loaded(self):
+        self.refresh_queue_window()
+        if self.hot_folder_var.get():
+            self.start_hot_folder()
+        if self.profile_startup:
+            self.report_startup_profile()
+
+    def report_startup_profile(self):
+        """起動処理の所要時間と、遅延importの所要時間を表示して終了する（--profile-startup）"""
+        STARTUP_TIMINGS.append(("起動完了まで（起動から）", time.perf_counter() - MODULE_LOAD_STARTED))
+        # 最初の動画読み込み時に掛かるimportの時間も計測する
+        for module in (cv2, np, Image, ImageTk):
+            module._load()
+        lines = ["起動プロファイル:"] + [f"  {name:<44}{seconds * 1000:>9.1f} ms" for name, seconds in STARTUP_TIMINGS]
+        print("\n".join(lines), flush=True)
+        self.write_log("\n".join(lines))
+        self.on_closing()
+
     def bind_keys(self, window):
         window.bind('<Right>', self.move_frame)
         window.bind('<Left>', self.move_frame)
@@ -90,14 +1901,22 @@ class MosaicRemoverApp:
         window.bind('<Down>', self.jump_to_end)
         window.bind('<Control-Up>', self.set_start_point_by_key)
         window.bind('<Control-Down>', self.set_end_point_by_key)
+        window.bind('<Control-Shift-Up>', lambda e: self.snap_point_to_scene_cut('start'))
+        window.bind('<Control-Shift-Down>', lambda e: self.snap_point_to_scene_cut('end'))
+        window.bind('<Prior>', lambda e: self.jump_to_scene_cut(-1))
+        window.bind('<Next>', lambda e: self.jump_to_scene_cut(1))
         window.bind('<Control-e>', self.add_to_queue)
         window.bind('<Control-q>', lambda e: self.open_queue_window())
         window.bind('<Control-r>', lambda e: self.reset_points())
+        window.bind('q', lambda e: self.quick_look())
+        window.bind('v', lambda e: self.cycle_preview_view())
         window.bind('f', self.toggle_fullscreen)
         window.bind('j', self.move_one_frame_backward)
         window.bind('k', self.toggle_play_pause)
         window.bind('l', self.move_one_frame_forward)
         window.bind('h', self.move_one_second_backward)
+        window.bind('<bracketleft>', lambda e: self.change_playback_speed(-1))
+        window.bind('<bracketright>', lambda e: self.change_playback_speed(1))
         window.bind(';', self.move_one_second_forward)
         window.bind('<Home>', lambda e: self.set_frame_and_start(0))
         window.bind('<End>', lambda e: self.set_frame_and_end(self.video_total_frames))
@@ -109,38 +1928,12 @@ class MosaicRemoverApp:
     def jump_to_video_start(self, event=None):
         if not self.cap or not self.cap.isOpened():
             return
-        self.current_frame = 0
-        self.clear_frame_queue()
-        with self.cap_lock:
-            try:
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                ret, frame = self.cap.read()
-                if ret:
-                    self.display_frame(frame)
-                    if self.fullscreen_window:
-                        self.display_frame_fullscreen(frame)
-                self.on_progress_update()
-                self.update_time_labels()
-            except Exception as e:
-                self.write_log(f"動画先頭ジャンプエラー: {e}")
+        self.show_frame_at(0, "動画先頭ジャンプエラー")
 
     def jump_to_video_end(self, event=None):
         if not self.cap or not self.cap.isOpened():
             return
-        self.current_frame = max(0, self.video_total_frames - 1)
-        self.clear_frame_queue()
-        with self.cap_lock:
-            try:
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
-                ret, frame = self.cap.read()
-                if ret:
-                    self.display_frame(frame)
-                    if self.fullscreen_window:
-                        self.display_frame_fullscreen(frame)
-                self.on_progress_update()
-                self.update_time_labels()
-            except Exception as e:
-                self.write_log(f"動画末尾ジャンプエラー: {e}")
+        self.show_frame_at(max(0, self.video_total_frames - 1), "動画末尾ジャンプエラー")
 
     def exit_fullscreen(self, event=None):
         if self.fullscreen_window:
@@ -159,58 +1952,42 @@ class MosaicRemoverApp:
 
     def set_frame_and_start(self, frame):
         if self.cap and self.cap.isOpened():
-            self.current_frame = frame
-            self.clear_frame_queue()
-            with self.cap_lock:
-                try:
-                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame)
-                    ret, frame_data = self.cap.read()
-                    if ret:
-                        self.display_frame(frame_data)
-                        if self.fullscreen_window:
-                            self.display_frame_fullscreen(frame_data)
-                    self.on_progress_update()
-                    self.update_time_labels()
-                    self.set_start_point_by_key()
-                except Exception as e:
-                    self.write_log(f"先頭フレーム設定エラー: {e}")
+            self.show_frame_at(frame, "先頭フレーム設定エラー")
+            self.set_start_point_by_key()
 
     def set_frame_and_end(self, frame):
         if self.cap and self.cap.isOpened():
-            self.current_frame = frame
-            self.clear_frame_queue()
-            with self.cap_lock:
-                try:
-                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame)
-                    ret, frame_data = self.cap.read()
-                    if ret:
-                        self.display_frame(frame_data)
-                        if self.fullscreen_window:
-                            self.display_frame_fullscreen(frame_data)
-                    self.on_progress_update()
-                    self.update_time_labels()
-                    self.set_end_point_by_key()
-                except Exception as e:
-                    self.write_log(f"末尾フレーム設定エラー: {e}")
+            self.show_frame_at(frame, "末尾フレーム設定エラー")
+            self.set_end_point_by_key()
 
     def load_queue(self):
         if os.path.exists(self.queue_file):
             try:
                 with open(self.queue_file, 'r', encoding='utf-8') as f:
                     queue = json.load(f)
+                    for entry in queue:
+                        queue_entry_id(entry)
                     self.write_log(f"キューを読み込みました: {len(queue)} 項目")
                     return queue
             except Exception as e:
                 self.write_log(f"キュー読み込みエラー: {e}")
-                messagebox.showwarning("警告", f"キュー読み込みに失敗しました: {e}。空のキューで続行します。")
+                self.root.after(0, lambda: messagebox.showwarning(
+                    "警告", f"キュー読み込みに失敗しました: {e}。空のキューで続行します。"))
                 return []
         self.write_log("キューが存在しません。新規作成します。")
         return []
 
     def save_queue(self):
+        # 保存済みのキューを読み込む前に保存すると、読み込み前の内容を上書きしてしまう
+        if not self.startup_loaded.is_set():
+            return
         try:
-            with open(self.queue_file, 'w', encoding='utf-8') as f:
-                json.dump(self.processing_queue, f, ensure_ascii=False, indent=2)
+            # 書き込み途中で落ちても壊れたキューが残らないよう一時ファイルに書いてから置き換える
+            temp_file = self.queue_file + '.tmp'
+            with self.queue_lock:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.processing_queue, f, ensure_ascii=False)
+                os.replace(temp_file, self.queue_file)
         except Exception as e:
             self.write_log(f"キュー保存エラー: {e}")
             messagebox.showwarning("警告", f"キュー保存に失敗しました: {e}。手動で確認してください。")
@@ -278,11 +2055,17 @@ class MosaicRemoverApp:
         self.video_label.bind("<Button-1>", self.toggle_play_pause)
         self.video_label.bind("<Double-Button-1>", self.toggle_fullscreen)
         self.video_label.bind("<MouseWheel>", self.on_mouse_wheel)
+        # Shift+ドラッグでプレビューの表示範囲を指定する
+        self.video_label.bind("<Shift-Button-1>", self.on_preview_drag_start)
+        self.video_label.bind("<Shift-B1-Motion>", self.on_preview_drag_move)
+        self.video_label.bind("<Shift-ButtonRelease-1>", self.on_preview_drag_end)
 
         self.progress_canvas = tk.Canvas(preview_frame, height=20, bg="grey")
         self.progress_canvas.grid(row=1, column=0, sticky="ew", pady=2)
         self.progress_canvas.bind("<Button-1>", self.on_progress_click)
         self.progress_canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.progress_canvas.bind("<Motion>", self.on_progress_hover)
+        self.progress_canvas.bind("<Leave>", self.hide_hover_preview)
         self.progress_bar = self.progress_canvas.create_rectangle(0, 0, 0, 20, fill="green")
         self.start_marker = self.progress_canvas.create_line(0, 0, 0, 20, fill="red", width=2)
         self.end_marker = self.progress_canvas.create_line(0, 0, 0, 20, fill="blue", width=2)
@@ -301,6 +2084,13 @@ class MosaicRemoverApp:
         
         self.set_end_button = tk.Button(control_range_frame, text="終了点を指定", command=self.set_end_point)
         self.set_end_button.pack(side=tk.LEFT, padx=5)
+        
+        self.quick_look_button = tk.Button(control_range_frame, text="クイック確認", command=self.quick_look)
+        self.quick_look_button.pack(side=tk.LEFT, padx=(15, 0))
+        self.quick_look_reduced_var = tk.BooleanVar(value=True)
+        self.quick_look_reduced_var.trace_add("write", self.save_config_callback)
+        self.quick_look_reduced_check = Checkbutton(control_range_frame, text="縮小", variable=self.quick_look_reduced_var)
+        self.quick_look_reduced_check.pack(side=tk.LEFT)
 
         time_display_frame = tk.Frame(preview_frame)
         time_display_frame.grid(row=3, column=0, pady=2, padx=100)
@@ -313,12 +2103,27 @@ class MosaicRemoverApp:
         
         self.reset_button = tk.Button(time_display_frame, text="範囲リセット", command=self.reset_points)
         self.reset_button.pack(side=tk.LEFT, padx=10)
+        
+        self.preview_hw_decode_var = tk.BooleanVar(value=True)
+        self.preview_hw_decode_check = Checkbutton(time_display_frame, text="HWデコード", variable=self.preview_hw_decode_var, command=self.on_hw_decode_toggle)
+        self.preview_hw_decode_check.pack(side=tk.LEFT, padx=5)
+        self.preview_proxy_var = tk.BooleanVar(value=True)
+        self.preview_proxy_check = Checkbutton(time_display_frame, text="プロキシ", variable=self.preview_proxy_var, command=self.on_preview_proxy_toggle)
+        self.preview_proxy_check.pack(side=tk.LEFT)
+        tk.Label(time_display_frame, text="表示:").pack(side=tk.LEFT, padx=(5, 0))
+        self.preview_view_var = tk.StringVar(value=PREVIEW_VIEWS['full'])
+        self.preview_view_menu = tk.OptionMenu(time_display_frame, self.preview_view_var, *PREVIEW_VIEWS.values(),
+                                               command=self.on_preview_view_change)
+        self.preview_view_menu.pack(side=tk.LEFT)
+        self.decoder_label = tk.Label(time_display_frame, text="", fg="gray")
+        self.decoder_label.pack(side=tk.LEFT)
 
         ffmpeg_frame = tk.LabelFrame(main_frame, text="4. 動画切り出し設定", padx=10, pady=10)
         ffmpeg_frame.grid(row=3, column=0, sticky="ew", pady=5)
         
-        self.ffmpeg_option_var = tk.StringVar(value="re_encode")
+        self.ffmpeg_option_var = tk.StringVar(value="auto")
         
+        tk.Radiobutton(ffmpeg_frame, text="自動判定", variable=self.ffmpeg_option_var, value="auto").pack(side=tk.LEFT, padx=5)
         tk.Radiobutton(ffmpeg_frame, text="-c copy (高速)", variable=self.ffmpeg_option_var, value="copy").pack(side=tk.LEFT, padx=5)
         tk.Radiobutton(ffmpeg_frame, text="-c copy +genpts (タイムスタンプ修正)", variable=self.ffmpeg_option_var, value="copy_genpts").pack(side=tk.LEFT, padx=5)
         tk.Radiobutton(ffmpeg_frame, text="再エンコード (NVENC)", variable=self.ffmpeg_option_var, value="re_encode").pack(side=tk.LEFT, padx=5)
@@ -331,6 +2136,14 @@ class MosaicRemoverApp:
         self.crf_menu = tk.OptionMenu(ffmpeg_frame, self.crf_var, *crf_values)
         self.crf_menu.pack(side=tk.LEFT, padx=5)
         
+        self.roi_crop_var = tk.BooleanVar(value=False)
+        self.roi_crop_var.trace_add("write", self.save_config_callback)
+        self.roi_crop_check = Checkbutton(ffmpeg_frame, text="モザイク領域のみ処理", variable=self.roi_crop_var)
+        self.roi_crop_check.pack(side=tk.LEFT, padx=(15, 5))
+        
+        self.schedule_policy_var = tk.StringVar(value=SCHEDULE_POLICIES['fifo'])
+        self.schedule_policy_var.trace_add("write", self.save_config_callback)
+
         self.batch_count_label = tk.Label(ffmpeg_frame, text="", fg="blue")
         self.batch_count_label.pack(side=tk.RIGHT, padx=5)
 
@@ -345,6 +2158,17 @@ class MosaicRemoverApp:
         self.vr_simple_mode_var = tk.BooleanVar(value=True)  # デフォルトをTrueに変更
         self.vr_simple_mode_check = Checkbutton(vr_frame, text="簡易処理モード(中央70%のみ)", variable=self.vr_simple_mode_var, state=tk.DISABLED)  # 変更不可に設定
         self.vr_simple_mode_check.pack(side=tk.LEFT, padx=5)
+        
+        self.vr_per_eye_var = tk.BooleanVar(value=False)
+        self.vr_per_eye_var.trace_add("write", self.save_config_callback)
+        self.vr_per_eye_check = Checkbutton(vr_frame, text="左右の目を分けて並列処理", variable=self.vr_per_eye_var)
+        self.vr_per_eye_check.pack(side=tk.LEFT, padx=5)
+        
+        tk.Label(vr_frame, text="投影:").pack(side=tk.LEFT, padx=(10, 0))
+        self.vr_projection_var = tk.StringVar(value=VR_PROJECTIONS['hequirect'])
+        self.vr_projection_var.trace_add("write", self.save_config_callback)
+        self.vr_projection_menu = tk.OptionMenu(vr_frame, self.vr_projection_var, *VR_PROJECTIONS.values())
+        self.vr_projection_menu.pack(side=tk.LEFT, padx=5)
 
         control_frame = tk.Frame(main_frame, pady=10)
         control_frame.grid(row=5, column=0, sticky="ew")
@@ -357,6 +2181,12 @@ class MosaicRemoverApp:
         self.show_completion_dialog_check = Checkbutton(control_frame, text="完了ダイアログを表示", variable=self.show_completion_dialog_var)
         self.show_completion_dialog_check.pack(side=tk.LEFT, padx=5)
         
+        self.hot_folder_var = tk.BooleanVar(value=False)
+        self.hot_folder_check = Checkbutton(control_frame, text="監視フォルダ", variable=self.hot_folder_var, command=self.on_hot_folder_toggle)
+        self.hot_folder_check.pack(side=tk.LEFT, padx=(5, 0))
+        self.hot_folder_button = tk.Button(control_frame, text="...", command=self.choose_hot_folder)
+        self.hot_folder_button.pack(side=tk.LEFT, padx=(0, 5))
+        
         self.queue_view_button = tk.Button(control_frame, text="キュー確認", command=self.open_queue_window)
         self.queue_view_button.pack(side=tk.LEFT, padx=5)
         
@@ -387,6 +2217,11 @@ class MosaicRemoverApp:
         lada_info_frame = tk.LabelFrame(main_frame, text="LADA処理情報", padx=10, pady=10)
         lada_info_frame.grid(row=6, column=0, sticky="nsew", pady=5)
 
+        self.batch_progress_canvas = tk.Canvas(lada_info_frame, height=14, bg="grey", highlightthickness=0)
+        self.batch_progress_canvas.pack(fill=tk.X, pady=(0, 2))
+        self.batch_progress_bar = self.batch_progress_canvas.create_rectangle(0, 0, 0, 14, fill="orange", width=0)
+        self.batch_progress_text = self.batch_progress_canvas.create_text(5, 7, anchor="w", fill="white", text="", font=("MS Gothic", 9))
+
         self.console_text = scrolledtext.ScrolledText(lada_info_frame, height=5, state=tk.DISABLED)
         self.console_text.pack(fill=tk.BOTH, expand=True, pady=10)
         
@@ -401,27 +2236,787 @@ class MosaicRemoverApp:
             # VRモードOFF: 簡易処理モードのチェックは維持するが操作不可のまま
             pass
     
-    def apply_vr_undistortion(self, input_file, output_file, unique_id):
-        """180度SBS映像 - 中央領域を抽出（面積約70%）"""
+    def build_launcher_command(self):
+        """LADA起動コマンドを生成（.ps1以外はPythonスクリプトとして実行する）"""
+        if self.ps_script_path.lower().endswith('.ps1'):
+            return ["powershell.exe", "-ExecutionPolicy", "Bypass", "-File", self.ps_script_path]
+        return [sys.executable, self.ps_script_path]
+
+    def run_launcher(self, input_path, settings):
+        """LADA起動スクリプトを実行して出力をコンソールに表示し、終了コードを返す"""
+        input_data = f"{input_path}\n{settings['model']}\n{settings['tvai']}\n{settings['quality']}\n"
+
+        process = self.process = subprocess.Popen(
+            self.build_launcher_command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            creationflags=CREATE_NO_WINDOW
+        )
+
+        process.stdin.write(input_data)
+        process.stdin.flush()
+        process.stdin.close()
+
+        for line in iter(process.stdout.readline, ''):
+            self.show_launcher_line(line)
+
+        process.stdout.close()
+        process.wait()
+        return process.returncode
+
+    def show_launcher_line(self, line):
+        """起動スクリプトの出力1行をコンソールに表示し、進捗行は進捗表示に反映する"""
         self.console_text.config(state=tk.NORMAL)
-        self.console_text.insert(tk.END, f"VR映像の中央領域を抽出中（面積70%）...\n")
+        self.console_text.insert(tk.END, line)
+        self.console_text.see(tk.END)
         self.console_text.config(state=tk.DISABLED)
-        self.write_log("VR中央領域抽出開始（面積70%）")
+        if line.strip().startswith("Processing frames:"):
+            self.set_item_progress(line)
+        else:
+            self.write_log(line.strip())
+        self.root.update()
+
+    def read_process_lines(self, process, label, lines):
+        """プロセスの出力を1行ずつキューに送り、終了時にNoneを送る（並列実行用の読み取りスレッド）"""
+        for line in iter(process.stdout.readline, ''):
+            lines.put((label, line))
+        process.stdout.close()
+        lines.put((label, None))
+
+    def run_launchers_parallel(self, jobs, settings):
+        """複数の入力を同時にLADA処理し、終了コードのリストを返す
         
-        # 面積70%なら縦横83.7%（√0.7 ≈ 0.837）
-        crop_center_cmd = [
+        jobs: (表示名, 入力ファイル, デバイス) のリスト。デバイスは環境変数LADA_DEVICEで起動スクリプトに渡す。
+        出力は表示名を付けてコンソールに表示し、進捗は全入力の合計フレーム数で表示する。
+        """
+        lines = Queue()
+        processes = []
+        for label, input_path, device in jobs:
+            env = os.environ.copy()
+            if device:
+                env['LADA_DEVICE'] = device
+            process = subprocess.Popen(
+                self.build_launcher_command(),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                env=env,
+                creationflags=CREATE_NO_WINDOW
+            )
+            process.stdin.write(f"{input_path}\n{settings['model']}\n{settings['tvai']}\n{settings['quality']}\n")
+            process.stdin.flush()
+            process.stdin.close()
+            processes.append(process)
+            self.active_processes.append(process)
+            threading.Thread(target=self.read_process_lines, args=(process, label, lines), daemon=True).start()
+            self.write_log(f"LADA並列処理開始 [{label}] デバイス: {device or '自動'}")
+        
+        progress = {}
+        finished = 0
+        while finished < len(processes):
+            label, line = lines.get()
+            if line is None:
+                finished += 1
+                continue
+            match = re.search(r'(\d+)/(\d+)', line) if line.strip().startswith("Processing frames:") else None
+            if match:
+                progress[label] = (int(match.group(1)), int(match.group(2)))
+                done = sum(current for current, _ in progress.values())
+                total = sum(count for _, count in progress.values())
+                self.show_launcher_line(f"Processing frames: {done}/{total}\n")
+            else:
+                self.show_launcher_line(f"[{label}] {line}")
+        
+        for process in processes:
+            process.wait()
+            if process in self.active_processes:
+                self.active_processes.remove(process)
+        return [process.returncode for process in processes]
+
+    def get_current_settings(self):
+        """現在のGUI設定から処理設定を作成する（単一処理用）"""
+        return {
+            'model': self.model_var.get(),
+            'tvai': self.tvai_var.get(),
+            'quality': int(self.quality_var.get()),
+            'crf_value': int(self.crf_var.get()),
+            'ffmpeg_option': self.ffmpeg_option_var.get(),
+            'save_trimmed': self.save_trimmed_video_var.get(),
+            'vr_processing': self.vr_processing_var.get(),
+            'vr_simple_mode': self.vr_simple_mode_var.get(),
+            'vr_per_eye': self.vr_per_eye_var.get(),
+            'vr_projection': self.get_vr_projection(),
+            'roi_crop': self.roi_crop_var.get()
+        }
+
+    def get_entry_settings(self, entry):
+        """キュー項目に保存された処理設定を返す（古いキューファイルの欠損項目は既定値で補う）"""
+        return {
+            'model': entry.get('model', '1'),
+            'tvai': entry.get('tvai', '2'),
+            'quality': int(entry.get('quality', 15)),
+            'crf_value': int(entry.get('crf_value', 19)),
+            'ffmpeg_option': entry.get('ffmpeg_option', 're_encode'),
+            'save_trimmed': entry.get('save_trimmed', False),
+            'vr_processing': entry.get('vr_processing', False),
+            'vr_simple_mode': entry.get('vr_simple_mode', True),
+            'vr_per_eye': entry.get('vr_per_eye', False),
+            'vr_projection': entry.get('vr_projection', 'crop'),
+            'roi_crop': entry.get('roi_crop', False)
+        }
+
+    def settings_signature(self, settings):
+        """出力結果に影響する設定項目のみを取り出す（中間ファイル保存の有無は含めない）"""
+        signature = {k: v for k, v in settings.items() if k != 'save_trimmed'}
+        if not signature['vr_processing']:
+            signature.pop('vr_simple_mode', None)
+            signature.pop('vr_per_eye', None)
+            signature.pop('vr_projection', None)
+        if not signature.get('vr_per_eye'):
+            signature.pop('vr_per_eye', None)
+        if signature.get('vr_projection') == 'crop':
+            signature.pop('vr_projection', None)
+        if signature['ffmpeg_option'] not in ('re_encode', 'auto'):
+            signature.pop('crf_value', None)
+        if not signature.get('roi_crop'):
+            signature.pop('roi_crop', None)
+        return signature
+
+    def queue_entry_key(self, entry):
+        """キュー項目の重複判定キー（同一ファイル・同一範囲・同一設定）"""
+        path = os.path.normcase(os.path.abspath(entry['video_path']))
+        settings = json.dumps(self.settings_signature(self.get_entry_settings(entry)), sort_keys=True)
+        return (path, entry['start_frame'], entry['end_frame'], settings)
+
+    def find_duplicate_entry(self, queue_entry):
+        """待機中のキューに同一ジョブがあればその項目を返す"""
+        key = self.queue_entry_key(queue_entry)
+        with self.queue_lock:
+            for entry in self.processing_queue:
+                if entry is not self.running_entry and self.queue_entry_key(entry) == key:
+                    return entry
+        return None
+
+    def remove_duplicate_entries(self):
+        """キュー内の重複ジョブを取り除き、取り除いた件数を返す"""
+        removed = 0
+        with self.queue_lock:
+            # 実行中の項目は位置に関係なく残し、同じジョブの待機中の項目を取り除く
+            running = [e for e in self.processing_queue if e is self.running_entry]
+            seen = {self.queue_entry_key(e) for e in running}
+            unique_entries = []
+            for entry in self.processing_queue:
+                key = self.queue_entry_key(entry)
+                if entry is self.running_entry:
+                    unique_entries.append(entry)
+                    continue
+                if key in seen:
+                    removed += 1
+                    continue
+                seen.add(key)
+                unique_entries.append(entry)
+            if removed:
+                self.processing_queue[:] = unique_entries
+                self.save_queue()
+        return removed
+
+    def source_fingerprint(self, input_file):
+        """ソース動画の指紋（サイズ、更新時刻、先頭・中央・末尾64KBのハッシュ）"""
+        stat = os.stat(input_file)
+        digest = hashlib.sha1()
+        chunk_size = 64 * 1024
+        with open(input_file, 'rb') as f:
+            for offset in (0, max(0, stat.st_size // 2 - chunk_size // 2), max(0, stat.st_size - chunk_size)):
+                f.seek(offset)
+                digest.update(f.read(chunk_size))
+        return f"{stat.st_size}-{stat.st_mtime_ns}-{digest.hexdigest()}"
+
+    def launcher_version(self):
+        """起動スクリプトの内容ハッシュ（スクリプト更新時にキャッシュを無効化する）"""
+        try:
+            with open(self.ps_script_path, 'rb') as f:
+                return hashlib.sha1(f.read()).hexdigest()[:12]
+        except (OSError, TypeError):
+            return "unknown"
+
+    def build_result_cache_key(self, input_file, start_time_str, end_time_str, settings):
+        try:
+            fingerprint = self.source_fingerprint(input_file)
+        except OSError:
+            return None
+        key_data = {
+            'source': fingerprint,
+            'start': start_time_str,
+            'end': end_time_str,
+            'settings': self.settings_signature(settings),
+            'launcher': self.launcher_version()
+        }
+        return hashlib.sha1(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def load_result_cache(self):
+        if os.path.exists(self.result_cache_file):
+            try:
+                with open(self.result_cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                self.write_log(f"結果キャッシュ読み込みエラー: {str(e)}")
+        return {}
+
+    def save_result_cache(self):
+        try:
+            with open(self.result_cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self.result_cache, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            self.write_log(f"結果キャッシュ保存エラー: {str(e)}")
+
+    def lookup_result_cache(self, cache_key):
+        """キャッシュ済みの出力が存在しサイズが一致すればそのパスを返す"""
+        if not self.use_result_cache or not cache_key:
+            return None
+        cached = self.result_cache.get(cache_key)
+        if not cached:
+            return None
+        output_path = cached['output']
+        if os.path.exists(output_path) and os.path.getsize(output_path) == cached['size']:
+            return output_path
+        # 出力が削除・変更されている場合はキャッシュから外す
+        del self.result_cache[cache_key]
+        self.save_result_cache()
+        return None
+
+    def store_result_cache(self, cache_key, input_file, output_path):
+        if not self.use_result_cache or not cache_key or not os.path.exists(output_path):
+            return
+        self.result_cache[cache_key] = {
+            'source': input_file,
+            'output': output_path,
+            'size': os.path.getsize(output_path),
+            'created': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        self.save_result_cache()
+
+    def probe_audio_codec(self, file_path):
+        """先頭の音声ストリームのコーデック名を返す（音声なしは''、判定できない場合はNone）"""
+        try:
+            result = subprocess.run(['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+                                     '-show_entries', 'stream=codec_name', '-of', 'csv=p=0', file_path],
+                                    capture_output=True, text=True, errors='replace', timeout=60,
+                                    creationflags=CREATE_NO_WINDOW)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if result.returncode != 0:
+            return None
+        lines = result.stdout.split()
+        return lines[0].strip(',') if lines else ''
+
+    def get_audio_args(self, source_file, output_ext):
+        """元の音声を出力へそのまま渡すための引数（コンテナが対応していればストリームコピー）"""
+        codec = self.probe_audio_codec(source_file)
+        if codec is None:
+            self.write_log("音声コーデックを判定できないためAACに変換します")
+            return ['-c:a', 'aac', '-b:a', '192k']
+        if not codec:
+            return []
+        if output_ext.lower() in ('.mp4', '.m4v', '.mov') and codec not in MP4_AUDIO_COPY_CODECS:
+            self.write_log(f"音声コーデック {codec} はMP4にコピーできないためAACに変換します")
+            return ['-c:a', 'aac', '-b:a', '192k']
+        return ['-c:a', 'copy']
+
+    def get_ffmpeg_version(self):
+        try:
+            result = subprocess.run(['ffmpeg', '-hide_banner', '-version'], capture_output=True, text=True,
+                                    errors='replace', creationflags=CREATE_NO_WINDOW)
+        except OSError:
+            return None
+        first_line = result.stdout.splitlines()[0] if result.stdout else ''
+        return first_line or None
+
+    def list_ffmpeg_encoders(self):
+        """ffmpeg -encoders から利用可能な映像エンコーダー名の集合を返す"""
+        try:
+            result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'], capture_output=True, text=True,
+                                    errors='replace', creationflags=CREATE_NO_WINDOW)
+        except OSError:
+            return set()
+        return set(re.findall(r'^\s*V\S*\s+(\S+)', result.stdout, re.MULTILINE))
+
+    def test_encoder(self, candidate):
+        """合成映像を短くエンコードして動作確認し、処理速度（fps）を返す（失敗時はNone）"""
+        frames = 60
+        command = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+            '-f', 'lavfi', '-i', f'testsrc2=size=1920x1080:rate=30:duration={frames / 30}',
+            *(['-vf', candidate['filter']] if candidate.get('filter') else []),
+            '-c:v', candidate['codec'], *[arg.replace('{cq}', '23') for arg in candidate['args']],
+            '-f', 'null', '-'
+        ]
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(command, capture_output=True, timeout=60, creationflags=CREATE_NO_WINDOW)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0 or elapsed <= 0:
+            return None
+        return frames / elapsed
+
+    def probe_encoders(self, force=False):
+        """映像エンコーダーを検出・計測する（ffmpegが同じであれば保存済みの結果を使う）"""
+        try:
+            version = self.get_ffmpeg_version()
+            if not force and os.path.exists(self.encoder_registry_file):
+                try:
+                    with open(self.encoder_registry_file, 'r', encoding='utf-8') as f:
+                        registry = json.load(f)
+                    if registry.get('ffmpeg') == version and \
+                            registry.get('candidates') == [c['name'] for c in ENCODER_CANDIDATES]:
+                        self.encoder_registry = registry
+                        return
+                except (OSError, ValueError) as e:
+                    self.write_log(f"エンコーダー検出結果の読み込みエラー: {str(e)}")
+            if version is None:
+                self.write_log("ffmpegが見つからないためエンコーダーを検出できません")
+                return
+            
+            self.write_log("映像エンコーダーを検出中...")
+            available = self.list_ffmpeg_encoders()
+            results = {}
+            for candidate in ENCODER_CANDIDATES:
+                if candidate['codec'] not in available:
+                    continue
+                fps = self.test_encoder(candidate)
+                results[candidate['name']] = {'ok': fps is not None, 'fps': round(fps, 1) if fps else 0}
+                self.write_log(f"エンコーダー検出 {candidate['name']}: "
+                               + (f"{fps:.1f} fps" if fps else "使用不可"))
+            registry = {
+                'ffmpeg': version,
+                'probed': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'candidates': [c['name'] for c in ENCODER_CANDIDATES],
+                'results': results
+            }
+            self.encoder_registry = registry
+            try:
+                with open(self.encoder_registry_file, 'w', encoding='utf-8') as f:
+                    json.dump(registry, f, ensure_ascii=False, indent=2)
+            except OSError as e:
+                self.write_log(f"エンコーダー検出結果の保存エラー: {str(e)}")
+        finally:
+            self.encoder_ready.set()
+            if self.encoder_registry.get('results') is not None:
+                self.write_log(f"使用エンコーダー: 中間={self.get_encoder('intermediate')['name']}, "
+                               f"出力={self.get_encoder('final')['name']}")
+
+    def get_encoder(self, role):
+        """役割（intermediate/final）ごとに、動作確認済みのエンコーダー候補を返す
+        
+        中間ファイルは最も速いもの、出力はENCODER_CANDIDATESの並び順で最初に使えるもの（H.264・同等画質）を選ぶ。
+        検出がENCODER_WAIT_TIMEOUT秒以内に終わらなければ役割ごとの既定（libx264）を使う。
+        """
+        candidates = {c['name']: c for c in ENCODER_CANDIDATES}
+        fallback = candidates[FALLBACK_ENCODERS[role]]
+        if self.use_cpu_encoder or self.encoder_fallback:
+            return fallback
+        if not self.encoder_ready.wait(ENCODER_WAIT_TIMEOUT):
+            # 同じジョブの途中でエンコーダー（中間ファイルの拡張子）が変わらないよう、次のジョブ開始までは既定を使い続ける
+            self.encoder_fallback = True
+            self.write_log("エンコーダー検出が終わらないため、検出が終わるまでlibx264を使用します")
+            return fallback
+        results = self.encoder_registry.get('results', {})
+        working = [c for c in ENCODER_CANDIDATES
+                   if role in c['roles'] and results.get(c['name'], {}).get('ok')]
+        if not working:
+            return fallback
+        if role == 'final':
+            return working[0]
+        return max(working, key=lambda c: results[c['name']]['fps'])
+
+    def get_intermediate_ext(self):
+        """中間ファイルの拡張子（可逆中間コーデックはMKVが必要）"""
+        return self.get_encoder('intermediate').get('ext', '.mp4')
+
+    def get_video_encoder_args(self, role, cq):
+        """映像エンコーダーの引数を返す（role: 'intermediate'=中間ファイル, 'final'=出力）"""
+        encoder = self.get_encoder(role)
+        return ['-c:v', encoder['codec'], *[arg.replace('{cq}', str(cq)) for arg in encoder['args']]]
+
+    def get_video_filter(self, role, *filters):
+        """映像フィルターにエンコーダーが必要とする前処理（VAAPIのhwupload等）を連結する"""
+        return ','.join(f for f in (*filters, self.get_encoder(role).get('filter')) if f)
+
+    @contextmanager
+    def measure_stage(self, stage, input_path=None, output_path=None):
+        """処理工程のスパン（所要時間、入出力サイズ、処理fps、子プロセスのピークRSS）を記録する"""
+        record = {'stage': stage, 'job': self.current_job_id, 'bytes_written': 0}
+        monitor = self.start_child_rss_monitor()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['elapsed'] = time.perf_counter() - start
+            record['peak_rss'] = self.stop_child_rss_monitor(monitor)
+            if input_path and os.path.exists(input_path):
+                record['input_bytes'] = os.path.getsize(input_path)
+            if output_path and os.path.exists(output_path):
+                record['bytes_written'] = os.path.getsize(output_path)
+            if self.current_job_frames and record['elapsed'] > 0 and stage not in ('rename', 'cache_link'):
+                record['fps'] = self.current_job_frames / record['elapsed']
+            self.stage_timings.append(record)
+            self.write_log(f"工程時間 {self.format_stage_record(record)}")
+
+    def start_child_rss_monitor(self):
+        """子プロセス（ffmpeg、PowerShell、lada-cli）のRSS合計の監視を開始する（psutilがない場合はNone）"""
+        try:
+            import psutil
+        except ImportError:
+            if not self.rss_monitor_warned:
+                self.rss_monitor_warned = True
+                self.write_log("psutilがインストールされていないため、子プロセスのピークメモリは記録しません（pip install psutil）")
+            return None
+
+        monitor = {'peak': 0, 'running': True}
+
+        def sample():
+            current = psutil.Process()
+            while monitor['running']:
+                total = 0
+                try:
+                    for child in current.children(recursive=True):
+                        try:
+                            total += child.memory_info().rss
+                        except (psutil.NoSuchProcess, psutil.AccessDenied):
+                            pass
+                except psutil.Error:
+                    pass
+                monitor['peak'] = max(monitor['peak'], total)
+                time.sleep(0.5)
+
+        monitor['thread'] = threading.Thread(target=sample, daemon=True)
+        monitor['thread'].start()
+        return monitor
+
+    def stop_child_rss_monitor(self, monitor):
+        if not monitor:
+            return None
+        monitor['running'] = False
+        monitor['thread'].join(timeout=1)
+        return monitor['peak']
+
+    def format_stage_record(self, record):
+        text = f"{record['stage']}: {record['elapsed']:.1f}秒"
+        if record.get('input_bytes'):
+            text += f", 入力{record['input_bytes'] / 1e6:.1f}MB"
+        if record.get('bytes_written'):
+            text += f", 出力{record['bytes_written'] / 1e6:.1f}MB"
+        if record.get('fps'):
+            text += f", {record['fps']:.1f}fps"
+        if record.get('peak_rss'):
+            text += f", ピークRSS{record['peak_rss'] / 1e6:.0f}MB"
+        return text
+
+    def load_metrics_history(self):
+        """処理実績ファイル（JSON Lines）から直近の実績を読み込む"""
+        history = []
+        if os.path.exists(self.metrics_file):
+            try:
+                with open(self.metrics_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            history.append(json.loads(line))
+            except Exception as e:
+                self.write_log(f"処理実績読み込みエラー: {e}")
+        return history[-self.metrics_history_limit:]
+
+    def record_job_metrics(self, job_id, input_file, video_seconds, frame_size, total_elapsed, status, settings):
+        """ジョブ単位の工程スパンを処理実績ファイルに追記し、処理時間推定モデルを補正する"""
+        stages = [r for r in self.stage_timings if r.get('job') == job_id]
+        record = {
+            'job': job_id,
+            'video_path': input_file,
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'video_seconds': video_seconds,
+            'frames': self.current_job_frames,
+            'width': frame_size[0],
+            'height': frame_size[1],
+            'vr': settings['vr_processing'],
+            'tvai': settings['tvai'],
+            'status': status,
+            'total_elapsed': total_elapsed,
+            'stages': stages
+        }
+        self.metrics_history.append(record)
+        del self.metrics_history[:-self.metrics_history_limit]
+        try:
+            with open(self.metrics_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except Exception as e:
+            self.write_log(f"処理実績保存エラー: {e}")
+        breakdown = ", ".join(f"{r['stage']} {r['elapsed']:.1f}秒" for r in stages)
+        self.write_log(f"処理実績: {os.path.basename(input_file)} 合計{total_elapsed:.1f}秒 ({status}) [{breakdown}]")
+        if status == 'success':
+            self.update_throughput_model(record)
+
+    def throughput_class(self, vr, tvai):
+        key = 'vr' if vr else '2d'
+        return f"{key}_tvai" if str(tvai) == "1" else key
+
+    def pixel_factor(self, width, height):
+        """解像度による処理コスト係数（1080p=1.0）。検出は固定解像度で行われるため画素数の平方根で近似する"""
+        megapixels = max(1, width or 1920) * max(1, height or 1080) / 1e6
+        return (megapixels / REFERENCE_MEGAPIXELS) ** 0.5
+
+    def load_throughput_model(self):
+        """処理時間推定モデルを読み込む（ファイルがなければ処理実績から初期化する）"""
+        if os.path.exists(self.throughput_model_file):
+            try:
+                with open(self.throughput_model_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                self.write_log(f"処理時間推定モデル読み込みエラー: {e}")
+        self.throughput_model = {'rates': {}}
+        for record in self.metrics_history:
+            if record.get('status') == 'success':
+                self.update_throughput_model(record, save=False)
+        return self.throughput_model
+
+    def save_throughput_model(self):
+        try:
+            with open(self.throughput_model_file, 'w', encoding='utf-8') as f:
+                json.dump(self.throughput_model, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            self.write_log(f"処理時間推定モデル保存エラー: {e}")
+
+    def update_throughput_model(self, record, save=True):
+        """完了したジョブの実測値で該当クラスの処理レートを指数移動平均で補正する"""
+        video_seconds = record.get('video_seconds', 0)
+        if video_seconds <= 0 or record.get('total_elapsed', 0) <= 0:
+            return
+        key = self.throughput_class(record.get('vr', False), record.get('tvai', "2"))
+        measured = record['total_elapsed'] / (video_seconds * self.pixel_factor(record.get('width'), record.get('height')))
+        rates = self.throughput_model.setdefault('rates', {})
+        current = rates.get(key)
+        if current:
+            alpha = 0.3 if current['samples'] >= 3 else 1.0 / (current['samples'] + 1)
+            current['rate'] = current['rate'] * (1 - alpha) + measured * alpha
+            current['samples'] += 1
+        else:
+            rates[key] = {'rate': measured, 'samples': 1}
+        if save:
+            self.save_throughput_model()
+
+    def estimate_entry_seconds(self, entry):
+        """キュー項目の処理時間を動画長・解像度・VR・TVAIから推定する"""
+        fps = entry.get('fps', 30.0) or 30.0
+        video_seconds = max(0, entry['end_frame'] - entry['start_frame']) / fps
+        key = self.throughput_class(entry.get('vr_processing', False), entry.get('tvai', "2"))
+        calibrated = self.throughput_model.get('rates', {}).get(key)
+        rate = calibrated['rate'] if calibrated else DEFAULT_THROUGHPUT_RATES[key]
+        return video_seconds * self.pixel_factor(entry.get('width'), entry.get('height')) * rate
+
+    def estimate_remaining_seconds(self, entries):
+        """キュー項目群の残り処理時間を推定する"""
+        return sum(self.estimate_entry_seconds(entry) for entry in entries)
+
+    def start_progress_tracking(self, entries):
+        """バッチ全体の進捗（推定コストの合計と完了分）の計測を開始する"""
+        self.progress_state = {
+            'total_cost': self.estimate_remaining_seconds(entries),
+            'done_cost': 0.0,
+            'item_cost': 0.0,
+            'item_fraction': 0.0,
+            'item_started': time.time()
+        }
+        self.root.after(0, self.update_progress_display)
+
+    def begin_progress_item(self, entry, pending_entries=None):
+        state = self.progress_state
+        if not state:
+            return
+        if pending_entries is not None:
+            # 一括処理中の追加・削除を反映して全体コストを見直す
+            state['total_cost'] = state['done_cost'] + self.estimate_remaining_seconds(pending_entries)
+        state['item_cost'] = self.estimate_entry_seconds(entry)
+        state['item_fraction'] = 0.0
+        state['item_started'] = time.time()
+        self.root.after(0, self.update_progress_display)
+
+    def finish_progress_item(self):
+        state = self.progress_state
+        if not state:
+            return
+        state['done_cost'] += state['item_cost']
+        state['item_cost'] = 0.0
+        state['item_fraction'] = 0.0
+        self.root.after(0, self.update_progress_display)
+
+    def set_item_progress(self, line):
+        """lada-cliの進捗行（Processing frames: ... 123/456 ...）から現在項目の進捗率を更新する"""
+        match = re.search(r'(\d+)/(\d+)', line)
+        if not match or not self.progress_state:
+            return
+        done, total = int(match.group(1)), int(match.group(2))
+        if total > 0:
+            self.progress_state['item_fraction'] = min(1.0, done / total)
+            self.root.after(0, self.update_progress_display)
+
+    def get_progress_estimates(self):
+        """(全体進捗率, 現在項目の残り秒数, 全体の残り秒数) を返す"""
+        state = self.progress_state
+        fraction = state['item_fraction']
+        item_remaining = state['item_cost'] * (1 - fraction)
+        elapsed = time.time() - state['item_started']
+        if fraction > 0.05:
+            # 進捗が出始めたら実測の進み具合で現在項目の残り時間を補正する
+            item_remaining = elapsed / fraction * (1 - fraction)
+        total = state['total_cost']
+        done = state['done_cost'] + state['item_cost'] * fraction
+        overall_remaining = max(0.0, total - state['done_cost'] - state['item_cost']) + item_remaining
+        overall_fraction = min(1.0, done / total) if total > 0 else 0.0
+        return overall_fraction, item_remaining, overall_remaining
+
+    def update_progress_display(self):
+        if not self.progress_state or not self.batch_progress_canvas.winfo_exists():
+            return
+        overall_fraction, item_remaining, overall_remaining = self.get_progress_estimates()
+        width = self.batch_progress_canvas.winfo_width()
+        self.batch_progress_canvas.coords(self.batch_progress_bar, 0, 0, width * overall_fraction, 14)
+        self.batch_progress_canvas.itemconfig(
+            self.batch_progress_text,
+            text=f"全体 {overall_fraction * 100:.0f}%  この項目の残り約 {self.format_time(item_remaining)}  "
+                 f"全体の残り約 {self.format_time(overall_remaining)}"
+        )
+
+    def stop_progress_tracking(self):
+        self.progress_state = None
+        self.batch_progress_canvas.coords(self.batch_progress_bar, 0, 0, 0, 14)
+        self.batch_progress_canvas.itemconfig(self.batch_progress_text, text="")
+
+    def detect_mosaic_roi(self, video_file):
+        """範囲内のサンプルフレームからモザイク領域の外接矩形 (x, y, w, h) を推定する
+        
+        範囲の長さに応じてMOSAIC_SAMPLE_SECONDS秒ごとにフレームを取り出し、検出結果の和集合から矩形を作る。
+        モザイクが見つからない場合や領域が広すぎて切り出す効果がない場合はNoneを返す。
+        """
+        cap = cv2.VideoCapture(video_file)
+        if not cap.isOpened():
+            return None
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        scale = min(1.0, MOSAIC_ANALYSIS_WIDTH / width) if width > 0 else 1.0
+        
+        samples = mosaic_sample_indices(total_frames, fps)
+        self.write_log(f"モザイク領域の検出: {len(samples)}フレームを解析")
+        union = None
+        for index in samples:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+            ret, frame = cap.read()
+            if not ret:
+                continue
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if scale < 1.0:
+                gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_NEAREST)
+            mask = mosaic_tile_mask(gray)
+            union = mask if union is None else (union | mask)
+        cap.release()
+        
+        if union is None:
+            return None
+        return mosaic_roi_rect(union, scale, width, height)
+
+    def crop_region(self, input_file, output_file, crop, stage):
+        """映像の一部を切り出して中間ファイルに書き出す（crop: ffmpegのcropフィルター引数 w:h:x:y）"""
+        crop_cmd = [
             'ffmpeg', '-y', '-i', input_file,
-            '-vf', 'crop=iw*0.837:ih*0.837:iw*0.0815:ih*0.0815',
-            '-c:v', 'h264_nvenc', '-preset', 'p4', '-cq', '18',
+            '-vf', self.get_video_filter('intermediate', f'crop={crop}'),
+            *self.get_video_encoder_args('intermediate', '18'),
             '-an',
             output_file
         ]
-        subprocess.run(crop_center_cmd, check=True, creationflags=subprocess.CREATE_NO_WINDOW)
+        with self.measure_stage(stage, input_path=input_file, output_path=output_file):
+            subprocess.run(crop_cmd, check=True, creationflags=CREATE_NO_WINDOW)
+
+    def crop_regions(self, input_file, crops, stage):
+        """1回のデコードで複数の領域を切り出して別々の中間ファイルに書き出す（crops: (出力ファイル, w:h:x:y) のリスト）"""
+        labels = [f'c{index}' for index in range(len(crops))]
+        filters = [f"[0:v]split={len(crops)}" + ''.join(f'[{label}]' for label in labels)]
+        outputs = []
+        for label, (output_file, crop) in zip(labels, crops):
+            filters.append(f"[{label}]{self.get_video_filter('intermediate', f'crop={crop}')}[{label}out]")
+            outputs += ['-map', f'[{label}out]', *self.get_video_encoder_args('intermediate', '18'), output_file]
+        crop_cmd = ['ffmpeg', '-y', '-i', input_file, '-filter_complex', ';'.join(filters), *outputs]
+        with self.measure_stage(stage, input_path=input_file) as record:
+            subprocess.run(crop_cmd, check=True, creationflags=CREATE_NO_WINDOW)
+            record['bytes_written'] = sum(os.path.getsize(f) for f, _ in crops if os.path.exists(f))
+
+    def overlay_region(self, background_file, layers, output_file):
+        """処理済み領域を元動画の指定位置に1回のエンコードでまとめて重ねる（音声は元動画からコピー）
+        
+        layers: (LADA処理済みファイル, overlayフィルターの位置 x:y) のリスト
+        """
+        inputs = ['-i', background_file]  # 元動画（背景・音声）
+        filters = []
+        current = '0:v'
+        for index, (foreground_file, position) in enumerate(layers, start=1):
+            inputs += ['-i', foreground_file]
+            overlay = f'overlay={position}'
+            if index == len(layers):
+                overlay = self.get_video_filter('final', overlay)
+            filters.append(f'[{current}][{index}:v]{overlay}[v{index}]')
+            current = f'v{index}'
+        overlay_cmd = [
+            'ffmpeg', '-y', *inputs,
+            '-filter_complex', ';'.join(filters),
+            '-map', f'[{current}]', '-map', '0:a?',
+            *self.get_video_encoder_args('final', '18'),
+            *self.get_audio_args(background_file, os.path.splitext(output_file)[1]),
+            output_file
+        ]
+        with self.measure_stage('overlay', input_path=layers[0][0], output_path=output_file):
+            subprocess.run(overlay_cmd, check=True, creationflags=CREATE_NO_WINDOW)
+
+    def apply_vr_undistortion(self, input_file, output_file, unique_id, roi=None, views=None):
+        """180度SBS映像 - 中央領域を抽出（面積約70%）、モザイク領域が検出済みならその領域を抽出
+        
+        viewsを指定した場合は各目のビューを透視投影に変換し、横に並べて1つのファイルに書き出す。
+        """
+        if views:
+            self.console_text.config(state=tk.NORMAL)
+            self.console_text.insert(tk.END, f"VR映像を透視投影に変換中（{len(views)}ビュー）...\n")
+            self.console_text.config(state=tk.DISABLED)
+            self.write_log("VRビュー抽出開始: " + ", ".join(self.format_vr_view(view) for view in views))
+            self.extract_vr_views(input_file, [(output_file, views)])
+            self.write_log("VRビュー抽出完了")
+            return
+        
+        if roi:
+            x, y, w, h = roi
+            self.console_text.config(state=tk.NORMAL)
+            self.console_text.insert(tk.END, f"VR映像のモザイク領域を抽出中（{w}x{h}+{x}+{y}）...\n")
+            self.console_text.config(state=tk.DISABLED)
+            self.write_log(f"VRモザイク領域抽出開始: {w}x{h}+{x}+{y}")
+            self.crop_region(input_file, output_file, f'{w}:{h}:{x}:{y}', 'vr_crop')
+            self.write_log("VRモザイク領域抽出完了")
+            return
+        
+        self.console_text.config(state=tk.NORMAL)
+        self.console_text.insert(tk.END, f"VR映像の中央領域を抽出中（面積70%）...\n")
+        self.console_text.config(state=tk.DISABLED)
+        self.write_log("VR中央領域抽出開始（面積70%）")
+        
+        # 面積70%なら縦横83.7%（√0.7 ≈ 0.837）
+        self.crop_region(input_file, output_file, 'iw*0.837:ih*0.837:iw*0.0815:ih*0.0815', 'vr_crop')
         
         self.write_log("VR中央領域抽出完了")
 
-    def apply_vr_distortion(self, input_file, output_file, unique_id):
-        """LADA処理済み中央領域を元動画の同じ位置に合成"""
+    def apply_vr_distortion(self, input_file, output_file, unique_id, roi=None, views=None):
+        """LADA処理済み中央領域（またはモザイク領域）を元動画の同じ位置に合成"""
         self.console_text.config(state=tk.NORMAL)
         self.console_text.insert(tk.END, f"処理済み領域を元動画に合成中...\n")
         self.console_text.config(state=tk.DISABLED)
@@ -430,7 +3025,7 @@ class MosaicRemoverApp:
         # 元の切り出しファイルを探す
         trimmed_file = None
         for file in os.listdir(self.output_dir):
-            if file.startswith(f'trimmed_{unique_id}') and file.endswith('.mp4'):
+            if file.startswith(f'trimmed_{unique_id}'):
                 trimmed_file = os.path.join(self.output_dir, file)
                 break
         
@@ -438,109 +3033,210 @@ class MosaicRemoverApp:
             self.write_log("エラー: 元の切り出し動画が見つかりません")
             raise Exception("元の切り出し動画が見つかりません")
         
-        # LADA処理済み中央領域を元動画の中央に重ねる
-        overlay_cmd = [
-            'ffmpeg', '-y',
-            '-i', trimmed_file,  # 元動画（背景）
-            '-i', input_file,    # LADA処理済み中央部
-            '-filter_complex', '[0:v][1:v]overlay=(W-w)/2:(H-h)/2[v]',
-            '-map', '[v]',
-            '-c:v', 'h264_nvenc', '-preset', 'p4', '-cq', '18',
-            output_file
-        ]
-        subprocess.run(overlay_cmd, check=True, creationflags=subprocess.CREATE_NO_WINDOW)
+        if views:
+            # 処理済みのビューを元の投影に戻して重ねる
+            self.reproject_vr_views(trimmed_file, [(input_file, views)], output_file)
+            self.write_log("元動画への合成完了")
+            return
+        
+        # LADA処理済み領域を元動画の同じ位置に重ね、音声は切り出し動画から直接コピーする
+        position = f'{roi[0]}:{roi[1]}' if roi else '(W-w)/2:(H-h)/2'
+        self.overlay_region(trimmed_file, [(input_file, position)], output_file)
         
         self.write_log("元動画への合成完了")
 
-    def split_vr_video(self, input_file, unique_id):
-        """VR映像処理 - 中央領域のみ抽出（簡易モード専用）"""
-        
-        # 1. 音声を抽出
-        audio_file = os.path.join(self.output_dir, f'{unique_id}_audio.aac')
-        extract_audio_command = [
-            'ffmpeg', '-y', '-i', input_file,
-            '-vn', '-acodec', 'copy', audio_file
-        ]
-        
-        self.console_text.config(state=tk.NORMAL)
-        self.console_text.insert(tk.END, f"音声を抽出中...\n")
-        self.console_text.config(state=tk.DISABLED)
-        self.write_log("VR映像から音声抽出開始")
+    def split_vr_video(self, input_file, unique_id, roi=None, views=None):
+        """VR映像処理 - 中央領域（モザイク領域検出時はその領域）のみ抽出（簡易モード専用）
         
-        try:
-            subprocess.run(extract_audio_command, check=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            self.write_log("音声抽出完了")
-        except subprocess.CalledProcessError:
-            self.write_log("音声抽出失敗または音声トラックなし")
-            audio_file = None
+        音声は抽出せず、合成時に切り出し動画から直接コピーする。
+        """
         
-        # 2. 中央領域を抽出
+        # 中央領域を抽出
         self.console_text.config(state=tk.NORMAL)
         self.console_text.insert(tk.END, f"VR簡易モード: 中央領域のみ抽出\n")
         self.console_text.config(state=tk.DISABLED)
         self.write_log("VR簡易モード: 中央領域抽出開始")
         
-        center_file = os.path.join(self.output_dir, f'{unique_id}_center.mp4')
-        self.apply_vr_undistortion(input_file, center_file, unique_id)
+        center_file = os.path.join(self.output_dir, f'{unique_id}_center{self.get_intermediate_ext()}')
+        self.apply_vr_undistortion(input_file, center_file, unique_id, roi, views)
         
         parts = ['center']
         
-        return parts, audio_file
+        return parts
 
-    def merge_vr_video(self, unique_id, parts, output_file, audio_file):
-        """VR処理済み中央領域を元動画に合成して音声を追加"""
+    def vr_views(self, width, height, roi=None, projection='hequirect'):
+        """VR映像から切り出すビュー（各目の透視投影）の一覧を返す
         
-        # LADA処理済みの中央領域ファイルを探す
-        center_processed = None
-        for file in os.listdir(self.output_dir):
-            if file.startswith(f'{unique_id}_center') and 'lada' in file and file.endswith('.mp4'):
-                center_processed = os.path.join(self.output_dir, file)
-                break
+        モザイク領域の検出結果があれば、各目の範囲と重なる部分の境界の方向から、その範囲を覆う向きと視野角を求める。
+        検出結果がない場合と、必要な視野角が VR_MAX_VIEW_FOV を超える場合はNone（中央切り出しで処理する）。
+        各目の中央70%を透視投影で覆うには視野角の広いビューを何枚も並べる必要があり、中央切り出しより画素数が増えるため。
+        """
+        eye_width = width // 2
+        if not roi:
+            return None
         
-        if not center_processed or not os.path.exists(center_processed):
-            self.write_log("エラー: LADA処理済みファイルが見つかりません")
-            raise Exception("LADA処理済みファイルが見つかりません")
-        
-        # 中央領域を元動画に合成
-        temp_video = os.path.join(self.output_dir, f'{unique_id}_temp_composited.mp4')
-        self.apply_vr_distortion(center_processed, temp_video, unique_id)
-        
-        # 音声を合成
-        if audio_file and os.path.exists(audio_file):
-            final_merge_cmd = [
-                'ffmpeg', '-y', '-i', temp_video, '-i', audio_file,
-                '-c:v', 'copy', '-c:a', 'aac', '-b:a', '192k',
-                '-shortest', output_file
-            ]
-            subprocess.run(final_merge_cmd, check=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            self.write_log("音声合成完了")
-            
-            # 音声ファイル削除
-            os.remove(audio_file)
-            self.write_log(f"音声ファイル削除: {audio_file}")
+        views = []
+        for eye, (x, y, w, h) in self.vr_eye_regions(width, height, roi):
+            offset = 0 if eye == 'left' else eye_width
+            edge = np.linspace(0, 1, 33)
+            xs = np.concatenate([x + edge * w, x + edge * w, np.full(33, x), np.full(33, x + w)]) - offset - 0.5
+            ys = np.concatenate([np.full(33, y), np.full(33, y + h), y + edge * h, y + edge * h]) - 0.5
+            ray_x, ray_y, ray_z = vr_source_to_ray(np.append(xs, x + w / 2 - offset - 0.5), np.append(ys, y + h / 2 - 0.5),
+                                                   eye_width, height, projection)
+            valid = ~np.isnan(ray_z)
+            if not valid[-1]:
+                return None
+            yaw = np.arctan2(ray_x[-1], ray_z[-1])
+            pitch = np.arcsin(np.clip(ray_y[-1], -1, 1))
+            rotation = vr_view_rotation(yaw, pitch)
+            ray_x, ray_y, ray_z = ray_x[valid], ray_y[valid], ray_z[valid]
+            cam_x = rotation[0, 0] * ray_x + rotation[1, 0] * ray_y + rotation[2, 0] * ray_z
+            cam_y = rotation[0, 1] * ray_x + rotation[1, 1] * ray_y + rotation[2, 1] * ray_z
+            cam_z = rotation[0, 2] * ray_x + rotation[1, 2] * ray_y + rotation[2, 2] * ray_z
+            if (cam_z <= 0.05).any():
+                return None
+            # 縁のなだらかな合成部分がモザイク領域にかからないよう、その幅も加える
+            focal = vr_focal_length(eye_width, height, projection)
+            fov = tuple(float(2 * np.degrees(np.arctan(np.abs(c / cam_z).max() * VR_VIEW_MARGIN + VR_BLEND_FEATHER / focal)))
+                        for c in (cam_x, cam_y))
+            if max(fov) > VR_MAX_VIEW_FOV:
+                return None
+            views.append({'eye': eye, 'offset': offset, 'projection': projection,
+                          'yaw': float(np.degrees(yaw)), 'pitch': float(np.degrees(pitch)), 'fov': fov})
+        return views or None
+
+    def format_vr_view(self, view):
+        return f"{view['eye']}=向き({view['yaw']:.0f}°,{view['pitch']:.0f}°) 視野({view['fov'][0]:.0f}°x{view['fov'][1]:.0f}°)"
+
+    def get_frame_rate_text(self, video_file):
+        """ffmpegの -r に渡すフレームレート（分数のまま）"""
+        try:
+            result = subprocess.run(
+                ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'stream=r_frame_rate',
+                 '-of', 'csv=p=0', video_file],
+                capture_output=True, text=True, creationflags=CREATE_NO_WINDOW
+            )
+            rate = result.stdout.strip().split('\n')[0]
+            if parse_rate(rate):
+                return rate
+        except (OSError, subprocess.SubprocessError):
+            pass
+        cap = cv2.VideoCapture(video_file)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        cap.release()
+        return f"{fps:.6f}"
+
+    def open_frame_writer(self, output_file, size, rate, role, audio_source=None):
+        """BGR画像を標準入力から受け取ってエンコードするffmpegを起動する（audio_sourceの音声を付ける）"""
+        command = ['ffmpeg', '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+                   '-s', f'{size[0]}x{size[1]}', '-r', rate, '-i', 'pipe:0']
+        if audio_source:
+            command += ['-i', audio_source, '-map', '0:v', '-map', '1:a?']
+        command += ['-vf', self.get_video_filter(role, 'format=yuv420p'),
+                    *self.get_video_encoder_args(role, '18')]
+        if audio_source:
+            command += self.get_audio_args(audio_source, os.path.splitext(output_file)[1])
         else:
-            # 音声がない場合はそのまま移動
-            os.rename(temp_video, output_file)
+            command.append('-an')
+        command.append(output_file)
+        return subprocess.Popen(command, stdin=subprocess.PIPE, creationflags=CREATE_NO_WINDOW)
+
+    def close_frame_writer(self, writer):
+        try:
+            writer.stdin.close()
+        except OSError:
+            pass
+        return writer.wait()
+
+    def extract_vr_views(self, trimmed_file, outputs):
+        """1回のデコードで各ビューを透視投影に変換し、別々の中間ファイルに書き出す
         
-        # 一時ファイルを削除
-        if os.path.exists(temp_video):
-            try:
-                os.remove(temp_video)
-            except:
-                pass
+        outputs: (出力ファイル, [ビュー, ...]) のリスト。1つのファイルに複数のビューを指定すると横に並べる。
+        """
+        width, height = self.get_video_size(trimmed_file)
+        eye_width = width // 2
+        rate = self.get_frame_rate_text(trimmed_file)
+        layouts = []
+        for output_file, views in outputs:
+            maps = [vr_view_maps(eye_width, height, view) for view in views]
+            size = (sum(m['size'][0] for m in maps), max(m['size'][1] for m in maps))
+            layouts.append((views, maps, size, self.open_frame_writer(output_file, size, rate, 'intermediate')))
         
-        # LADA処理済みファイルを削除
-        if os.path.exists(center_processed):
-            os.remove(center_processed)
-            self.write_log(f"LADA処理済みファイル削除: {os.path.basename(center_processed)}")
+        cap = cv2.VideoCapture(trimmed_file)
+        with self.measure_stage('vr_crop', input_path=trimmed_file) as record:
+            try:
+                while self.is_running:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    for views, maps, size, writer in layouts:
+                        canvas = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+                        x = 0
+                        for view, m in zip(views, maps):
+                            view_width, view_height = m['size']
+                            eye = frame[:, view['offset']:view['offset'] + eye_width]
+                            canvas[:view_height, x:x + view_width] = cv2.remap(
+                                eye, *m['extract'], cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+                            x += view_width
+                        writer.stdin.write(canvas.tobytes())
+            finally:
+                cap.release()
+                returncodes = [self.close_frame_writer(writer) for *_, writer in layouts]
+            record['bytes_written'] = sum(os.path.getsize(f) for f, _ in outputs if os.path.exists(f))
+        if not self.is_running:
+            raise Exception("処理が中断されました")
+        if any(code != 0 for code in returncodes):
+            raise Exception("VRビューの書き出しに失敗しました")
+
+    def reproject_vr_views(self, trimmed_file, parts, output_file):
+        """処理済みのビューを元の投影に戻し、縁をなだらかに元映像と合成して出力する（音声は切り出し動画からコピー）
         
-        # 中央抽出ファイルを削除
-        center_file = os.path.join(self.output_dir, f'{unique_id}_center.mp4')
-        if os.path.exists(center_file):
-            os.remove(center_file)
-            self.write_log(f"中央抽出ファイル削除: center.mp4")
+        parts: (処理済みファイル, [ビュー, ...]) のリスト（extract_vr_views と同じ並び）。
+        処理済みのフレームが足りない場合、残りは元のフレームのまま出力する。
+        """
+        width, height = self.get_video_size(trimmed_file)
+        eye_width = width // 2
+        sources = []
+        for processed_file, views in parts:
+            maps = [vr_view_maps(eye_width, height, view) for view in views]
+            size = (sum(m['size'][0] for m in maps), max(m['size'][1] for m in maps))
+            sources.append((cv2.VideoCapture(processed_file), views, maps, size))
         
-        self.write_log("VR合成処理完了")
+        cap = cv2.VideoCapture(trimmed_file)
+        writer = self.open_frame_writer(output_file, (width, height), self.get_frame_rate_text(trimmed_file),
+                                        'final', audio_source=trimmed_file)
+        with self.measure_stage('overlay', input_path=parts[0][0], output_path=output_file):
+            try:
+                while self.is_running:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    for source, views, maps, size in sources:
+                        ret, processed = source.read()
+                        if not ret:
+                            continue
+                        if (processed.shape[1], processed.shape[0]) != size:
+                            processed = cv2.resize(processed, size, interpolation=cv2.INTER_LINEAR)
+                        x = 0
+                        for view, m in zip(views, maps):
+                            view_width, view_height = m['size']
+                            restored = cv2.remap(processed[:view_height, x:x + view_width], *m['restore'],
+                                                 cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+                            x += view_width
+                            rect_x, rect_y, rect_w, rect_h = m['rect']
+                            left = view['offset'] + rect_x
+                            target = frame[rect_y:rect_y + rect_h, left:left + rect_w]
+                            target[:] = cv2.blendLinear(restored, target, m['weight'], m['inverse_weight'])
+                    writer.stdin.write(frame.tobytes())
+            finally:
+                cap.release()
+                for source, *_ in sources:
+                    source.release()
+                returncode = self.close_frame_writer(writer)
+        if not self.is_running:
+            raise Exception("処理が中断されました")
+        if returncode != 0:
+            raise Exception("VRビューの合成に失敗しました")
 
     def abort_processing(self):
         """処理を中断し、LADAプロセスをKILLしてバッチループも中止する"""
@@ -557,18 +3253,19 @@ class MosaicRemoverApp:
         self.is_running = False
         self.buffer_running = False
         
-        # 2. LADAプロセス(PowerShell)を強制終了
-        if self.process and self.process.poll() is None:
-            try:
-                self.process.kill()
-                self.process.wait(timeout=3)  # 最大3秒待機
-                self.write_log("LADAプロセスを強制終了しました")
-            except subprocess.TimeoutExpired:
-                self.write_log("LADAプロセス終了タイムアウト")
-            except Exception as e:
-                self.write_log(f"LADAプロセス終了エラー: {e}")
-            finally:
-                self.process = None
+        # 2. LADAプロセス(PowerShell)を強制終了（VR左右分割モードでは並列実行中のすべて）
+        for process in [self.process, *self.active_processes]:
+            if process and process.poll() is None:
+                try:
+                    process.kill()
+                    process.wait(timeout=3)  # 最大3秒待機
+                    self.write_log("LADAプロセスを強制終了しました")
+                except subprocess.TimeoutExpired:
+                    self.write_log("LADAプロセス終了タイムアウト")
+                except Exception as e:
+                    self.write_log(f"LADAプロセス終了エラー: {e}")
+        self.process = None
+        self.active_processes = []
         
         # 3. FFMPEGプロセスも確実に終了させる
         # output_dirから実行中の可能性のあるファイルに対応するFFMPEGプロセスを検索して終了
@@ -599,6 +3296,7 @@ class MosaicRemoverApp:
         # 5. ステータス更新
         self.status_label.config(text="処理を中断しました", fg="red")
         self.batch_count_label.config(text="")
+        self.stop_progress_tracking()
         self.console_text.config(state=tk.NORMAL)
         self.console_text.insert(tk.END, "処理を中断しました。\n")
         self.console_text.config(state=tk.DISABLED)
@@ -607,97 +3305,218 @@ class MosaicRemoverApp:
         messagebox.showinfo("中断完了", "処理を中断しました。")
         
     def add_to_queue(self, event=None):
-        if self.is_batch_processing:
-            messagebox.showwarning("警告", "一括処理中はキューに追加できません。")
-            return
         input_file = self.file_path_entry.get()
         if not input_file or not os.path.exists(input_file):
             messagebox.showerror("エラー", "有効な動画ファイルを選択してください。")
             return
         
-        with self.cap_lock:
-            cap_temp = cv2.VideoCapture(input_file)
-            if not cap_temp.isOpened():
-                messagebox.showerror("エラー", "動画ファイルを開けませんでした。")
-                cap_temp.release()
-                return
-            total_frames = int(cap_temp.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap_temp.get(cv2.CAP_PROP_FPS) or 30.0
-            cap_temp.release()
+        info = probe_video_info(input_file)
+        if not info:
+            messagebox.showerror("エラー", "動画ファイルを開けませんでした。")
+            return
+        total_frames, fps, width, height = info
+        queue_entry = self.build_queue_entry(input_file, self.start_frame, min(self.end_frame, total_frames), fps, width, height)
         
-        queue_entry = {
-            'video_path': input_file,
-            'model': self.model_var.get(),
-            'tvai': self.tvai_var.get(),
-            'quality': int(self.quality_var.get()),
-            'start_frame': self.start_frame,
-            'end_frame': min(self.end_frame, total_frames),
-            'ffmpeg_option': self.ffmpeg_option_var.get(),
-            'save_trimmed': self.save_trimmed_video_var.get(),
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'fps': fps,
-            'crf_value': int(self.crf_var.get()),
-            'vr_processing': self.vr_processing_var.get(),
-            'vr_simple_mode': self.vr_simple_mode_var.get()  # 追加
-        }
+        if self.find_duplicate_entry(queue_entry):
+            self.write_log(f"重複のためキュー追加をスキップ: {os.path.basename(input_file)}")
+            messagebox.showinfo("情報", f"{os.path.basename(input_file)} は同じ範囲・設定で既にキューに登録されています。")
+            return
         
-        self.processing_queue.append(queue_entry)
-        self.save_queue()
+        with self.queue_lock:
+            self.processing_queue.append(queue_entry)
+            self.save_queue()
         self.write_log(f"キューに追加: {os.path.basename(input_file)}")
         if not self.suppress_queue_message_var.get():
             messagebox.showinfo("追加完了", f"キューに {os.path.basename(input_file)} を追加しました。\n総キュー数: {len(self.processing_queue)}")
 
+    def build_queue_entry(self, video_path, start_frame, end_frame, fps, width, height):
+        """現在のGUI設定でキュー項目を作成する"""
+        entry = {
+            'id': uuid.uuid4().hex[:12],
+            'video_path': video_path,
+            'start_frame': start_frame,
+            'end_frame': end_frame,
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'fps': fps,
+            'width': width,
+            'height': height,
+            'priority': 1
+        }
+        entry.update(self.get_current_settings())
+        return entry
+
+    def load_hot_folder_state(self):
+        if os.path.exists(self.hot_folder_state_file):
+            try:
+                with open(self.hot_folder_state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                self.write_log(f"監視フォルダ状態の読み込みエラー: {str(e)}")
+        return {}
+
+    def save_hot_folder_state(self):
+        if not self.hot_folder_watcher:
+            return
+        state = {'folder': self.hot_folder_watcher.folder, 'seen': self.hot_folder_watcher.snapshot_seen()}
+        try:
+            with open(self.hot_folder_state_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+        except OSError as e:
+            self.write_log(f"監視フォルダ状態の保存エラー: {str(e)}")
+
+    def choose_hot_folder(self):
+        folder = filedialog.askdirectory(title="監視フォルダを選択", initialdir=self.hot_folder_path or None)
+        if not folder:
+            return False
+        self.hot_folder_path = os.path.abspath(folder)
+        self.save_config()
+        if self.hot_folder_var.get():
+            self.start_hot_folder()
+        return True
+
+    def on_hot_folder_toggle(self):
+        if self.hot_folder_var.get():
+            if not self.hot_folder_path or not os.path.isdir(self.hot_folder_path):
+                if not self.choose_hot_folder():
+                    self.hot_folder_var.set(False)
+                    return
+            self.start_hot_folder()
+        else:
+            self.stop_hot_folder()
+        self.save_config()
+
+    def start_hot_folder(self):
+        """監視を開始する。初めて監視するフォルダは既存のファイルを登録せず、以降に追加されたものだけを登録する"""
+        self.stop_hot_folder()
+        if not os.path.isdir(self.hot_folder_path):
+            self.write_log(f"監視フォルダが見つかりません: {self.hot_folder_path}")
+            self.hot_folder_var.set(False)
+            return
+        state = self.load_hot_folder_state()
+        known = state.get('folder') == self.hot_folder_path
+        self.hot_folder_watcher = HotFolderWatcher(
+            self.hot_folder_path, state.get('seen', {}) if known else {},
+            on_ready=lambda path, info: self.root.after(0, self.on_hot_file_ready, path, info),
+            log=self.write_log, exclude=[self.output_dir], baseline=not known)
+        self.hot_folder_watcher.start()
+        self.hot_folder_check.config(text=f"監視フォルダ: {os.path.basename(self.hot_folder_path) or self.hot_folder_path}")
+        self.write_log(f"監視フォルダ開始: {self.hot_folder_path}")
+
+    def stop_hot_folder(self):
+        if self.hot_folder_watcher:
+            self.save_hot_folder_state()
+            self.hot_folder_watcher.stop()
+            self.hot_folder_watcher = None
+            self.hot_folder_check.config(text="監視フォルダ")
+            self.write_log("監視フォルダ停止")
+
+    def on_hot_file_ready(self, path, info):
+        """監視フォルダで書き込みが終わった動画を、全範囲・現在の設定でキューに登録する"""
+        if not self.hot_folder_watcher:
+            return
+        self.save_hot_folder_state()
+        if not info:
+            self.write_log(f"監視フォルダ: 動画ファイルを開けませんでした: {path}")
+            return
+        total_frames, fps, width, height = info
+        queue_entry = self.build_queue_entry(path, 0, total_frames, fps, width, height)
+        if self.find_duplicate_entry(queue_entry):
+            self.write_log(f"監視フォルダ: 重複のためスキップ: {os.path.basename(path)}")
+            return
+        with self.queue_lock:
+            self.processing_queue.append(queue_entry)
+            self.save_queue()
+        self.write_log(f"監視フォルダからキューに追加: {path}")
+        self.refresh_queue_window()
+        if self.hot_folder_autostart and not self.is_running and not self.is_batch_processing:
+            self.start_batch_processing(None)
+
     def open_queue_window(self):
         if not self.processing_queue:
             self.write_log("キュー確認: キューは空です")
             messagebox.showinfo("情報", "キューは空です。")
             return
+        if self.queue_view and self.queue_view.exists():
+            self.queue_view.canvas.winfo_toplevel().lift()
+            return
         
         queue_window = tk.Toplevel(self.root)
         queue_window.title("処理キュー確認")
-        queue_window.geometry("900x400")
+        queue_window.geometry("900x550")
+        
+        policy_frame = tk.Frame(queue_window)
+        policy_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+        tk.Label(policy_frame, text="処理順:").pack(side=tk.LEFT)
+        policy_menu = tk.OptionMenu(policy_frame, self.schedule_policy_var, *SCHEDULE_POLICIES.values(),
+                                    command=lambda _: self.refresh_queue_window())
+        policy_menu.pack(side=tk.LEFT, padx=5)
+        tk.Label(policy_frame, text="※一括処理中も次の項目から反映されます", fg="grey").pack(side=tk.LEFT, padx=5)
+        tk.Label(policy_frame, text="Ctrl/Shift+クリックで複数選択、Ctrl+Aですべて選択", fg="grey").pack(side=tk.RIGHT)
         
         list_frame = tk.Frame(queue_window)
         list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.queue_view = QueueListView(list_frame, lambda: self.processing_queue, self.format_queue_row,
+                                        self.queue_row_status, on_select=self.update_queue_status)
+        self.queue_view.canvas.bind('<Delete>', lambda e: self.delete_queue_items())
         
-        scrollbar = tk.Scrollbar(list_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.queue_listbox = tk.Listbox(list_frame, yscrollcommand=scrollbar.set, font=("MS Gothic", 10), width=100)
-        self.queue_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.config(command=self.queue_listbox.yview)
+        self.queue_status_label = tk.Label(queue_window, fg="blue")
+        self.queue_status_label.pack(pady=(5, 10))
+        self.update_queue_status()
         
-        self.update_queue_listbox()
-        
-        queue_status_label = tk.Label(queue_window, text=f"現在のキュー数: {len(self.processing_queue)}", fg="blue")
-        queue_status_label.pack(pady=(5, 10))
+        metrics_frame = tk.LabelFrame(queue_window, text="処理実績（直近・工程別内訳）", padx=5, pady=5)
+        metrics_frame.pack(fill=tk.BOTH, padx=10, pady=5)
+        metrics_listbox = tk.Listbox(metrics_frame, font=("MS Gothic", 9), height=6)
+        metrics_listbox.pack(fill=tk.BOTH, expand=True)
+        for record in reversed(self.metrics_history[-20:]):
+            metrics_listbox.insert(tk.END, self.format_job_metrics(record))
         
         btn_frame = tk.Frame(queue_window)
         btn_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        up_btn = tk.Button(btn_frame, text="↑ 上へ", command=lambda: self.move_queue_item(-1))
-        up_btn.pack(side=tk.LEFT, padx=5)
-        
-        down_btn = tk.Button(btn_frame, text="↓ 下へ", command=lambda: self.move_queue_item(1))
-        down_btn.pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="⤒ 先頭へ", command=lambda: self.move_queue_items_to_edge(True)).pack(side=tk.LEFT, padx=(5, 0))
+        tk.Button(btn_frame, text="↑ 上へ", command=lambda: self.move_queue_items(-1)).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="↓ 下へ", command=lambda: self.move_queue_items(1)).pack(side=tk.LEFT)
+        tk.Button(btn_frame, text="⤓ 末尾へ", command=lambda: self.move_queue_items_to_edge(False)).pack(side=tk.LEFT, padx=5)
         
-        delete_btn = tk.Button(
-            btn_frame, 
-            text="削除", 
-            command=lambda: self.delete_queue_item(
-                queue_window=queue_window, 
-                queue_status_label=queue_status_label
-            )
-        )
+        delete_btn = tk.Button(btn_frame, text="削除", command=self.delete_queue_items)
         delete_btn.pack(side=tk.LEFT, padx=5)
         
-        clear_all_btn = tk.Button(btn_frame, text="すべて削除", command=lambda: self.clear_all_queue(queue_window, queue_status_label))
+        clear_all_btn = tk.Button(btn_frame, text="すべて削除", command=lambda: self.clear_all_queue(queue_window, self.queue_status_label))
         clear_all_btn.pack(side=tk.LEFT, padx=5)
         
+        run_next_btn = tk.Button(btn_frame, text="次に実行 (割り込み)", command=self.run_queue_item_next)
+        run_next_btn.pack(side=tk.LEFT, padx=(15, 5))
+        
+        priority_up_btn = tk.Button(btn_frame, text="優先度↑", command=lambda: self.change_queue_item_priority(-1))
+        priority_up_btn.pack(side=tk.LEFT, padx=5)
+        
+        priority_down_btn = tk.Button(btn_frame, text="優先度↓", command=lambda: self.change_queue_item_priority(1))
+        priority_down_btn.pack(side=tk.LEFT, padx=5)
+        
+        apply_btn = tk.Button(btn_frame, text="現在の設定を適用", command=self.apply_settings_to_queue_items)
+        apply_btn.pack(side=tk.LEFT, padx=(15, 5))
+        
         close_btn = tk.Button(btn_frame, text="閉じる", command=queue_window.destroy)
         close_btn.pack(side=tk.RIGHT, padx=5)
         
         queue_window.lift()
+        self.queue_view.canvas.focus_set()
+        self.root.after(QUEUE_REDRAW_MS, self.tick_queue_window)
+
+    def tick_queue_window(self):
+        """キュー確認画面が開いている間、実行中の項目の進捗表示を更新する"""
+        if not self.queue_view or not self.queue_view.exists():
+            return
+        if self.running_entry is not None:
+            self.queue_view.redraw()
+        self.root.after(QUEUE_REDRAW_MS, self.tick_queue_window)
+
+    def format_job_metrics(self, record):
+        filename = os.path.basename(record.get('video_path', ''))
+        stages = " / ".join(f"{r['stage']} {self.format_time(r['elapsed'])}" for r in record.get('stages', []))
+        status = {'success': '完了', 'cached': '再利用'}.get(record.get('status'), '失敗')
+        return (f"{record.get('timestamp', '')} {filename} [{status}] 動画{self.format_time(record.get('video_seconds', 0))} "
+                f"処理{self.format_time(record.get('total_elapsed', 0))} : {stages}")
 
     def clear_all_queue(self, queue_window, queue_status_label):
         if not self.processing_queue:
@@ -705,76 +3524,178 @@ class MosaicRemoverApp:
             queue_window.lift()
             return
         
-        self.processing_queue.clear()
-        self.save_queue()
-        self.update_queue_listbox()
-        queue_status_label.config(text="キューをすべて削除しました。現在のキュー数: 0", fg="blue")
+        with self.queue_lock:
+            # 実行中の項目は完了時に削除されるため残しておく
+            self.processing_queue[:] = [e for e in self.processing_queue if e is self.running_entry]
+            self.save_queue()
+        self.refresh_queue_window()
+        queue_status_label.config(text=f"キューをすべて削除しました。現在のキュー数: {len(self.processing_queue)}", fg="blue")
         queue_window.lift()
         self.write_log("キューをすべて削除しました。")
 
-    def update_queue_listbox(self):
-        self.queue_listbox.delete(0, tk.END)
+    def format_queue_row(self, entry):
+        """キュー確認画面の1行分の本文（番号と実行状態を除く）"""
         ffmpeg_display_map = {
+            'auto': '自動判定',
             'copy': '高速',
             'copy_genpts': 'タイムスタンプ修正',
             're_encode': '再エンコード (NVENC)'
         }
-        for i, entry in enumerate(self.processing_queue):
-            try:
-                filename = os.path.basename(entry['video_path'])
-                model = entry['model']
-                tvai = entry['tvai']
-                quality = entry['quality']
-                fps = entry.get('fps', 30.0)
-                start_time = self.format_time(entry['start_frame'] / fps if fps > 0 else 0)
-                end_time = self.format_time(entry['end_frame'] / fps if fps > 0 else 0)
-                ffmpeg_option = ffmpeg_display_map.get(entry['ffmpeg_option'], entry['ffmpeg_option'])
-                save_trimmed = '保存する' if entry['save_trimmed'] else '保存しない'
-                crf_value = entry.get('crf_value', 19)
-                vr_mode = 'VR' if entry.get('vr_processing', False) else '2D'
-                simple_mode = '簡易' if entry.get('vr_simple_mode', False) else '通常'  # 追加
-                display_text = (f"{i+1}. {filename}, Model:{model}, TVAI:{tvai}, Quality:{quality}, "
-                               f"Range:{start_time}-{end_time}, FFmpeg:{ffmpeg_option}, CRF:{crf_value}, "
-                               f"SaveTrim:{save_trimmed}, Mode:{vr_mode}, VRMode:{simple_mode}")  # 修正
-                self.queue_listbox.insert(tk.END, display_text)
-            except Exception as e:
-                self.queue_listbox.insert(tk.END, f"{i+1}. 表示エラー: {e}")
+        filename = os.path.basename(entry['video_path'])
+        model = entry['model']
+        tvai = entry['tvai']
+        quality = entry['quality']
+        fps = entry.get('fps', 30.0)
+        start_time = self.format_time(entry['start_frame'] / fps if fps > 0 else 0)
+        end_time = self.format_time(entry['end_frame'] / fps if fps > 0 else 0)
+        ffmpeg_option = ffmpeg_display_map.get(entry['ffmpeg_option'], entry['ffmpeg_option'])
+        save_trimmed = '保存する' if entry['save_trimmed'] else '保存しない'
+        crf_value = entry.get('crf_value', 19)
+        vr_mode = 'VR' if entry.get('vr_processing', False) else '2D'
+        simple_mode = '簡易' if entry.get('vr_simple_mode', True) else '通常'
+        priority = PRIORITY_LABELS.get(entry.get('priority', 1), '通常')
+        estimate = self.format_time(self.estimate_entry_seconds(entry))
+        return (f"{filename}, 優先度:{priority}, 推定:{estimate}, Model:{model}, TVAI:{tvai}, Quality:{quality}, "
+                f"Range:{start_time}-{end_time}, FFmpeg:{ffmpeg_option}, CRF:{crf_value}, "
+                f"SaveTrim:{save_trimmed}, Mode:{vr_mode}, VRMode:{simple_mode}")
+
+    def queue_row_status(self, entry):
+        """行頭の実行状態と、実行中なら項目の進捗（0-1）を返す"""
+        if entry is self.running_entry:
+            fraction = self.progress_state['item_fraction'] if self.progress_state else 0.0
+            return f"▶実行中 {fraction * 100:.0f}% ", fraction
+        if entry.get('run_next'):
+            return '★次 ', None
+        return '', None
+
+    def update_queue_status(self, message=None, fg="blue"):
+        label = getattr(self, 'queue_status_label', None)
+        if not label or not label.winfo_exists():
+            return
+        selected = len(self.queue_view.selected) if self.queue_view else 0
+        text = f"現在のキュー数: {len(self.processing_queue)}  選択: {selected}件"
+        label.config(text=f"{message}  {text}" if message else text, fg=fg)
+
+    def refresh_queue_window(self):
+        """キュー確認画面が開いていれば表示を更新する（選択は項目IDで維持）"""
+        if not self.queue_view or not self.queue_view.exists():
+            return
+        # 推定時間は処理実績で変わるため作り直す（描画されるのは見えている行だけ）
+        self.queue_view.invalidate()
+        self.queue_view.selected_entries()
+        self.queue_view.redraw()
+        self.update_queue_status()
+
+    def selected_queue_entries(self, allow_running=True):
+        """キュー確認画面で選択中の項目を返す（未選択なら警告してNone）"""
+        entries = self.queue_view.selected_entries() if self.queue_view else []
+        if not allow_running:
+            entries = [e for e in entries if e is not self.running_entry]
+        if not entries:
+            self.update_queue_status("項目を選択してください。", fg="red")
+            return None
+        return entries
+
+    def move_queue_items(self, direction):
+        """選択項目をまとめて1つ上(-1)または下(1)へ移動する"""
+        entries = self.selected_queue_entries()
+        if not entries:
+            return
+        selected = self.queue_view.selected
+        with self.queue_lock:
+            queue = self.processing_queue
+            order = range(1, len(queue)) if direction < 0 else range(len(queue) - 2, -1, -1)
+            moved = False
+            for i in order:
+                j = i + direction
+                if queue_entry_id(queue[i]) in selected and queue_entry_id(queue[j]) not in selected:
+                    queue[i], queue[j] = queue[j], queue[i]
+                    moved = True
+            if moved:
+                self.save_queue()
+        self.queue_view.see(self.queue_view.index_of(queue_entry_id(entries[0 if direction < 0 else -1])))
+        self.queue_view.redraw()
 
-    def move_queue_item(self, direction):
-        sel = self.queue_listbox.curselection()
-        if not sel:
-            messagebox.showwarning("警告", "項目を選択してください。")
+    def move_queue_items_to_edge(self, to_top):
+        """選択項目を並び順を保ったまま先頭または末尾へ移動する"""
+        if not self.selected_queue_entries():
             return
-        idx = sel[0]
-        new_idx = idx + direction
-        if 0 <= new_idx < len(self.processing_queue):
-            self.processing_queue[idx], self.processing_queue[new_idx] = self.processing_queue[new_idx], self.processing_queue[idx]
+        selected = self.queue_view.selected
+        with self.queue_lock:
+            picked = [e for e in self.processing_queue if queue_entry_id(e) in selected]
+            rest = [e for e in self.processing_queue if queue_entry_id(e) not in selected]
+            self.processing_queue[:] = picked + rest if to_top else rest + picked
             self.save_queue()
-            self.update_queue_listbox()
-            self.queue_listbox.selection_set(new_idx)
+        self.queue_view.see(0 if to_top else len(self.processing_queue) - 1)
+        self.queue_view.redraw()
 
-    def delete_queue_item(self, queue_window, queue_status_label):
-        sel = self.queue_listbox.curselection()
-        if not sel:
-            queue_status_label.config(text="削除する項目を選択してください。", fg="red")
-            queue_window.lift()
+    def run_queue_item_next(self):
+        """選択項目を実行中のジョブを止めずに次の処理対象にする（複数選択時は並び順に続けて実行）"""
+        entries = self.selected_queue_entries(allow_running=False)
+        if not entries:
             return
+        with self.queue_lock:
+            for other in self.processing_queue:
+                other.pop('run_next', None)
+            picked = {id(e) for e in entries}
+            for entry in entries:
+                entry['run_next'] = True
+            rest = [e for e in self.processing_queue if id(e) not in picked]
+            # 実行中の項目がキューのどこにあってもその直後に入れる（実行中の項目がなければ先頭）
+            running_at = next((i for i, e in enumerate(rest) if e is self.running_entry), None)
+            insert_at = 0 if running_at is None else running_at + 1
+            self.processing_queue[:] = rest[:insert_at] + entries + rest[insert_at:]
+            self.save_queue()
+        self.queue_view.see(insert_at)
+        self.refresh_queue_window()
+        self.write_log(f"キュー割り込み: {', '.join(os.path.basename(e['video_path']) for e in entries[:3])}"
+                       f"{' 他' if len(entries) > 3 else ''} ({len(entries)}件)")
 
-        deleted_index = sel[0]
-        items_deleted = 0
+    def change_queue_item_priority(self, delta):
+        entries = self.selected_queue_entries()
+        if not entries:
+            return
+        with self.queue_lock:
+            for entry in entries:
+                entry['priority'] = min(max(entry.get('priority', 1) + delta, 0), 2)
+            self.save_queue()
+        self.queue_view.invalidate(entries)
+        self.queue_view.redraw()
 
-        if 0 <= deleted_index < len(self.processing_queue):
-            del self.processing_queue[deleted_index]
+    def apply_settings_to_queue_items(self):
+        """選択項目の処理設定を現在のGUI設定で置き換える（範囲と優先度はそのまま）"""
+        entries = self.selected_queue_entries(allow_running=False)
+        if not entries:
+            return
+        if not messagebox.askyesno("確認", f"選択した{len(entries)}件の処理設定を現在の設定に変更しますか?",
+                                   parent=self.queue_view.canvas):
+            return
+        settings = self.get_current_settings()
+        with self.queue_lock:
+            for entry in entries:
+                entry.update(settings)
             self.save_queue()
-            self.update_queue_listbox()
-            items_deleted = 1
+        self.queue_view.invalidate(entries)
+        self.queue_view.redraw()
+        self.update_queue_status(f"{len(entries)}件に現在の設定を適用しました。")
+        self.write_log(f"キューの{len(entries)}件に現在の設定を適用しました。")
 
-        queue_status_label.config(
-            text=f"{items_deleted}件の項目を削除しました。現在のキュー数: {len(self.processing_queue)}",
-            fg="blue" if items_deleted > 0 else "red"
-        )
-        queue_window.lift()
-        self.write_log(f"キューから {items_deleted}件の項目を削除しました。")
+    def delete_queue_items(self):
+        entries = self.selected_queue_entries()
+        if not entries:
+            return
+        deleted = {id(e) for e in entries if e is not self.running_entry}
+        if not deleted:
+            self.update_queue_status("実行中の項目は削除できません。", fg="red")
+            return
+
+        with self.queue_lock:
+            self.processing_queue[:] = [e for e in self.processing_queue if id(e) not in deleted]
+            self.save_queue()
+        self.queue_view.selected_entries()
+        self.queue_view.redraw()
+        self.update_queue_status(f"{len(deleted)}件の項目を削除しました。")
+        self.write_log(f"キューから {len(deleted)}件の項目を削除しました。")
 
     def save_config_callback(self, *args):
         self.save_config()
@@ -814,6 +3735,44 @@ class MosaicRemoverApp:
                                 self.write_log(f"無効なCRF値: {crf}、デフォルト19を使用")
                                 self.cli_options["crf_value"] = "19"
                                 self.crf_var.set("19")
+                        elif line.startswith("schedule="):
+                            policy = line.split("=")[1]
+                            if policy in SCHEDULE_POLICIES:
+                                self.schedule_policy_var.set(SCHEDULE_POLICIES[policy])
+                        elif line.startswith("hwdecode="):
+                            self.preview_hw_decode_var.set(line.split("=")[1] == "1")
+                        elif line.startswith("preview_proxy="):
+                            self.preview_proxy_var.set(line.split("=")[1] == "1")
+                        elif line.startswith("vr_projection="):
+                            projection = line.split("=")[1]
+                            if projection in VR_PROJECTIONS:
+                                self.vr_projection_var.set(VR_PROJECTIONS[projection])
+                        elif line.startswith("vr_per_eye="):
+                            self.vr_per_eye_var.set(line.split("=")[1] == "1")
+                        elif line.startswith("vr_eye_devices="):
+                            self.vr_eye_devices = [d.strip() for d in line.split("=", 1)[1].split(",") if d.strip()]
+                        elif line.startswith("roi="):
+                            self.roi_crop_var.set(line.split("=")[1] == "1")
+                        elif line.startswith("hotfolder="):
+                            self.hot_folder_path = line.split("=", 1)[1]
+                        elif line.startswith("hotfolder_enabled="):
+                            self.hot_folder_var.set(line.split("=")[1] == "1" and bool(self.hot_folder_path))
+                        elif line.startswith("hotfolder_autostart="):
+                            self.hot_folder_autostart = line.split("=")[1] == "1"
+                        elif line.startswith("staging_ahead="):
+                            value = line.split("=")[1]
+                            if value.isdigit():
+                                self.staging_ahead = int(value)
+                        elif line.startswith("staging_budget_gb="):
+                            value = line.split("=")[1]
+                            if value.isdigit():
+                                self.staging_budget_gb = int(value)
+                        elif line.startswith("staging_bandwidth="):
+                            value = line.split("=")[1]
+                            if value.isdigit():
+                                self.staging_bandwidth = int(value)
+                        elif line.startswith("quicklook_reduced="):
+                            self.quick_look_reduced_var.set(line.split("=")[1] == "1")
             except Exception as e:
                 self.write_log(f"設定ファイルの読み込みに失敗しました: {e}")
                 messagebox.showwarning("警告", f"設定ファイルの読み込みに失敗しました: {e}。デフォルト値で続行します。")
@@ -825,6 +3784,20 @@ class MosaicRemoverApp:
                 f.write(f"tvai={self.tvai_var.get()}\n")
                 f.write(f"quality={self.quality_var.get()}\n")
                 f.write(f"crf={self.crf_var.get()}\n")
+                f.write(f"schedule={self.get_schedule_policy()}\n")
+                f.write(f"hwdecode={1 if self.preview_hw_decode_var.get() else 0}\n")
+                f.write(f"preview_proxy={1 if self.preview_proxy_var.get() else 0}\n")
+                f.write(f"vr_per_eye={1 if self.vr_per_eye_var.get() else 0}\n")
+                f.write(f"vr_projection={self.get_vr_projection()}\n")
+                f.write(f"vr_eye_devices={','.join(self.vr_eye_devices)}\n")
+                f.write(f"roi={1 if self.roi_crop_var.get() else 0}\n")
+                f.write(f"hotfolder={self.hot_folder_path}\n")
+                f.write(f"hotfolder_enabled={1 if self.hot_folder_var.get() else 0}\n")
+                f.write(f"hotfolder_autostart={1 if self.hot_folder_autostart else 0}\n")
+                f.write(f"staging_ahead={self.staging_ahead}\n")
+                f.write(f"staging_budget_gb={self.staging_budget_gb}\n")
+                f.write(f"staging_bandwidth={self.staging_bandwidth}\n")
+                f.write(f"quicklook_reduced={1 if self.quick_look_reduced_var.get() else 0}\n")
         except Exception as e:
             self.write_log(f"設定ファイルの保存に失敗しました: {e}")
             messagebox.showwarning("警告", f"設定ファイルの保存に失敗しました: {e}。手動で確認してください。")
@@ -864,7 +3837,7 @@ class MosaicRemoverApp:
         self.write_log(f"D&D raw data: {repr(file_paths_str)}")
         
         file_paths = []
-        valid_extensions = ('.mp4', '.avi', '.mkv', '.mov', '.ts', '.wmv', '.flv')
+        valid_extensions = VIDEO_EXTENSIONS
         
         import re
         
@@ -937,43 +3910,32 @@ class MosaicRemoverApp:
             return
         
         added_files = 0
+        skipped_files = 0
         for file_path in file_paths:
             self.write_log(f"処理対象ファイル: {file_path}")
             
-            with self.cap_lock:
-                cap_temp = cv2.VideoCapture(file_path)
-                if not cap_temp.isOpened():
-                    self.write_log(f"D&Dエラー: 動画ファイルを開けませんでした: {file_path}")
-                    cap_temp.release()
-                    continue
-                total_frames = int(cap_temp.get(cv2.CAP_PROP_FRAME_COUNT))
-                fps = cap_temp.get(cv2.CAP_PROP_FPS) or 30.0
-                cap_temp.release()
+            info = probe_video_info(file_path)
+            if not info:
+                self.write_log(f"D&Dエラー: 動画ファイルを開けませんでした: {file_path}")
+                continue
+            total_frames, fps, width, height = info
+            queue_entry = self.build_queue_entry(file_path, 0, total_frames, fps, width, height)
             
-            queue_entry = {
-                'video_path': file_path,
-                'model': self.model_var.get(),
-                'tvai': self.tvai_var.get(),
-                'quality': int(self.quality_var.get()),
-                'start_frame': 0,
-                'end_frame': total_frames,
-                'ffmpeg_option': self.ffmpeg_option_var.get(),
-                'save_trimmed': self.save_trimmed_video_var.get(),
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'fps': fps,
-                'crf_value': int(self.crf_var.get()),
-                'vr_processing': self.vr_processing_var.get(),
-                'vr_simple_mode': self.vr_simple_mode_var.get()
-            }
+            if self.find_duplicate_entry(queue_entry):
+                skipped_files += 1
+                self.write_log(f"重複のためキュー追加をスキップ: {os.path.basename(file_path)}")
+                continue
             
-            self.processing_queue.append(queue_entry)
+            with self.queue_lock:
+                self.processing_queue.append(queue_entry)
             added_files += 1
             self.write_log(f"キューに追加: {os.path.basename(file_path)}")
         
         if added_files > 0:
             self.save_queue()
             if not self.suppress_queue_message_var.get():
-                messagebox.showinfo("追加完了", f"{added_files}件のファイルをキューに追加しました。\n総キュー数: {len(self.processing_queue)}")
+                skipped_text = f"\n重複のためスキップ: {skipped_files}件" if skipped_files else ""
+                messagebox.showinfo("追加完了", f"{added_files}件のファイルをキューに追加しました。{skipped_text}\n総キュー数: {len(self.processing_queue)}")
             
             last_file_path = file_paths[-1]
             self.file_path_entry.delete(0, tk.END)
@@ -982,10 +3944,81 @@ class MosaicRemoverApp:
             self.current_frame = 0
             self.on_progress_update()
             self.reset_points()
+        elif skipped_files > 0:
+            messagebox.showinfo("情報", f"{skipped_files}件のファイルは同じ範囲・設定で既にキューに登録されています。")
         else:
             self.write_log("D&Dエラー: 有効な動画ファイルがありません")
             messagebox.showerror("エラー", "有効な動画ファイルがドロップされませんでした。")
 
+    def get_schedule_policy(self):
+        for key, label in SCHEDULE_POLICIES.items():
+            if label == self.schedule_policy_var.get():
+                return key
+        return 'fifo'
+
+    def get_vr_projection(self):
+        for key, label in VR_PROJECTIONS.items():
+            if label == self.vr_projection_var.get():
+                return key
+        return 'crop'
+
+    def entry_folder(self, entry):
+        return os.path.normcase(os.path.dirname(os.path.abspath(entry['video_path'])))
+
+    def pick_next_entry(self, pending, policy, folder_counts):
+        """(キュー内の位置, 項目) のリストから方針に従って次の1件を選ぶ（割り込み指定の項目が最優先）"""
+        jumped = [p for p in pending if p[1].get('run_next')]
+        if jumped:
+            return jumped[0]
+        if policy == 'sjf':
+            return min(pending, key=lambda p: (self.estimate_entry_seconds(p[1]), p[0]))
+        if policy == 'priority':
+            return min(pending, key=lambda p: (p[1].get('priority', 1), p[0]))
+        if policy == 'fair':
+            # 処理済み件数が最も少ないフォルダの先頭項目を選ぶ
+            return min(pending, key=lambda p: (folder_counts.get(self.entry_folder(p[1]), 0), p[0]))
+        return pending[0]
+
+    def select_next_entry(self, folder_counts):
+        """スケジューリング方針に従って次に処理するキュー項目を選ぶ"""
+        with self.queue_lock:
+            pending = list(enumerate(self.processing_queue))
+            if not pending:
+                return None
+            entry = self.pick_next_entry(pending, self.get_schedule_policy(), folder_counts)[1]
+            entry.pop('run_next', None)
+            return entry
+
+    def upcoming_entries(self, running_entry, folder_counts, count):
+        """実行中の項目の後に選ばれる見込みの項目を最大count件返す（ステージング用の予測）"""
+        with self.queue_lock:
+            pending = [(i, e) for i, e in enumerate(self.processing_queue) if e is not running_entry]
+        policy = self.get_schedule_policy()
+        counts = dict(folder_counts)
+        folder = self.entry_folder(running_entry)
+        counts[folder] = counts.get(folder, 0) + 1
+        upcoming = []
+        while pending and len(upcoming) < count:
+            choice = self.pick_next_entry(pending, policy, counts)
+            pending.remove(choice)
+            upcoming.append(choice[1])
+            folder = self.entry_folder(choice[1])
+            counts[folder] = counts.get(folder, 0) + 1
+        return upcoming
+
+    def schedule_staging(self, running_entry, folder_counts):
+        """次に処理する見込みのネットワーク上のソースについて、切り出し範囲のローカルコピーを始める"""
+        if self.staging_ahead <= 0:
+            return
+        if self.stager is None:
+            self.stager = SourceStager(os.path.join(self.output_dir, "staging"), self.staging_budget_gb * 1024 ** 3,
+                                       self.staging_bandwidth * 1024 * 1024, self.write_log)
+        jobs = []
+        for entry in self.upcoming_entries(running_entry, folder_counts, self.staging_ahead):
+            if entry.get('fps') and is_network_path(entry['video_path']):
+                jobs.append((entry['video_path'], entry['start_frame'] / entry['fps'], entry['end_frame'] / entry['fps']))
+        self.stager.schedule(jobs)
+
     def start_batch_processing(self, control_frame):
         if not self.processing_queue:
             messagebox.showinfo("情報", "キューは空です。")
@@ -994,11 +4027,13 @@ class MosaicRemoverApp:
             messagebox.showwarning("警告", "処理中です。完了後に実行してください。")
             return
         
-        self.queue_add_button.config(state=tk.DISABLED)
-        self.queue_view_button.config(state=tk.DISABLED)
+        removed = self.remove_duplicate_entries()
+        if removed:
+            self.write_log(f"キュー内の重複ジョブを{removed}件除外しました")
+        
+        # 一括処理中もキュー確認（並べ替え・割り込み）とキュー追加は可能
         self.start_button.config(state=tk.DISABLED)
         self.batch_button.config(state=tk.DISABLED)
-        self.root.bind('<Control-e>', lambda e: None)
 
         self.is_batch_processing = True
         self.is_running = True
@@ -1026,14 +4061,26 @@ class MosaicRemoverApp:
             text=f"バッチ処理中: 1/{original_batch_count}",
             fg="red"
         ))
+        self.start_progress_tracking(self.processing_queue)
+        folder_counts = {}
         
         while self.processing_queue and self.is_batch_processing:
-            entry = self.processing_queue[0]
+            entry = self.select_next_entry(folder_counts)
+            if entry is None:
+                break
+            self.running_entry = entry
             processed_items += 1
             current_count = processed_items
+            # 一括処理中に追加された項目も件数に含める
+            batch_total = processed_items - 1 + len(self.processing_queue)
             
-            self.root.after(0, lambda idx=current_count: self.batch_count_label.config(
-                text=f"バッチ処理中: {idx}/{original_batch_count}",
+            self.begin_progress_item(entry, self.processing_queue)
+            self.root.after(0, self.refresh_queue_window)
+            self.schedule_staging(entry, folder_counts)
+            remaining = self.estimate_remaining_seconds(self.processing_queue)
+            eta_text = f"残り約 {self.format_time(remaining)}"
+            self.root.after(0, lambda idx=current_count, total=batch_total, eta=eta_text: self.batch_count_label.config(
+                text=f"バッチ処理中: {idx}/{total} ({eta})",
                 fg="red"
             ))
             
@@ -1047,11 +4094,16 @@ class MosaicRemoverApp:
             processing_success = False  # 処理成功フラグを追加
             
             try:
+                # 項目に保存されていない設定の既定値は get_entry_settings にまとめる
+                entry_settings = self.get_entry_settings(entry)
                 self.processing_main(
                     entry['video_path'], 
                     entry['start_frame'] / entry['fps'], 
                     entry['end_frame'] / entry['fps'],
-                    entry.get('vr_simple_mode', False)
+                    entry_settings['vr_simple_mode'],
+                    fps=entry['fps'],
+                    frame_size=(entry.get('width', 1920), entry.get('height', 1080)),
+                    settings=entry_settings
                 )
                 
                 processing_success = True  # 処理が正常完了
@@ -1062,10 +4114,19 @@ class MosaicRemoverApp:
                 self.root.after(0, lambda: messagebox.showerror("処理エラー", f"{os.path.basename(entry['video_path'])} の処理中にエラーが発生し、バッチ処理を中断しました。\n未処理の項目はキューに残っています。"))
                 break
             
+            if self.stager:
+                self.stager.discard(entry['video_path'], entry['start_frame'] / entry['fps'], entry['end_frame'] / entry['fps'])
+            
             # 処理が正常完了した場合のみキューから削除
             if processing_success and self.is_batch_processing:
-                del self.processing_queue[0]
-                self.save_queue()
+                with self.queue_lock:
+                    self.processing_queue[:] = [e for e in self.processing_queue if e is not entry]
+                    self.save_queue()
+                self.running_entry = None
+                self.root.after(0, self.refresh_queue_window)
+                folder = self.entry_folder(entry)
+                folder_counts[folder] = folder_counts.get(folder, 0) + 1
+                self.finish_progress_item()
 
                 self.root.after(0, lambda: self.status_label.config(text=f"完了: {os.path.basename(entry['video_path'])}"))
                 self.write_log(f"完了: {os.path.basename(entry['video_path'])}")
@@ -1084,7 +4145,11 @@ class MosaicRemoverApp:
         
         self.is_batch_processing = False
         self.is_running = False
+        self.running_entry = None
+        if self.stager:
+            self.stager.clear()
         self.root.after(0, lambda: self.batch_count_label.config(text=""))
+        self.root.after(0, self.stop_progress_tracking)
         self.root.after(0, lambda: self.queue_add_button.config(state=tk.NORMAL))
         self.root.after(0, lambda: self.queue_view_button.config(state=tk.NORMAL))
         self.root.after(0, lambda: self.start_button.config(state=tk.NORMAL))
@@ -1115,10 +4180,26 @@ class MosaicRemoverApp:
         input_filename = os.path.basename(input_file)
         self.write_log(f"LADA処理を開始しました {input_filename}")
         
-        self.processing_thread = threading.Thread(target=self.processing_main, args=(input_file, start_time_sec, end_time_sec))
+        frame_size = self.get_preview_frame_size()
+        single_entry = {
+            'start_frame': self.start_frame, 'end_frame': self.end_frame, 'fps': self.video_fps,
+            'width': frame_size[0], 'height': frame_size[1],
+            'vr_processing': self.vr_processing_var.get(), 'tvai': self.tvai_var.get()
+        }
+        self.start_progress_tracking([single_entry])
+        self.begin_progress_item(single_entry)
+        
+        self.processing_thread = threading.Thread(target=self.processing_main, args=(input_file, start_time_sec, end_time_sec),
+                                                  kwargs={'fps': self.video_fps, 'frame_size': frame_size})
         self.processing_thread.daemon = True
         self.processing_thread.start()
 
+    def get_preview_frame_size(self):
+        """プレビュー中の動画の解像度 (幅, 高さ) を返す"""
+        if self.decoders:
+            return self.decoders.source_size
+        return (1920, 1080)
+
     def validate_inputs(self):
         if not self.file_path_entry.get():
             messagebox.showerror("エラー", "動画ファイルを選択してください。")
@@ -1131,10 +4212,62 @@ class MosaicRemoverApp:
             return False
         return True
 
-    def processing_main(self, input_file, start_time_sec, end_time_sec, vr_simple_mode=None):
+    def load_trim_health_cache(self):
+        if os.path.exists(self.trim_health_file):
+            try:
+                with open(self.trim_health_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                self.write_log(f"切り出し判定キャッシュ読み込みエラー: {str(e)}")
+        return {}
+
+    def save_trim_health_cache(self):
+        try:
+            with open(self.trim_health_file, 'w', encoding='utf-8') as f:
+                json.dump(self.trim_health_cache, f, ensure_ascii=False)
+        except OSError as e:
+            self.write_log(f"切り出し判定キャッシュ保存エラー: {str(e)}")
+
+    def resolve_trim_mode(self, input_file):
+        """「自動判定」の切り出し方法を決める（判定できなければ安全な再エンコードにする）"""
+        try:
+            stat = os.stat(input_file)
+        except OSError:
+            return 're_encode'
+        cache_key = f"{os.path.abspath(input_file)}|{stat.st_size}|{stat.st_mtime_ns}"
+        verdict = self.trim_health_cache.get(cache_key)
+        if verdict is None:
+            started = time.perf_counter()
+            verdict = probe_timestamp_health(input_file)
+            if verdict is None:
+                self.write_log(f"切り出し方法の自動判定に失敗したため再エンコードします: {os.path.basename(input_file)}")
+                return 're_encode'
+            self.trim_health_cache[cache_key] = verdict
+            while len(self.trim_health_cache) > TRIM_HEALTH_CACHE_LIMIT:
+                del self.trim_health_cache[next(iter(self.trim_health_cache))]
+            self.save_trim_health_cache()
+            self.write_log(f"タイムスタンプ検査: {time.perf_counter() - started:.1f}秒")
+        reasons = '、'.join(verdict['reasons']) or '問題なし'
+        message = f"切り出し方法の自動判定: {verdict['mode']}（{reasons}）"
+        self.console_text.config(state=tk.NORMAL)
+        self.console_text.insert(tk.END, message + "\n")
+        self.console_text.config(state=tk.DISABLED)
+        self.write_log(message)
+        return verdict['mode']
+
+    def processing_main(self, input_file, start_time_sec, end_time_sec, vr_simple_mode=None, fps=None, frame_size=None, settings=None):
+        # settingsがNoneの場合は現在のGUI設定を使用(単一処理用)、一括処理ではキュー項目の設定を使用
+        if settings is None:
+            settings = self.get_current_settings()
         # vr_simple_modeがNoneの場合は現在のGUI設定を使用(単一処理用)
         if vr_simple_mode is None:
-            vr_simple_mode = self.vr_simple_mode_var.get()
+            vr_simple_mode = settings['vr_simple_mode']
+        if fps is None:
+            fps = self.video_fps
+        if frame_size is None:
+            frame_size = (1920, 1080)
+        if settings['ffmpeg_option'] == 'auto':
+            settings = {**settings, 'ffmpeg_option': self.resolve_trim_mode(input_file)}
         
         if self.is_batch_processing:
             self.write_log(f"処理前リソースチェック: {os.path.basename(input_file)}")
@@ -1142,32 +4275,72 @@ class MosaicRemoverApp:
         time.sleep(1)
 
         unique_id = uuid.uuid4().hex
+        self.current_job_id = unique_id
+        # 前のジョブでエンコーダー検出待ちがタイムアウトしていても、検出が終わっていれば検出結果を使う
+        self.encoder_fallback = self.encoder_fallback and not self.encoder_ready.is_set()
+        self.current_job_frames = int(round((end_time_sec - start_time_sec) * fps)) if fps and fps > 0 else 0
+        job_started = time.perf_counter()
+        job_status = 'failed'
         input_ext = os.path.splitext(input_file)[1]
         trimmed_base_name = f"trimmed_{unique_id}"
-        trimmed_file_ext = '.mp4' if self.ffmpeg_option_var.get() == "re_encode" else input_ext
+        trimmed_file_ext = '.mp4' if settings['ffmpeg_option'] == "re_encode" else input_ext
         trimmed_file_path = os.path.join(self.output_dir, f"{trimmed_base_name}{trimmed_file_ext}")
         processed_file_path = None
         
         try:
-            option = self.ffmpeg_option_var.get()
+            option = settings['ffmpeg_option']
             start_time_str = self.format_time(start_time_sec)
             end_time_str = self.format_time(end_time_sec)
             
+            # 同一ソース・範囲・設定の処理済み出力があれば再処理せずに再利用する
+            cache_key = self.build_result_cache_key(input_file, start_time_str, end_time_str, settings)
+            cached_output = self.lookup_result_cache(cache_key)
+            if cached_output:
+                self.console_text.config(state=tk.NORMAL)
+                self.console_text.insert(tk.END, f"同一条件の処理済み動画があるため再利用します: {cached_output}\n")
+                self.console_text.config(state=tk.DISABLED)
+                self.write_log(f"結果キャッシュ利用: {cached_output}")
+                # 通常の処理と同じ名前の出力を作る（同じドライブならハードリンク、できなければコピー）
+                saved_processed_path = self.build_output_path(input_file, start_time_sec, end_time_sec, settings)
+                with self.measure_stage('cache_link', input_path=cached_output, output_path=saved_processed_path):
+                    try:
+                        os.link(cached_output, saved_processed_path)
+                    except OSError:
+                        shutil.copy2(cached_output, saved_processed_path)
+                job_status = 'cached'
+                saved_processed_name = os.path.basename(saved_processed_path)
+                self.status_label.config(text=f"処理済み出力を再利用して保存しました: {saved_processed_name}", fg="blue")
+                self.write_log(f"処理済み出力を再利用して保存しました: {saved_processed_name}")
+                
+                if not self.is_batch_processing and self.show_completion_dialog_var.get():
+                    mode_text = "VR" if settings['vr_processing'] else "2D"
+                    messagebox.showinfo("完了", f"動画のモザイク除去が完了しました! (モード: {mode_text}、処理済み出力を再利用)\n\n"
+                                              f"ファイル名: {saved_processed_name}")
+                self.write_log("動画のモザイク除去が完了しました!")
+                return
+            
+            # 先行コピー済みならローカルのコピーから切り出す（オフセット・時刻は元のファイルと同じ）
+            trim_source = (self.stager.lookup(input_file, start_time_sec, end_time_sec) if self.stager else None) or input_file
+            if trim_source != input_file:
+                self.write_log(f"ステージング済みのローカルコピーから切り出し: {trim_source}")
+            
             if option == "re_encode":
-                crf_value = self.crf_var.get()
+                crf_value = str(settings['crf_value'])
                 ffmpeg_command = [
-                    "ffmpeg", "-y", "-ss", start_time_str, "-to", end_time_str, "-i", input_file,
-                    "-c:v", "h264_nvenc", "-c:a", "aac", "-preset", "fast", "-rc", "vbr_hq", "-cq", crf_value,
+                    "ffmpeg", "-y", "-ss", start_time_str, "-to", end_time_str, "-i", trim_source,
+                    *self.get_video_encoder_args('final', crf_value),
+                    *(['-vf', self.get_video_filter('final')] if self.get_video_filter('final') else []),
+                    *self.get_audio_args(trim_source, trimmed_file_ext),
                     trimmed_file_path
                 ]
             elif option == "copy":
                 ffmpeg_command = [
-                    "ffmpeg", "-y", "-ss", start_time_str, "-to", end_time_str, "-i", input_file,
+                    "ffmpeg", "-y", "-ss", start_time_str, "-to", end_time_str, "-i", trim_source,
                     "-c", "copy", trimmed_file_path
                 ]
             elif option == "copy_genpts":
                 ffmpeg_command = [
-                    "ffmpeg", "-y", "-ss", start_time_str, "-to", end_time_str, "-i", input_file,
+                    "ffmpeg", "-y", "-ss", start_time_str, "-to", end_time_str, "-i", trim_source,
                     "-c", "copy", "-fflags", "+genpts", trimmed_file_path
                 ]
             else:
@@ -1178,7 +4351,8 @@ class MosaicRemoverApp:
             self.console_text.config(state=tk.DISABLED)
             self.write_log(f"動画を切り出し中...\n実行コマンド: {' '.join(ffmpeg_command)}")
             
-            process = subprocess.run(ffmpeg_command, check=True, creationflags=subprocess.CREATE_NO_WINDOW)
+            with self.measure_stage('trim', input_path=trim_source, output_path=trimmed_file_path):
+                subprocess.run(ffmpeg_command, check=True, creationflags=CREATE_NO_WINDOW)
 
             self.console_text.config(state=tk.NORMAL)
             self.console_text.insert(tk.END, "動画の切り出しが完了しました。\n")
@@ -1189,9 +4363,26 @@ class MosaicRemoverApp:
             
             self.status_label.config(text="切り出し完了。モザイク除去を開始します...", fg="green")
             self.save_config()
+            
+            # モザイク領域の検出（検出できた場合はその領域だけをLADAで処理して元動画に重ねる）
+            # TVAIを掛けると処理済み領域だけが拡大され、元動画の同じ位置に重ねられないため全体を処理する
+            roi = None
+            if settings.get('roi_crop') and settings['tvai'] == "1":
+                self.write_log("TVAIを使用するため、モザイク領域のみの処理は行わず全体を処理します")
+            elif settings.get('roi_crop'):
+                with self.measure_stage('roi_detect', input_path=trimmed_file_path):
+                    roi = self.detect_mosaic_roi(trimmed_file_path)
+                if roi:
+                    message = f"モザイク領域を検出: {roi[2]}x{roi[3]}+{roi[0]}+{roi[1]}"
+                else:
+                    message = "モザイク領域を限定できないため全体を処理します"
+                self.console_text.config(state=tk.NORMAL)
+                self.console_text.insert(tk.END, message + "\n")
+                self.console_text.config(state=tk.DISABLED)
+                self.write_log(message)
 
             # VR処理の判定
-            is_vr_mode = self.vr_processing_var.get()
+            is_vr_mode = settings['vr_processing']
             
             if is_vr_mode:
                 # VR処理モード（簡易専用）
@@ -1200,66 +4391,51 @@ class MosaicRemoverApp:
                 self.console_text.config(state=tk.DISABLED)
                 self.write_log("VR処理モード開始")
                 
-                # 1. VR映像を処理（中央領域抽出、音声抽出）
-                parts, audio_file = self.split_vr_video(trimmed_file_path, unique_id)
+                # 投影変換のビュー（中央切り出しを選んだ場合、モザイク領域の検出結果がない場合、必要な視野角が広すぎる場合はNone）
+                vr_views = None
+                projection = settings.get('vr_projection', 'crop')
+                if projection != 'crop':
+                    vr_views = self.vr_views(*self.get_video_size(trimmed_file_path), roi, projection)
+                    if not roi:
+                        self.write_log("モザイク領域の検出結果がないため、VR中央切り出しで処理します")
+                    elif not vr_views:
+                        self.write_log("モザイク領域が広すぎるため、VR中央切り出しで処理します")
                 
-                # 2. 中央領域をLADA処理（1回のみ）
-                center_file = os.path.join(self.output_dir, f'{unique_id}_center.mp4')
+                if settings.get('vr_per_eye'):
+                    # 1-2. 左右の目を別々に抽出し、同時にLADA処理
+                    eye_parts = self.process_vr_eyes(trimmed_file_path, unique_id, settings, roi, vr_views)
+                else:
+                    # 1. VR映像を処理（中央領域抽出）
+                    parts = self.split_vr_video(trimmed_file_path, unique_id, roi, vr_views)
                 
-                if not os.path.exists(center_file):
-                    raise Exception("中央領域ファイルが見つかりません")
+                    # 2. 中央領域をLADA処理（1回のみ）
+                    center_file = os.path.join(self.output_dir, f'{unique_id}_center{self.get_intermediate_ext()}')
                 
-                self.console_text.config(state=tk.NORMAL)
-                self.console_text.insert(tk.END, f"VR中央領域を処理中...\n")
-                self.console_text.config(state=tk.DISABLED)
-                self.status_label.config(text="VR中央領域を処理中")
-                self.write_log("VR中央領域LADA処理開始")
+                    if not os.path.exists(center_file):
+                        raise Exception("中央領域ファイルが見つかりません")
                 
-                if self.ps_script_path:
-                    ps_command = ["powershell.exe", "-ExecutionPolicy", "Bypass", "-File", self.ps_script_path]
-                    input_data = f"{center_file}\n{self.model_var.get()}\n{self.tvai_var.get()}\n{self.quality_var.get()}\n"
-
-                    self.process = subprocess.Popen(
-                        ps_command,
-                        stdin=subprocess.PIPE,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        text=True,
-                        bufsize=1,
-                        creationflags=subprocess.CREATE_NO_WINDOW
-                    )
-                    
-                    self.process.stdin.write(input_data)
-                    self.process.stdin.flush()
-                    self.process.stdin.close()
-
-                    for line in iter(self.process.stdout.readline, ''):
-                        self.console_text.config(state=tk.NORMAL)
-                        self.console_text.insert(tk.END, line)
-                        self.console_text.see(tk.END)
-                        self.console_text.config(state=tk.DISABLED)
-                        if not line.strip().startswith("Processing frames:"):
-                            self.write_log(line.strip())
-                        self.root.update()
-
-                    self.process.stdout.close()
-                    self.process.wait()
-
-                    if self.process.returncode != 0:
-                        raise Exception("VR中央領域の処理に失敗しました")
+                    self.console_text.config(state=tk.NORMAL)
+                    self.console_text.insert(tk.END, f"VR中央領域を処理中...\n")
+                    self.console_text.config(state=tk.DISABLED)
+                    self.status_label.config(text="VR中央領域を処理中")
+                    self.write_log("VR中央領域LADA処理開始")
                 
-                # 3. 処理済みファイルを結合して音声合成
-                base_name = os.path.splitext(os.path.basename(input_file))[0]
-                start_time_str_renamed = self.format_time(start_time_sec).replace(':', '')
-                end_time_str_renamed = self.format_time(end_time_sec).replace(':', '')
-                timestamp_tag = f"{start_time_str_renamed}-{end_time_str_renamed}"
-                cli_options_tag = f"model{self.model_var.get()}_tvai{self.tvai_var.get()}_quality{self.quality_var.get()}"
+                    if self.ps_script_path:
+                        with self.measure_stage('restore', input_path=center_file):
+                            returncode = self.run_launcher(center_file, settings)
 
-                saved_processed_name = f"{base_name}_{timestamp_tag}_{cli_options_tag}_VR_unmosaiced.mp4"
-                saved_processed_path = os.path.join(self.output_dir, saved_processed_name)
-                saved_processed_path = self.generate_unique_filepath(saved_processed_path)
+                        if returncode != 0:
+                            raise Exception("VR中央領域の処理に失敗しました")
+                
+                # 3. 処理済み領域を元動画に合成（音声は切り出し動画からコピー）
+                saved_processed_path = self.build_output_path(input_file, start_time_sec, end_time_sec, settings)
 
-                self.merge_vr_video(unique_id, parts, saved_processed_path, audio_file)
+                if settings.get('vr_per_eye'):
+                    self.merge_vr_eyes(unique_id, trimmed_file_path, eye_parts, saved_processed_path, vr_views)
+                else:
+                    self.merge_vr_video(unique_id, parts, saved_processed_path, roi, vr_views)
+                job_status = 'success'
+                self.store_result_cache(cache_key, input_file, saved_processed_path)
 
                 self.status_label.config(text=f"VR処理完了: {os.path.basename(saved_processed_path)}", fg="blue")
                 self.write_log(f"VR処理完了: {os.path.basename(saved_processed_path)}")
@@ -1270,37 +4446,17 @@ class MosaicRemoverApp:
                 
             else:
                 # 通常の2D処理モード
+                restore_input = trimmed_file_path
+                if roi:
+                    x, y, w, h = roi
+                    restore_input = os.path.join(self.output_dir, f'{unique_id}_roi{self.get_intermediate_ext()}')
+                    self.crop_region(trimmed_file_path, restore_input, f'{w}:{h}:{x}:{y}', 'roi_crop')
+                
                 if self.ps_script_path:
-                    ps_command = ["powershell.exe", "-ExecutionPolicy", "Bypass", "-File", self.ps_script_path]
-                    input_data = f"{trimmed_file_path}\n{self.model_var.get()}\n{self.tvai_var.get()}\n{self.quality_var.get()}\n"
-
-                    self.process = subprocess.Popen(
-                        ps_command,
-                        stdin=subprocess.PIPE,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        text=True,
-                        bufsize=1,
-                        creationflags=subprocess.CREATE_NO_WINDOW
-                    )
-                    
-                    self.process.stdin.write(input_data)
-                    self.process.stdin.flush()
-                    self.process.stdin.close()
-
-                    for line in iter(self.process.stdout.readline, ''):
-                        self.console_text.config(state=tk.NORMAL)
-                        self.console_text.insert(tk.END, line)
-                        self.console_text.see(tk.END)
-                        self.console_text.config(state=tk.DISABLED)
-                        if not line.strip().startswith("Processing frames:"):
-                            self.write_log(line.strip())
-                        self.root.update()
+                    with self.measure_stage('restore', input_path=restore_input) as restore_stage:
+                        returncode = self.run_launcher(restore_input, settings)
 
-                    self.process.stdout.close()
-                    self.process.wait()
-
-                    if self.process.returncode != 0:
+                    if returncode != 0:
                         self.status_label.config(text="PowerShellスクリプト実行失敗", fg="red")
                         self.console_text.config(state=tk.NORMAL)
                         self.console_text.insert(tk.END, "PowerShellスクリプトの実行に失敗しました。\n")
@@ -1308,12 +4464,26 @@ class MosaicRemoverApp:
                         self.write_log("PowerShellスクリプトの実行に失敗しました。")
                         messagebox.showerror("実行エラー", "PowerShellスクリプトの実行に失敗しました。詳細はコンソールログをご確認ください。")
                     else:
-                        for file_name in os.listdir(self.output_dir):
-                            if trimmed_base_name in file_name and file_name != os.path.basename(trimmed_file_path):
-                                processed_file_path = os.path.join(self.output_dir, file_name)
-                                break
+                        if roi:
+                            for file_name in os.listdir(self.output_dir):
+                                if file_name.startswith(f'{unique_id}_roi') and 'lada' in file_name.lower():
+                                    processed_file_path = os.path.join(self.output_dir, file_name)
+                                    break
+                        else:
+                            for file_name in os.listdir(self.output_dir):
+                                if trimmed_base_name in file_name and file_name != os.path.basename(trimmed_file_path):
+                                    processed_file_path = os.path.join(self.output_dir, file_name)
+                                    break
                         
-                        if not processed_file_path or not os.path.exists(processed_file_path):
+                        if processed_file_path and os.path.exists(processed_file_path):
+                            restore_stage['bytes_written'] = os.path.getsize(processed_file_path)
+                            if roi:
+                                # 処理済みのモザイク領域を切り出し動画の元の位置に重ねる
+                                roi_processed_path = processed_file_path
+                                processed_file_path = os.path.join(self.output_dir, f'{unique_id}_roi_composite.mp4')
+                                self.overlay_region(trimmed_file_path, [(roi_processed_path, f'{roi[0]}:{roi[1]}')], processed_file_path)
+                                os.remove(roi_processed_path)
+                        else:
                             self.status_label.config(text="処理済み動画ファイルが見つかりません。", fg="red")
                             self.console_text.config(state=tk.NORMAL)
                             self.console_text.insert(tk.END, "エラー: LADAの出力ファイルが見つかりませんでした。\n")
@@ -1321,18 +4491,13 @@ class MosaicRemoverApp:
                             self.write_log("エラー: LADAの出力ファイルが見つかりませんでした。")
                             return
                         
-                        base_name = os.path.splitext(os.path.basename(input_file))[0]
-                        start_time_str_renamed = self.format_time(start_time_sec).replace(':', '')
-                        end_time_str_renamed = self.format_time(end_time_sec).replace(':', '')
-                        timestamp_tag = f"{start_time_str_renamed}-{end_time_str_renamed}"
-                        cli_options_tag = f"model{self.model_var.get()}_tvai{self.tvai_var.get()}_quality{self.quality_var.get()}"
-                        
-                        saved_processed_name = f"{base_name}_{timestamp_tag}_{cli_options_tag}_unmosaiced.mp4"
-                        saved_processed_path = os.path.join(self.output_dir, saved_processed_name)
-                        saved_processed_path = self.generate_unique_filepath(saved_processed_path)
+                        saved_processed_path = self.build_output_path(input_file, start_time_sec, end_time_sec, settings)
                         saved_processed_name = os.path.basename(saved_processed_path)
                         try:
-                            os.rename(processed_file_path, saved_processed_path)
+                            with self.measure_stage('rename'):
+                                os.rename(processed_file_path, saved_processed_path)
+                            job_status = 'success'
+                            self.store_result_cache(cache_key, input_file, saved_processed_path)
                             self.status_label.config(text=f"処理済み動画を保存しました: {saved_processed_name}", fg="blue")
                             self.write_log(f"処理済み動画を保存しました: {saved_processed_name}")
                         except Exception as e:
@@ -1343,7 +4508,7 @@ class MosaicRemoverApp:
                             self.write_log(f"ファイル名の変更に失敗しました: {e}")
                 
                 # 切り出し動画の保存処理
-                if self.save_trimmed_video_var.get():
+                if settings['save_trimmed']:
                     base_name = os.path.splitext(os.path.basename(input_file))[0]
                     start_time_str_renamed = self.format_time(start_time_sec).replace(':', '')
                     end_time_str_renamed = self.format_time(end_time_sec).replace(':', '')
@@ -1388,24 +4553,135 @@ class MosaicRemoverApp:
             if not self.is_batch_processing:
                 self.start_button.config(state=tk.NORMAL, text="処理開始 (単一)")
                 self.batch_button.config(state=tk.NORMAL)
+                self.root.after(0, self.stop_progress_tracking)
             self.is_running = False
             input_filename = os.path.basename(input_file)
             self.write_log(f"LADA処理を終了しました {input_filename}")
+            self.record_job_metrics(unique_id, input_file, end_time_sec - start_time_sec, frame_size,
+                                    time.perf_counter() - job_started, job_status, settings)
+            for file_name in os.listdir(self.output_dir):
+                if file_name.startswith((f'{unique_id}_roi', f'{unique_id}_eye_')):
+                    os.remove(os.path.join(self.output_dir, file_name))
+                    self.write_log(f"一時ファイル削除: {file_name}")
             if 'trimmed_file_path' in locals() and os.path.exists(trimmed_file_path):
-                if not self.save_trimmed_video_var.get():
+                if not settings['save_trimmed']:
                     os.remove(trimmed_file_path)
                     self.write_log(f"一時ファイル削除: {trimmed_file_path}")
                     
-    def merge_vr_video(self, unique_id, parts, output_file, audio_file):
-        """VR処理済み中央領域を元動画に合成して音声を追加"""
+    def build_output_path(self, input_file, start_time_sec, end_time_sec, settings):
+        """処理済み動画の保存先（元ファイル名・範囲・設定から作り、既存のファイルとは重ならない名前）を返す"""
+        base_name = os.path.splitext(os.path.basename(input_file))[0]
+        start_time_str_renamed = self.format_time(start_time_sec).replace(':', '')
+        end_time_str_renamed = self.format_time(end_time_sec).replace(':', '')
+        timestamp_tag = f"{start_time_str_renamed}-{end_time_str_renamed}"
+        cli_options_tag = f"model{settings['model']}_tvai{settings['tvai']}_quality{settings['quality']}"
+        vr_tag = "_VR" if settings['vr_processing'] else ""
+        saved_processed_name = f"{base_name}_{timestamp_tag}_{cli_options_tag}{vr_tag}_unmosaiced.mp4"
+        return self.generate_unique_filepath(os.path.join(self.output_dir, saved_processed_name))
+
+    def get_video_size(self, video_file):
+        cap = cv2.VideoCapture(video_file)
+        size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        cap.release()
+        return size
+
+    def vr_eye_regions(self, width, height, roi=None):
+        """SBS映像の左右の目ごとの処理領域 [(目, (x, y, w, h))] を返す
+        
+        通常は各目の中央70%（縦横83.7%）。モザイク領域の検出結果があれば各目の範囲と重なる部分とし、
+        重ならない目は処理しない。
+        """
+        eye_width = width // 2
+        regions = []
+        for eye, offset in (('left', 0), ('right', eye_width)):
+            if roi:
+                x0 = max(roi[0], offset)
+                x1 = min(roi[0] + roi[2], offset + eye_width)
+                if x1 - x0 < 16:
+                    continue
+                regions.append((eye, (x0, roi[1], (x1 - x0) // 2 * 2, roi[3])))
+            else:
+                w = int(eye_width * 0.837) // 2 * 2
+                h = int(height * 0.837) // 2 * 2
+                regions.append((eye, (offset + (eye_width - w) // 2, (height - h) // 2, w, h)))
+        return regions
+
+    def process_vr_eyes(self, trimmed_file, unique_id, settings, roi=None, views=None):
+        """左右の目を別々の中間ファイルに切り出し（1回のデコード）、同時にLADA処理する
+        
+        処理済みの [(目, 処理済みファイル, (x, y, w, h))] を返す（viewsを指定した場合は (x, y, w, h) の代わりにビュー）。
+        """
+        width, height = self.get_video_size(trimmed_file)
+        if views:
+            regions = [(view['eye'], view) for view in views]
+        else:
+            regions = self.vr_eye_regions(width, height, roi)
+        if not regions:
+            raise Exception("処理する領域がありません")
+        
+        self.console_text.config(state=tk.NORMAL)
+        self.console_text.insert(tk.END, f"VR左右分割モード: {', '.join(eye for eye, _ in regions)} を抽出中...\n")
+        self.console_text.config(state=tk.DISABLED)
+        ext = self.get_intermediate_ext()
+        eye_files = [(eye, os.path.join(self.output_dir, f'{unique_id}_eye_{eye}{ext}'), rect) for eye, rect in regions]
+        if views:
+            self.write_log("VR左右分割: 各目のビュー抽出開始 " + ", ".join(self.format_vr_view(view) for view in views))
+            self.extract_vr_views(trimmed_file, [(path, [view]) for _, path, view in eye_files])
+        else:
+            self.write_log("VR左右分割: 各目の領域抽出開始 " +
+                           ", ".join(f"{eye}={w}x{h}+{x}+{y}" for eye, (x, y, w, h) in regions))
+            self.crop_regions(trimmed_file, [(path, f'{w}:{h}:{x}:{y}') for _, path, (x, y, w, h) in eye_files], 'vr_crop')
+        
+        self.status_label.config(text="VR左右の領域を並列処理中")
+        self.write_log("VR左右並列LADA処理開始")
+        jobs = []
+        for index, (eye, path, _) in enumerate(eye_files):
+            device = self.vr_eye_devices[index % len(self.vr_eye_devices)] if self.vr_eye_devices else None
+            jobs.append((eye, path, device))
+        with self.measure_stage('restore', input_path=eye_files[0][1]):
+            returncodes = self.run_launchers_parallel(jobs, settings)
+        if any(code != 0 for code in returncodes):
+            raise Exception("VR左右領域の処理に失敗しました")
+        
+        parts = []
+        for eye, path, rect in eye_files:
+            processed = None
+            for file in os.listdir(self.output_dir):
+                if file.startswith(f'{unique_id}_eye_{eye}') and 'lada' in file.lower():
+                    processed = os.path.join(self.output_dir, file)
+                    break
+            if not processed:
+                raise Exception(f"LADA処理済みファイルが見つかりません ({eye})")
+            parts.append((eye, processed, rect))
+        return parts
+
+    def merge_vr_eyes(self, unique_id, trimmed_file, parts, output_file, views=None):
+        """処理済みの左右の領域を1回の合成で元動画に重ね、中間ファイルを削除する"""
+        self.console_text.config(state=tk.NORMAL)
+        self.console_text.insert(tk.END, "処理済みの左右の領域を元動画に合成中...\n")
+        self.console_text.config(state=tk.DISABLED)
+        self.write_log("VR左右合成開始")
+        
+        if views:
+            self.reproject_vr_views(trimmed_file, [(path, [view]) for _, path, view in parts], output_file)
+        else:
+            self.overlay_region(trimmed_file, [(path, f'{x}:{y}') for _, path, (x, y, _, _) in parts], output_file)
+        
+        for file in os.listdir(self.output_dir):
+            if file.startswith(f'{unique_id}_eye_'):
+                os.remove(os.path.join(self.output_dir, file))
+                self.write_log(f"中間ファイル削除: {file}")
+        self.write_log("VR左右合成完了")
+
+    def merge_vr_video(self, unique_id, parts, output_file, roi=None, views=None):
+        """VR処理済み中央領域を元動画に合成（音声は合成時に切り出し動画からコピー）"""
         
         # LADA処理済みの中央領域ファイルを探す
         center_processed = None
         for file in os.listdir(self.output_dir):
             # より柔軟な検索パターン
             if (f'{unique_id}_center' in file and 
-                'lada' in file.lower() and 
-                file.endswith('.mp4')):
+                'lada' in file.lower()):
                 center_processed = os.path.join(self.output_dir, file)
                 self.write_log(f"LADA処理済みファイル検出: {file}")
                 break
@@ -1424,35 +4700,8 @@ class MosaicRemoverApp:
         self.console_text.insert(tk.END, f"LADA処理済みファイル: {os.path.basename(center_processed)}\n")
         self.console_text.config(state=tk.DISABLED)
         
-        # 中央領域を元動画に合成
-        temp_video = os.path.join(self.output_dir, f'{unique_id}_temp_composited.mp4')
-        self.apply_vr_distortion(center_processed, temp_video, unique_id)
-        
-        # 音声を合成
-        if audio_file and os.path.exists(audio_file):
-            final_merge_cmd = [
-                'ffmpeg', '-y', '-i', temp_video, '-i', audio_file,
-                '-c:v', 'copy', '-c:a', 'aac', '-b:a', '192k',
-                '-shortest', output_file
-            ]
-            subprocess.run(final_merge_cmd, check=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            self.write_log("音声合成完了")
-            
-            # 音声ファイル削除
-            os.remove(audio_file)
-            self.write_log(f"音声ファイル削除: {audio_file}")
-        else:
-            # 音声がない場合はそのまま移動
-            if os.path.exists(temp_video):
-                os.rename(temp_video, output_file)
-        
-        # 一時ファイルを削除
-        if os.path.exists(temp_video) and temp_video != output_file:
-            try:
-                os.remove(temp_video)
-                self.write_log(f"一時ファイル削除: temp_composited.mp4")
-            except:
-                pass
+        # 中央領域を元動画に合成して最終出力に直接書き出す
+        self.apply_vr_distortion(center_processed, output_file, unique_id, roi, views)
         
         # LADA処理済みファイルを削除
         if os.path.exists(center_processed):
@@ -1460,67 +4709,174 @@ class MosaicRemoverApp:
             self.write_log(f"LADA処理済みファイル削除: {os.path.basename(center_processed)}")
         
         # 中央抽出ファイルを削除
-        center_file = os.path.join(self.output_dir, f'{unique_id}_center.mp4')
+        center_file = os.path.join(self.output_dir, f'{unique_id}_center{self.get_intermediate_ext()}')
         if os.path.exists(center_file):
             os.remove(center_file)
             self.write_log(f"中央抽出ファイル削除: center.mp4")
         
         self.write_log("VR合成処理完了")
 
-    def load_video(self, file_path):
+    def open_preview_decoders(self, file_path):
+        """プレビュー用のデコーダー一式を開き直す（作成済みのプロキシがあればそちらを開く）。開けなければNoneを返す"""
+        self.buffer_running = False
+        proxy = self.proxy_manager.lookup(file_path) if self.preview_proxy_var.get() else None
         with self.cap_lock:
-            if self.cap:
-                self.cap.release()
-                self.cap = None
+            if self.decoders:
+                self.decoders.release()
+            self.decoders = None
+            self.cap = None
+            decoders = None
+            if proxy:
+                decoders = DecoderPool(proxy['proxy'], self.preview_hw_decode_var.get(),
+                                       source_size=(proxy['width'], proxy['height']))
+                if not decoders.isOpened():
+                    decoders.release()
+                    decoders = None
+            if decoders is None:
+                decoders = DecoderPool(file_path, self.preview_hw_decode_var.get())
+            if not decoders.isOpened():
+                decoders.release()
+                return None
+            self.preview_view = self.preview_settings.get(self.preview_settings_key(file_path))
+            decoders.set_view(self.preview_view)
+            self.decoders = decoders
+            self.cap = decoders.playback.cap
+            self.frame_ring = FrameRingBuffer(decoders.width, decoders.height)
+        self.preview_view_var.set(PREVIEW_VIEWS[(self.preview_view or {}).get('mode', 'full')])
+        self.update_decoder_label()
+        return decoders
+
+    def update_decoder_label(self):
+        if not self.decoders:
+            self.decoder_label.config(text="")
+            return
+        text = f"デコード: {self.decoders.playback.name}"
+        if self.decoders.is_proxy:
+            text += "（プロキシ）"
+        elif self.proxy_progress is not None:
+            text += f"  プロキシ作成中 {self.proxy_progress * 100:.0f}%"
+        self.decoder_label.config(text=text)
+
+    def start_preview_proxy(self, file_path):
+        """読み込んだ動画が大きければプレビュー用プロキシの作成を始める"""
+        self.proxy_progress = None
+        if not self.preview_proxy_var.get() or not self.decoders or self.decoders.is_proxy:
+            self.proxy_manager.cancel()
+            return
+        width, height = self.decoders.source_size
+        if width <= PROXY_MAX_WIDTH:
+            self.proxy_manager.cancel()
+            return
+        self.proxy_progress = 0.0
+        self.update_decoder_label()
+        self.write_log(f"プロキシ作成開始: {os.path.basename(file_path)} ({width}x{height})")
+        self.proxy_manager.build(
+            file_path, (self.video_total_frames, self.video_fps, width, height),
+            lambda fraction: self.root.after(0, self.on_proxy_progress, file_path, fraction),
+            lambda path, entry: self.root.after(0, self.on_proxy_ready, path, entry))
+
+    def on_proxy_progress(self, file_path, fraction):
+        if file_path != self.video_path or self.proxy_progress is None:
+            return
+        if int(fraction * 100) != int(self.proxy_progress * 100):
+            self.proxy_progress = fraction
+            self.update_decoder_label()
+
+    def on_proxy_ready(self, file_path, entry):
+        """プロキシが完成したら、表示中の動画であれば現在位置を保ったままプレビューをプロキシに切り替える"""
+        if file_path != self.video_path:
+            return
+        self.proxy_progress = None
+        if not entry or not self.preview_proxy_var.get():
+            self.update_decoder_label()
+            return
+        self.reopen_preview_decoders("プレビューをプロキシに切り替えました")
+
+    def reopen_preview_decoders(self, message):
+        """現在位置を保ったままプレビュー用デコーダーを開き直す"""
+        if not self.paused:
+            self.toggle_play_pause()
+        decoders = self.open_preview_decoders(self.video_path)
+        if not decoders:
+            self.decoder_label.config(text="")
+            self.write_log(f"デコーダー再設定エラー: {self.video_path}")
+            return
+        ret, frame = decoders.frame_at(self.current_frame)
+        if ret:
+            self.display_frame(frame)
+        self.write_log(f"{message}: {decoders.playback.name}{'（プロキシ）' if decoders.is_proxy else ''}")
+
+    def on_preview_proxy_toggle(self):
+        self.save_config()
+        if not self.video_path or not self.cap:
+            return
+        self.reopen_preview_decoders("プレビューのプロキシ使用を変更しました")
+        self.start_preview_proxy(self.video_path)
+
+    def load_video(self, file_path):
+        try:
+            decoders = self.open_preview_decoders(file_path)
+            if not decoders:
+                messagebox.showerror("エラー", "動画ファイルを開けませんでした。別のファイルを選択してください。")
+                self.video_path = ""
+                return
+            self.video_path = file_path
             
-            try:
-                self.cap = cv2.VideoCapture(file_path)
-                if not self.cap.isOpened():
-                    messagebox.showerror("エラー", "動画ファイルを開けませんでした。別のファイルを選択してください。")
-                    self.cap = None
-                    self.video_path = ""
-                    return
-                self.video_path = file_path
-                
-                self.video_total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                raw_fps = self.cap.get(cv2.CAP_PROP_FPS)
-                if raw_fps <= 0 or raw_fps > 120:
-                    total_frames = self.video_total_frames
-                    duration = self.cap.get(cv2.CAP_PROP_FRAME_COUNT) / self.cap.get(cv2.CAP_PROP_FPS) if self.cap.get(cv2.CAP_PROP_FPS) > 0 else None
-                    if duration and duration > 0:
-                        self.video_fps = total_frames / duration
-                    else:
-                        self.video_fps = 30.0
+            self.video_total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            raw_fps = self.cap.get(cv2.CAP_PROP_FPS)
+            if raw_fps <= 0 or raw_fps > 120:
+                total_frames = self.video_total_frames
+                duration = self.cap.get(cv2.CAP_PROP_FRAME_COUNT) / self.cap.get(cv2.CAP_PROP_FPS) if self.cap.get(cv2.CAP_PROP_FPS) > 0 else None
+                if duration and duration > 0:
+                    self.video_fps = total_frames / duration
                 else:
-                    self.video_fps = raw_fps
-                
-                self.actual_fps = self.video_fps
-                
-                self.reset_points()
-                
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                ret, frame = self.cap.read()
-                if ret:
-                    self.display_frame(frame)
-                
-                self.paused = True
-                self.play_pause_button.config(text="▶ 再生")
-                self.on_progress_update()
-                self.write_log(f"動画読み込み成功: {file_path}, FPS: {self.video_fps}, 総フレーム: {self.video_total_frames}")
-            except Exception as e:
-                self.write_log(f"動画読み込みエラー: {e}")
-                messagebox.showerror("エラー", f"動画読み込みに失敗しました: {e}")
-                if self.cap:
-                    self.cap.release()
+                    self.video_fps = 30.0
+            else:
+                self.video_fps = raw_fps
+            
+            self.actual_fps = self.video_fps
+            
+            self.reset_points()
+            
+            # 先頭フレームは再生用デコーダーで読む（シーク用は最初のシーク時に開く）
+            with decoders.playback.lock:
+                ret, frame, _ = decoders.playback.read_next()
+            if ret:
+                self.display_frame(decoders.crop_frame(frame))
+            
+            self.paused = True
+            # 前の動画の早送り・巻き戻し速度は引き継がない
+            self.playback_speed = 1
+            self.play_pause_button.config(text="▶ 再生")
+            self.on_progress_update()
+            self.write_log(f"動画読み込み成功: {file_path}, FPS: {self.video_fps}, 総フレーム: {self.video_total_frames}, "
+                           f"デコード: {decoders.playback.name}, 再生バッファ: {self.frame_ring.depth}フレーム")
+            self.start_scene_analysis(file_path)
+            self.start_preview_proxy(file_path)
+        except Exception as e:
+            self.write_log(f"動画読み込みエラー: {e}")
+            messagebox.showerror("エラー", f"動画読み込みに失敗しました: {e}")
+            with self.cap_lock:
+                if self.decoders:
+                    self.decoders.release()
+                self.decoders = None
                 self.cap = None
 
+    def on_hw_decode_toggle(self):
+        """HWデコード設定を保存し、読み込み中の動画があれば現在位置を保ったままデコーダーを開き直す"""
+        self.save_config()
+        if not self.video_path or not self.cap:
+            return
+        self.reopen_preview_decoders("プレビューのデコード方式を変更")
+
     def toggle_play_pause(self, event=None):
         if not self.video_path or not self.cap or not self.cap.isOpened():
             return
         
         if self.paused:
             self.paused = False
-            self.play_pause_button.config(text="|| 一時停止")
+            self.decoders.stop_prefetch()
+            self.update_speed_label()
             self.buffer_running = True
             self.last_frame_time = time.time()
             self.start_frame_buffer()
@@ -1529,12 +4885,15 @@ class MosaicRemoverApp:
             self.paused = True
             self.buffer_running = False
             self.play_pause_button.config(text="▶ 再生")
-            self.clear_frame_queue()
-            if self.frame_buffer_thread:
-                self.frame_buffer_thread = None
+            if self.playback_speed != 1:
+                # 早送り・巻き戻しは停止で解除する（先読み済みのフレームは速度が違うので捨てる）
+                self.playback_speed = 1
+                self.clear_frame_queue()
+            # 表示待ちのフレームは残し、再開時にその続きから表示する
+            self.decoders.prefetch(self.current_frame, 0, self.root.winfo_screenwidth())
 
     def start_frame_buffer(self):
-        if not self.buffer_running or not self.cap or not self.cap.isOpened():
+        if not self.buffer_running or not self.decoders or not self.frame_ring:
             return
         if not self.frame_buffer_thread or not self.frame_buffer_thread.is_alive():
             self.buffer_running = True
@@ -1543,23 +4902,115 @@ class MosaicRemoverApp:
             self.frame_buffer_thread.start()
 
     def buffer_frames(self):
-        while self.buffer_running and self.cap and self.cap.isOpened():
-            with self.cap_lock:
-                try:
-                    ret, frame = self.cap.read()
-                    if ret and not self.frame_queue.full():
-                        self.frame_queue.put(frame, block=False)
-                    elif not ret:
-                        self.buffer_running = False
-                        self.root.after(0, self.toggle_play_pause)
-                        break
-                except Exception as e:
+        ring = self.frame_ring
+        decoder = self.decoders.playback if self.decoders else None
+        skim_generation = None
+        while self.buffer_running and ring is self.frame_ring and decoder and decoder.isOpened():
+            slot = ring.acquire()
+            if slot is None:
+                # 全スロットが表示待ち。UIスレッドが受け取るまで待つ
+                time.sleep(0.005)
+                continue
+            speed = self.playback_speed
+            try:
+                if speed < 0 or speed > SKIM_GRAB_MAX_SPEED:
+                    generation = ring.generation
+                    if skim_generation != generation:
+                        # 速度変更・シーク後は表示中のフレームと現在時刻を基準に表示時刻を数え直す
+                        skim_generation = generation
+                        origin_frame = last_index = self.current_frame
+                        origin_time = time.time()
+                    keyframe = self.next_skim_keyframe(speed, origin_frame, origin_time, last_index)
+                    if keyframe is None:
+                        ret = False
+                    elif keyframe < 0:
+                        # 次のキーフレームの表示時刻はまだ先
+                        ring.release(slot)
+                        time.sleep(0.01)
+                        continue
+                    else:
+                        with decoder.lock:
+                            decoder.generation = None  # 1倍速に戻したときに位置を合わせ直させる
+                            decoder.seek(keyframe)
+                            ret, frame, frame_index = decoder.read_next(image=ring.slots[slot])
+                        last_index = keyframe
+                else:
+                    with decoder.lock:
+                        # シーク後（世代が変わった）は表示中フレームの次へ再生用デコーダーを合わせる。
+                        # シーク自体はこのスレッドで行うので、UI側のシーク操作は待たされない
+                        generation = ring.generation
+                        if decoder.generation != generation:
+                            decoder.generation = generation
+                            decoder.seek(self.current_frame + 1)
+                        # 2倍・4倍速は間のフレームをgrab()で読み飛ばす（色変換を省く）
+                        ret = True
+                        for _ in range(speed - 1):
+                            ret = decoder.cap.grab()
+                            if not ret:
+                                break
+                            decoder.position += 1
+                        if ret:
+                            ret, frame, frame_index = decoder.read_next(image=ring.slots[slot])
+            except Exception as e:
+                ring.release(slot)
+                if ring is self.frame_ring:
                     self.buffer_running = False
                     self.root.after(0, self.toggle_play_pause)
-                    self.write_log(f"フレームバッファエラー: {e}")
-                    break
-            target_interval = 1.0 / self.actual_fps if self.actual_fps > 0 else 1.0 / 30.0
-            time.sleep(target_interval * 0.5)
+                self.write_log(f"フレームバッファエラー: {e}")
+                break
+            if not ret:
+                # 末尾に達した。表示待ちのフレームを出し切ってからupdate_frameが停止する
+                # （別の動画を開き直してデコーダーが閉じられた場合は新しい再生に干渉しない）
+                ring.release(slot)
+                if ring is self.frame_ring:
+                    self.buffer_running = False
+                break
+            if frame is not ring.slots[slot]:
+                # 解像度が変わった等でOpenCVが新しい配列を返した場合はそれをスロットとして使う
+                ring.slots[slot] = frame
+            ring.publish(slot, frame_index, generation)
+
+    def next_skim_keyframe(self, speed, origin_frame, origin_time, last_index):
+        """早送り・巻き戻しで次にデコードするキーフレーム番号を返す
+        
+        表示時刻（基準フレーム + 速度 × 経過時間）に達していなければ-1、末尾・先頭に達したらNoneを返す。
+        デコードが表示時刻に追いつかない場合は、表示時刻を過ぎたキーフレームを読み飛ばす。
+        """
+        keyframes = self.decoders.get_keyframes(self.video_fps, self.video_total_frames)
+        target = origin_frame + speed * self.video_fps * (time.time() - origin_time)
+        if speed > 0:
+            position = bisect.bisect_right(keyframes, last_index)
+            if position >= len(keyframes):
+                return None
+            if keyframes[position] > target:
+                return -1
+            latest = bisect.bisect_right(keyframes, target) - 1
+            return keyframes[max(position, latest)]
+        position = bisect.bisect_left(keyframes, last_index) - 1
+        if position < 0:
+            return None
+        if keyframes[position] < target:
+            return -1
+        latest = bisect.bisect_left(keyframes, target)
+        return keyframes[min(position, latest)]
+
+    def change_playback_speed(self, step):
+        """[ ]キー: 再生速度を1段階切り替える（一時停止中なら再生を始める）"""
+        if not self.video_path or not self.decoders:
+            return
+        index = SKIM_SPEEDS.index(self.playback_speed) + step
+        self.playback_speed = SKIM_SPEEDS[max(0, min(len(SKIM_SPEEDS) - 1, index))]
+        # 表示待ちのフレームを捨て、再生スレッドに新しい速度で読み直させる
+        self.clear_frame_queue()
+        if self.paused:
+            self.toggle_play_pause()
+        else:
+            self.update_speed_label()
+        self.write_log(f"再生速度: {self.playback_speed}x")
+
+    def update_speed_label(self):
+        speed = f" ({self.playback_speed}x)" if self.playback_speed != 1 else ""
+        self.play_pause_button.config(text=f"|| 一時停止{speed}")
 
     def update_frame(self):
         if not self.cap or not self.cap.isOpened() or self.paused or not self.root.winfo_exists():
@@ -1574,40 +5025,72 @@ class MosaicRemoverApp:
             return
         
         try:
-            if not self.frame_queue.empty():
-                frame = self.frame_queue.get_nowait()
-                with self.cap_lock:
-                    self.current_frame = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+            item = self.frame_ring.take() if self.frame_ring else None
+            if item:
+                slot, frame_index = item
+                self.current_frame = frame_index
+                try:
+                    # 表示用に縮小・変換した時点でコピーされるので、表示後すぐにスロットを返却できる
+                    frame = self.decoders.crop_frame(self.frame_ring.slots[slot])
+                    self.display_frame(frame)
+                    if self.fullscreen_window:
+                        self.display_frame_fullscreen(frame)
+                finally:
+                    self.frame_ring.release(slot)
+                self.update_time_labels()
+                self.on_progress_update()
+                if self.fullscreen_window:
+                    self.update_fullscreen_progress()
                 
-                if frame is not None:
-                    self.display_frame(frame)
-                    if self.fullscreen_window:
-                        self.display_frame_fullscreen(frame)
-                    self.update_time_labels()
-                    self.on_progress_update()
-                    if self.fullscreen_window:
-                        self.update_fullscreen_progress()
-                    
-                    self.last_frame_time = current_time
+                self.last_frame_time = current_time
                 
                 if self.current_frame >= self.video_total_frames - 1:
                     self.toggle_play_pause()
                     return
                 
                 self.root.after(max(1, int(target_interval * 1000)), self.update_frame)
+            elif not self.buffer_running and not (self.frame_buffer_thread and self.frame_buffer_thread.is_alive()):
+                # デコードが末尾またはエラーで止まり、表示待ちのフレームもない
+                self.toggle_play_pause()
             else:
                 self.root.after(10, self.update_frame)
         except Exception as e:
             self.write_log(f"フレーム更新エラー: {e}")
             self.root.after(max(1, int(target_interval * 1000)), self.update_frame)
 
+    def show_frame_at(self, frame_index, error_message):
+        """指定フレームにシークして表示する（シーク操作の共通処理）
+        
+        シーク用デコーダーで読むので再生スレッドを待たない。再生中はリングバッファの世代を進め、
+        再生用デコーダーを新しい位置の次のフレームへ合わせさせる。
+        """
+        if not self.cap or not self.cap.isOpened():
+            return False
+        direction = (frame_index > self.current_frame) - (frame_index < self.current_frame)
+        self.current_frame = frame_index
+        try:
+            ret, frame = self.decoders.frame_at(frame_index)
+            if self.frame_ring:
+                self.frame_ring.invalidate()
+            if self.paused:
+                # 一時停止中は次のコマ送りに備えて前後を先読みする（表示に使う画面幅まで縮小）
+                self.decoders.prefetch(frame_index, direction, self.root.winfo_screenwidth())
+            if ret:
+                self.display_frame(frame)
+                if self.fullscreen_window:
+                    self.display_frame_fullscreen(frame)
+            self.on_progress_update()
+            self.update_time_labels()
+            if self.fullscreen_window:
+                self.update_fullscreen_progress()
+            return ret
+        except Exception as e:
+            self.write_log(f"{error_message}: {e}")
+            return False
+
     def clear_frame_queue(self):
-        with self.cap_lock:
-            while not self.frame_queue.empty():
-                try:
-                    self.frame_queue.get_nowait()
-                except:
-                    pass
+        if self.frame_ring:
+            self.frame_ring.invalidate()
 
     def on_progress_update(self):
         if self.video_total_frames > 0:
@@ -1619,26 +5102,415 @@ class MosaicRemoverApp:
             end_pos = (self.end_frame / self.video_total_frames) * width
             self.progress_canvas.coords(self.start_marker, start_pos, 0, start_pos, 20)
             self.progress_canvas.coords(self.end_marker, end_pos, 0, end_pos, 20)
+            if self.scene_cuts and width != self.scene_tick_width:
+                self.draw_scene_ticks()
+
+    def scene_cache_key(self, file_path):
+        stat = os.stat(file_path)
+        return f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def load_scene_cache(self):
+        if os.path.exists(self.scene_cache_file):
+            try:
+                with open(self.scene_cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                self.write_log(f"シーンキャッシュ読み込みエラー: {str(e)}")
+        return {}
+
+    def save_scene_cache(self):
+        try:
+            with open(self.scene_cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self.scene_cache, f, ensure_ascii=False)
+        except OSError as e:
+            self.write_log(f"シーンキャッシュ保存エラー: {str(e)}")
+
+    def start_scene_analysis(self, file_path):
+        """読み込んだ動画のシーンチェンジ検出を開始する（キャッシュがあればそれを使う）"""
+        self.stop_scene_analysis()
+        self.scene_cuts = []
+        self.draw_scene_ticks()
+        try:
+            cache_key = self.scene_cache_key(file_path)
+        except OSError:
+            return
+        cached = self.scene_cache.get(cache_key)
+        if cached:
+            self.scene_cuts = cached['cuts']
+            self.draw_scene_ticks()
+            self.write_log(f"シーンチェンジ: キャッシュ使用 ({len(self.scene_cuts)}箇所)")
+            return
+        token = object()
+        self.scene_token = token
+        threading.Thread(target=self.analyze_scenes, args=(file_path, cache_key, self.video_fps, token), daemon=True).start()
+
+    def stop_scene_analysis(self):
+        self.scene_token = None
+        process = self.scene_process
+        if process and process.poll() is None:
+            process.kill()
+        self.scene_process = None
+
+    def analyze_scenes(self, file_path, cache_key, fps, token):
+        """縮小グレースケール映像をffmpegから読み、前フレームとの平均差分がSCENE_MIN_DIFF以上かつ
+        直前の平均のSCENE_RATIO倍以上のフレームをカットとする。SCENE_CHUNK_FRAMESごとにまとめて計算し、
+        途中結果を随時進捗バーに反映する（プレビュー用のデコーダーは使わない）"""
+        width, height = SCENE_ANALYSIS_SIZE
+        frame_bytes = width * height
+        command = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', file_path,
+            '-map', '0:v:0', '-an', '-sn', '-vsync', 'passthrough',
+            '-vf', f'scale={width}:{height}:flags=fast_bilinear,format=gray',
+            '-f', 'rawvideo', 'pipe:1'
+        ]
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                       creationflags=CREATE_NO_WINDOW)
+        except OSError as e:
+            self.write_log(f"シーンチェンジ検出を開始できません: {e}")
+            return
+        self.scene_process = process
+        started = time.time()
+        min_gap = max(1, int(fps * SCENE_MIN_GAP_SECONDS))
+        cuts = []
+        last_cut = -min_gap
+        history = np.zeros(0, dtype=np.float32)
+        previous = None
+        frame_count = 0
+        while token is self.scene_token:
+            data = process.stdout.read(frame_bytes * SCENE_CHUNK_FRAMES)
+            count = len(data) // frame_bytes
+            if count == 0:
+                break
+            frames = np.frombuffer(data, dtype=np.uint8, count=count * frame_bytes).reshape(count, frame_bytes).astype(np.int16)
+            if previous is not None:
+                frames = np.vstack([previous[None], frames])
+                first_index = frame_count
+            else:
+                first_index = frame_count + 1
+            diffs = np.abs(np.diff(frames, axis=0)).mean(axis=1)
+            # 各フレームの直前SCENE_WINDOW個の差分の平均（累積和で一括計算）
+            series = np.concatenate([history, diffs])
+            cumulative = np.concatenate([[0.0], np.cumsum(series)])
+            positions = np.arange(len(history), len(series))
+            lows = np.maximum(0, positions - SCENE_WINDOW)
+            baseline = (cumulative[positions] - cumulative[lows]) / np.maximum(1, positions - lows)
+            for offset in np.nonzero((diffs >= SCENE_MIN_DIFF) & (diffs >= baseline * SCENE_RATIO))[0]:
+                frame_index = first_index + int(offset)
+                if frame_index - last_cut >= min_gap:
+                    cuts.append(frame_index)
+                    last_cut = frame_index
+            history = series[-SCENE_WINDOW:]
+            previous = frames[-1]
+            frame_count += count
+            self.root.after(0, self.update_scene_cuts, token, list(cuts))
+        
+        if token is not self.scene_token:
+            if process.poll() is None:
+                process.kill()
+            return
+        if process.wait() != 0:
+            self.write_log(f"シーンチェンジ検出エラー: ffmpeg終了コード {process.returncode}")
+            return
+        self.scene_cache[cache_key] = {'cuts': cuts, 'frames': frame_count}
+        while len(self.scene_cache) > SCENE_CACHE_LIMIT:
+            del self.scene_cache[next(iter(self.scene_cache))]
+        self.save_scene_cache()
+        self.write_log(f"シーンチェンジ検出完了: {len(cuts)}箇所, {frame_count}フレーム, {time.time() - started:.1f}秒")
+
+    def update_scene_cuts(self, token, cuts):
+        if token is self.scene_token:
+            self.scene_cuts = cuts
+            self.draw_scene_ticks()
+
+    def draw_scene_ticks(self):
+        """シーンチェンジ位置を進捗バーの下部に目盛りとして描く"""
+        self.progress_canvas.delete('scene_cut')
+        width = self.progress_canvas.winfo_width()
+        self.scene_tick_width = width
+        if self.video_total_frames <= 0 or width <= 1:
+            return
+        for cut in self.scene_cuts:
+            x = cut / self.video_total_frames * width
+            self.progress_canvas.create_line(x, 13, x, 20, fill="yellow", tags='scene_cut')
+        self.progress_canvas.tag_raise(self.start_marker)
+        self.progress_canvas.tag_raise(self.end_marker)
+
+    def jump_to_scene_cut(self, direction):
+        """PageUp/PageDown: 前後のシーンチェンジ位置へ移動する"""
+        if not self.scene_cuts:
+            return
+        if direction > 0:
+            position = bisect.bisect_right(self.scene_cuts, self.current_frame)
+            if position < len(self.scene_cuts):
+                self.show_frame_at(self.scene_cuts[position], "シーンチェンジ移動エラー")
+        else:
+            position = bisect.bisect_left(self.scene_cuts, self.current_frame) - 1
+            if position >= 0:
+                self.show_frame_at(self.scene_cuts[position], "シーンチェンジ移動エラー")
+
+    def snap_point_to_scene_cut(self, point):
+        """CTRL+SHIFT+↑/↓: 現在位置に最も近いシーンチェンジを開始/終了時間に設定する"""
+        if not self.scene_cuts:
+            self.write_log("シーンチェンジが未検出のため現在位置を使用します")
+        else:
+            position = bisect.bisect_left(self.scene_cuts, self.current_frame)
+            nearby = self.scene_cuts[max(0, position - 1):position + 1]
+            self.show_frame_at(min(nearby, key=lambda cut: abs(cut - self.current_frame)), "シーンチェンジ移動エラー")
+        if point == 'start':
+            self.set_start_point_by_key()
+        else:
+            self.set_end_point_by_key()
 
     def on_progress_click(self, event):
         if self.video_total_frames > 0 and self.cap and self.cap.isOpened():
             width = self.progress_canvas.winfo_width()
             click_pos = event.x / width
             new_frame = int(click_pos * self.video_total_frames)
-            self.current_frame = new_frame
-            self.clear_frame_queue()
-            with self.cap_lock:
+            self.show_frame_at(new_frame, "進捗クリックエラー")
+
+    def on_progress_hover(self, event):
+        """進捗バー上のカーソル位置の縮小フレームを表示する（ホバー用デコーダーを別スレッドで読む）"""
+        if not self.decoders or self.video_total_frames <= 0:
+            return
+        width = self.progress_canvas.winfo_width()
+        if width <= 0:
+            return
+        frame_index = max(0, min(int(event.x / width * self.video_total_frames), self.video_total_frames - 1))
+        # 最新の要求だけを処理する（カーソル移動中の古い要求は読み飛ばす）
+        self.hover_request = (frame_index, event.x_root, event.y_root)
+        if not self.hover_thread or not self.hover_thread.is_alive():
+            self.hover_thread = threading.Thread(target=self.load_hover_previews, daemon=True)
+            self.hover_thread.start()
+
+    def load_hover_previews(self):
+        while self.hover_request is not None:
+            frame_index, x_root, y_root = self.hover_request
+            self.hover_request = None
+            decoders = self.decoders
+            if not decoders:
+                return
+            try:
+                ret, frame = decoders.thumbnail_at(frame_index)
+            except Exception as e:
+                self.write_log(f"ホバープレビューエラー: {e}")
+                return
+            if ret:
+                self.root.after(0, self.show_hover_preview, frame, frame_index, x_root, y_root)
+
+    def show_hover_preview(self, frame, frame_index, x_root, y_root):
+        # カーソルが離れた後に届いた結果は表示しない
+        if self.root.winfo_containing(self.root.winfo_pointerx(), self.root.winfo_pointery()) is not self.progress_canvas:
+            return
+        if not self.hover_window:
+            self.hover_window = tk.Toplevel(self.root)
+            self.hover_window.overrideredirect(True)
+            self.hover_label = tk.Label(self.hover_window, bg="black", fg="white", compound=tk.TOP)
+            self.hover_label.pack()
+        img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        imgtk = ImageTk.PhotoImage(image=img)
+        time_sec = frame_index / self.video_fps if self.video_fps > 0 else 0
+        self.hover_label.configure(image=imgtk, text=self.format_time(time_sec))
+        self.hover_label.image = imgtk
+        height = frame.shape[0] + 24
+        self.hover_window.geometry(f"+{x_root - frame.shape[1] // 2}+{y_root - height - 12}")
+        self.hover_window.deiconify()
+
+    def hide_hover_preview(self, event=None):
+        self.hover_request = None
+        if self.hover_window:
+            self.hover_window.withdraw()
+
+    def quick_look(self):
+        """現在位置を中心としたQUICKLOOK_SECONDS秒だけを復元し、処理前と並べて表示する
+        
+        結果は（ソース、区間、設定、縮小の有無、起動スクリプト）ごとにキャッシュするので、
+        同じ位置・設定に戻ったときは復元せずにすぐ表示する。TVAIは確認に不要なため掛けない。
+        """
+        input_file = self.file_path_entry.get()
+        if not self.decoders or not input_file or not os.path.exists(input_file):
+            messagebox.showerror("エラー", "動画ファイルを選択してください。")
+            return
+        if not self.ps_script_path:
+            messagebox.showerror("エラー", "LADA起動スクリプトが見つからないためクイック確認できません。")
+            return
+        if self.is_running or self.is_batch_processing:
+            self.status_label.config(text="処理中はクイック確認できません", fg="red")
+            return
+        fps = self.video_fps if self.video_fps > 0 else 30.0
+        length = int(round(QUICKLOOK_SECONDS * fps))
+        start_frame = max(0, min(self.current_frame - length // 2, self.video_total_frames - length))
+        end_frame = min(self.video_total_frames, start_frame + length)
+        settings = self.get_current_settings()
+        settings['tvai'] = '2'
+        reduced = self.quick_look_reduced_var.get()
+        try:
+            fingerprint = self.source_fingerprint(input_file)
+        except OSError as e:
+            self.write_log(f"クイック確認エラー: {e}")
+            return
+        key_data = {
+            'source': fingerprint,
+            'start': start_frame,
+            'end': end_frame,
+            'settings': self.settings_signature(settings),
+            'reduced': reduced,
+            'launcher': self.launcher_version()
+        }
+        key = hashlib.sha1(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        request = {'key': key, 'input_file': input_file, 'start_frame': start_frame, 'end_frame': end_frame,
+                   'fps': fps, 'settings': settings, 'reduced': reduced}
+        
+        cached = self.quick_look_paths(key)
+        if all(os.path.exists(path) for path in cached):
+            for path in cached:
+                os.utime(path)
+            self.write_log(f"クイック確認（キャッシュ）: {self.format_time(start_frame / fps)}")
+            self.show_quick_look(request, cached)
+            return
+        
+        if not self.quick_look_worker:
+            self.quick_look_worker = QuickLookWorker(self.run_quick_look_job,
+                                                     lambda req, result: self.root.after(0, self.on_quick_look_done, req, result))
+        self.quick_look_worker.submit(request)
+        self.status_label.config(text=f"クイック確認: {self.format_time(start_frame / fps)} 付近を復元中...", fg="orange")
+
+    def quick_look_paths(self, key):
+        """クイック確認の処理前・処理後ファイルのパス"""
+        return (os.path.join(self.quick_look_dir, f"{key}_src.mp4"), os.path.join(self.quick_look_dir, f"{key}_out.mp4"))
+
+    def run_quick_look_job(self, request):
+        """クイック確認の区間を切り出してLADAで復元する（作業スレッドで実行）"""
+        os.makedirs(self.quick_look_dir, exist_ok=True)
+        source_path, output_path = self.quick_look_paths(request['key'])
+        fps = request['fps']
+        filters = []
+        if request['settings']['vr_processing']:
+            # VRは左目だけで確認する（処理量が半分になり、処理前との比較もしやすい）
+            filters.append('crop=iw/2:ih:0:0')
+        if request['reduced']:
+            filters.append(f'scale=-2:{QUICKLOOK_REDUCED_HEIGHT}')
+        video_filter = self.get_video_filter('final', *filters)
+        # 入力側のシーク（-iの前の-ss）でも再エンコード時は直前のキーフレームからデコードして指定時刻より前を捨てるため
+        # フレーム単位で正確になり、処理前と処理後の表示が揃う（キーフレームまで高速に移動できる）
+        trim_command = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-ss', f"{request['start_frame'] / fps:.3f}", '-i', request['input_file'],
+            '-frames:v', str(request['end_frame'] - request['start_frame']), '-an',
+            *(['-vf', video_filter] if video_filter else []),
+            *self.get_video_encoder_args('final', 18),
+            source_path
+        ]
+        subprocess.run(trim_command, check=True, capture_output=True, creationflags=CREATE_NO_WINDOW)
+        
+        settings = request['settings']
+        process = self.quick_look_process = subprocess.Popen(
+            self.build_launcher_command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            creationflags=CREATE_NO_WINDOW
+        )
+        process.stdin.write(f"{source_path}\n{settings['model']}\n{settings['tvai']}\n{settings['quality']}\n")
+        process.stdin.close()
+        for line in iter(process.stdout.readline, ''):
+            match = re.search(r'(\d+)%', line) if line.strip().startswith("Processing frames:") else None
+            if match:
+                self.root.after(0, lambda percent=match.group(1): self.status_label.config(
+                    text=f"クイック確認: 復元中 {percent}%", fg="orange"))
+        process.stdout.close()
+        process.wait()
+        self.quick_look_process = None
+        if process.returncode != 0:
+            raise Exception(f"LADA処理に失敗しました（終了コード {process.returncode}）")
+        
+        source_base = os.path.basename(os.path.splitext(source_path)[0])
+        for file_name in os.listdir(self.quick_look_dir):
+            if file_name.startswith(source_base) and 'lada' in file_name.lower():
+                os.replace(os.path.join(self.quick_look_dir, file_name), output_path)
+                break
+        else:
+            raise Exception("LADAの出力ファイルが見つかりません")
+        self.trim_quick_look_cache()
+        return source_path, output_path
+
+    def trim_quick_look_cache(self):
+        """クイック確認のキャッシュを新しい順にQUICKLOOK_CACHE_LIMIT件まで残す"""
+        newest = {}
+        for entry in os.scandir(self.quick_look_dir):
+            key = entry.name.split('_', 1)[0]
+            newest[key] = max(newest.get(key, 0), entry.stat().st_mtime)
+        expired = set(sorted(newest, key=newest.get, reverse=True)[QUICKLOOK_CACHE_LIMIT:])
+        for entry in os.scandir(self.quick_look_dir):
+            if entry.name.split('_', 1)[0] in expired:
                 try:
-                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, new_frame)
-                    ret, frame = self.cap.read()
-                    if ret:
-                        self.display_frame(frame)
-                        if self.fullscreen_window:
-                            self.display_frame_fullscreen(frame)
-                    self.on_progress_update()
-                    self.update_time_labels()
-                except Exception as e:
-                    self.write_log(f"進捗クリックエラー: {e}")
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def on_quick_look_done(self, request, result):
+        if isinstance(result, Exception):
+            self.status_label.config(text="クイック確認に失敗しました", fg="red")
+            self.write_log(f"クイック確認エラー: {result}")
+            return
+        self.status_label.config(text="クイック確認完了", fg="blue")
+        self.write_log(f"クイック確認: {self.format_time(request['start_frame'] / request['fps'])} 付近を復元しました")
+        self.show_quick_look(request, result)
+
+    def show_quick_look(self, request, paths):
+        """処理前（左）と処理後（右）を同期してループ再生する"""
+        self.close_quick_look_caps()
+        self.quick_look_caps = [cv2.VideoCapture(path) for path in paths]
+        if not self.quick_look_window or not self.quick_look_window.winfo_exists():
+            self.quick_look_window = tk.Toplevel(self.root)
+            self.quick_look_window.protocol("WM_DELETE_WINDOW", self.close_quick_look)
+            self.quick_look_window.bind('q', lambda e: self.close_quick_look())
+            self.quick_look_label = tk.Label(self.quick_look_window, bg="black")
+            self.quick_look_label.pack(fill=tk.BOTH, expand=True)
+        start_time = self.format_time(request['start_frame'] / request['fps'])
+        end_time = self.format_time(request['end_frame'] / request['fps'])
+        self.quick_look_window.title(f"クイック確認 {start_time}-{end_time}（左: 処理前 / 右: 処理後）")
+        self.quick_look_window.lift()
+        self.update_quick_look(self.quick_look_caps, max(1, int(1000 / request['fps'])))
+
+    def update_quick_look(self, caps, interval):
+        if caps is not self.quick_look_caps:
+            return
+        frames = []
+        for cap in caps:
+            ret, frame = cap.read()
+            if not ret:
+                for c in caps:
+                    c.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                self.root.after(interval, self.update_quick_look, caps, interval)
+                return
+            frames.append(frame)
+        original, restored = frames
+        if restored.shape != original.shape:
+            restored = cv2.resize(restored, (original.shape[1], original.shape[0]))
+        combined = np.hstack((original, restored))
+        scale = min(1.0, QUICKLOOK_DISPLAY_WIDTH / combined.shape[1])
+        if scale < 1.0:
+            combined = cv2.resize(combined, (int(combined.shape[1] * scale), int(combined.shape[0] * scale)),
+                                  interpolation=cv2.INTER_AREA)
+        imgtk = ImageTk.PhotoImage(image=Image.fromarray(cv2.cvtColor(combined, cv2.COLOR_BGR2RGB)))
+        self.quick_look_label.configure(image=imgtk)
+        self.quick_look_label.image = imgtk
+        self.root.after(interval, self.update_quick_look, caps, interval)
+
+    def close_quick_look_caps(self):
+        if self.quick_look_caps:
+            for cap in self.quick_look_caps:
+                cap.release()
+        self.quick_look_caps = None
+
+    def close_quick_look(self):
+        self.close_quick_look_caps()
+        if self.quick_look_window:
+            self.quick_look_window.destroy()
+            self.quick_look_window = None
 
     def move_frame(self, event):
         if not self.cap or not self.cap.isOpened():
@@ -1656,134 +5528,43 @@ class MosaicRemoverApp:
         elif event.keysym == 'Left':
             new_pos = max(0, current_pos - steps)
             
-        self.current_frame = new_pos
-        self.clear_frame_queue()
-        with self.cap_lock:
-            try:
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, new_pos)
-                ret, frame = self.cap.read()
-                if ret:
-                    self.display_frame(frame)
-                    if self.fullscreen_window:
-                        self.display_frame_fullscreen(frame)
-                self.on_progress_update()
-                self.update_time_labels()
-            except Exception as e:
-                self.write_log(f"フレーム移動エラー: {e}")
+        self.show_frame_at(new_pos, "フレーム移動エラー")
 
     def move_one_frame_backward(self, event=None):
         if not self.cap or not self.cap.isOpened():
             return
         new_frame = max(0, self.current_frame - 1)
-        self.current_frame = new_frame
-        self.clear_frame_queue()
-        with self.cap_lock:
-            try:
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, new_frame)
-                ret, frame = self.cap.read()
-                if ret:
-                    self.display_frame(frame)
-                    if self.fullscreen_window:
-                        self.display_frame_fullscreen(frame)
-                self.on_progress_update()
-                self.update_time_labels()
-            except Exception as e:
-                self.write_log(f"1フレーム戻るエラー: {e}")
+        self.show_frame_at(new_frame, "1フレーム戻るエラー")
 
     def move_one_frame_forward(self, event=None):
         if not self.cap or not self.cap.isOpened():
             return
         new_frame = min(self.video_total_frames, self.current_frame + 1)
-        self.current_frame = new_frame
-        self.clear_frame_queue()
-        with self.cap_lock:
-            try:
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, new_frame)
-                ret, frame = self.cap.read()
-                if ret:
-                    self.display_frame(frame)
-                    if self.fullscreen_window:
-                        self.display_frame_fullscreen(frame)
-                self.on_progress_update()
-                self.update_time_labels()
-            except Exception as e:
-                self.write_log(f"1フレーム進むエラー: {e}")
+        self.show_frame_at(new_frame, "1フレーム進むエラー")
 
     def move_one_second_backward(self, event=None):
         if not self.cap or not self.cap.isOpened():
             return
         step_frames = int(self.video_fps)
         new_frame = max(0, self.current_frame - step_frames)
-        self.current_frame = new_frame
-        self.clear_frame_queue()
-        with self.cap_lock:
-            try:
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, new_frame)
-                ret, frame = self.cap.read()
-                if ret:
-                    self.display_frame(frame)
-                    if self.fullscreen_window:
-                        self.display_frame_fullscreen(frame)
-                self.on_progress_update()
-                self.update_time_labels()
-            except Exception as e:
-                self.write_log(f"1秒戻るエラー: {e}")
+        self.show_frame_at(new_frame, "1秒戻るエラー")
 
     def move_one_second_forward(self, event=None):
         if not self.cap or not self.cap.isOpened():
             return
         step_frames = int(self.video_fps)
         new_frame = min(self.video_total_frames, self.current_frame + step_frames)
-        self.current_frame = new_frame
-        self.clear_frame_queue()
-        with self.cap_lock:
-            try:
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, new_frame)
-                ret, frame = self.cap.read()
-                if ret:
-                    self.display_frame(frame)
-                    if self.fullscreen_window:
-                        self.display_frame_fullscreen(frame)
-                self.on_progress_update()
-                self.update_time_labels()
-            except Exception as e:
-                self.write_log(f"1秒進むエラー: {e}")
+        self.show_frame_at(new_frame, "1秒進むエラー")
 
     def jump_to_start(self, event=None):
         if not self.cap or not self.cap.isOpened():
             return
-        self.current_frame = self.start_frame
-        self.clear_frame_queue()
-        with self.cap_lock:
-            try:
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame)
-                ret, frame = self.cap.read()
-                if ret:
-                    self.display_frame(frame)
-                    if self.fullscreen_window:
-                        self.display_frame_fullscreen(frame)
-                self.on_progress_update()
-                self.update_time_labels()
-            except Exception as e:
-                self.write_log(f"開始点ジャンプエラー: {e}")
+        self.show_frame_at(self.start_frame, "開始点ジャンプエラー")
 
     def jump_to_end(self, event=None):
         if not self.cap or not self.cap.isOpened():
             return
-        self.current_frame = self.end_frame
-        self.clear_frame_queue()
-        with self.cap_lock:
-            try:
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.end_frame)
-                ret, frame = self.cap.read()
-                if ret:
-                    self.display_frame(frame)
-                    if self.fullscreen_window:
-                        self.display_frame_fullscreen(frame)
-                self.on_progress_update()
-                self.update_time_labels()
-            except Exception as e:
-                self.write_log(f"終了点ジャンプエラー: {e}")
+        self.show_frame_at(self.end_frame, "終了点ジャンプエラー")
 
     def set_start_point_by_key(self, event=None):
         self.start_frame = self.current_frame
@@ -1804,22 +5585,7 @@ class MosaicRemoverApp:
             return
         new_frame = int((percentage / 100) * self.video_total_frames)
         new_frame = min(max(0, new_frame), self.video_total_frames - 1)
-        self.current_frame = new_frame
-        self.clear_frame_queue()
-        with self.cap_lock:
-            try:
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, new_frame)
-                ret, frame = self.cap.read()
-                if ret:
-                    self.display_frame(frame)
-                    if self.fullscreen_window:
-                        self.display_frame_fullscreen(frame)
-                self.on_progress_update()
-                self.update_time_labels()
-                if self.fullscreen_window:
-                    self.update_fullscreen_progress()
-            except Exception as e:
-                self.write_log(f"パーセントジャンプエラー: {e}")
+        self.show_frame_at(new_frame, "パーセントジャンプエラー")
 
     def on_mouse_wheel(self, event):
         if not self.cap or not self.cap.isOpened():
@@ -1829,20 +5595,7 @@ class MosaicRemoverApp:
             new_frame = max(0, self.current_frame - step_frames)
         else:
             new_frame = min(self.video_total_frames, self.current_frame + step_frames)
-        self.current_frame = new_frame
-        self.clear_frame_queue()
-        with self.cap_lock:
-            try:
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, new_frame)
-                ret, frame = self.cap.read()
-                if ret:
-                    self.display_frame(frame)
-                    if self.fullscreen_window:
-                        self.display_frame_fullscreen(frame)
-                self.on_progress_update()
-                self.update_time_labels()
-            except Exception as e:
-                self.write_log(f"マウスホイールエラー: {e}")
+        self.show_frame_at(new_frame, "マウスホイールエラー")
 
     def toggle_fullscreen(self, event=None):
         if self.fullscreen_window:
@@ -1868,33 +5621,29 @@ class MosaicRemoverApp:
             self.fullscreen_progress_canvas.bind("<Button-1>", self.on_fullscreen_progress_click)
             self.fullscreen_progress_canvas.bind("<MouseWheel>", self.on_mouse_wheel)
             
-            with self.cap_lock:
-                try:
-                    if self.cap and self.cap.isOpened():
-                        self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
-                        ret, frame = self.cap.read()
-                        if ret:
-                            self.display_frame_fullscreen(frame)
-                        self.update_fullscreen_progress()
-                    self.start_frame_buffer()
-                except Exception as e:
-                    self.write_log(f"フルスクリーン初期化エラー: {e}")
-                    messagebox.showerror("エラー", f"フルスクリーン初期化に失敗しました: {e}")
+            try:
+                if self.decoders:
+                    ret, frame = self.decoders.frame_at(self.current_frame)
+                    if ret:
+                        self.display_frame_fullscreen(frame)
+                    self.update_fullscreen_progress()
+                self.start_frame_buffer()
+            except Exception as e:
+                self.write_log(f"フルスクリーン初期化エラー: {e}")
+                messagebox.showerror("エラー", f"フルスクリーン初期化に失敗しました: {e}")
 
     def on_fullscreen_resize(self, event):
         if self.fullscreen_window:
             self.root.after(100, self.update_fullscreen_preview)
 
     def update_fullscreen_preview(self):
-        if self.fullscreen_window and self.cap and self.cap.isOpened():
-            with self.cap_lock:
-                try:
-                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
-                    ret, frame = self.cap.read()
-                    if ret:
-                        self.display_frame_fullscreen(frame)
-                except Exception as e:
-                    self.write_log(f"フルスクリーンプレビュー更新エラー: {e}")
+        if self.fullscreen_window and self.decoders:
+            try:
+                ret, frame = self.decoders.frame_at(self.current_frame)
+                if ret:
+                    self.display_frame_fullscreen(frame)
+            except Exception as e:
+                self.write_log(f"フルスクリーンプレビュー更新エラー: {e}")
 
     def display_frame_fullscreen(self, frame):
         if self.fullscreen_window and frame is not None:
@@ -1914,12 +5663,11 @@ class MosaicRemoverApp:
                 
                 resized_frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_NEAREST)
                 
-                black_bg = np.zeros((screen_height, screen_width, 3), dtype=np.uint8)
+                # 色変換は縮小後の映像部分だけに行う（黒はRGBでも同じ）
+                rgb_bg = np.zeros((screen_height, screen_width, 3), dtype=np.uint8)
                 offset_x = (screen_width - new_width) // 2
                 offset_y = (screen_height - new_height) // 2
-                black_bg[offset_y:offset_y+new_height, offset_x:offset_x+new_width] = resized_frame
-                
-                rgb_bg = cv2.cvtColor(black_bg, cv2.COLOR_BGR2RGB)
+                rgb_bg[offset_y:offset_y+new_height, offset_x:offset_x+new_width] = cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB)
                 img = Image.fromarray(rgb_bg)
                 imgtk = ImageTk.PhotoImage(image=img)
                 self.fullscreen_label.configure(image=imgtk)
@@ -1940,19 +5688,8 @@ class MosaicRemoverApp:
             click_pos = event.x / width
             new_frame = int(click_pos * self.video_total_frames)
             new_frame = max(0, min(new_frame, self.video_total_frames - 1))
-            self.current_frame = new_frame
-            self.clear_frame_queue()
-            with self.cap_lock:
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, new_frame)
-                ret, frame = self.cap.read()
-                if ret:
-                    self.display_frame(frame)
-                    self.display_frame_fullscreen(frame)
-                else:
-                    self.write_log("フルスクリーン進捗クリック: フレーム読み込み失敗")
-            self.on_progress_update()
-            self.update_time_labels()
-            self.update_fullscreen_progress()
+            if not self.show_frame_at(new_frame, "フルスクリーン進捗クリックエラー"):
+                self.write_log("フルスクリーン進捗クリック: フレーム読み込み失敗")
             self.root.update_idletasks()
         except Exception as e:
             self.write_log(f"フルスクリーン進捗クリックエラー: {e}")
@@ -2007,12 +5744,13 @@ class MosaicRemoverApp:
 
             resized_frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_NEAREST)
             
-            black_bg = np.zeros((label_height, label_width, 3), dtype=np.uint8)
+            # 色変換は縮小後の映像部分だけに行う（黒はRGBでも同じ）
+            rgb_bg = np.zeros((label_height, label_width, 3), dtype=np.uint8)
             offset_x = (label_width - new_width) // 2
             offset_y = (label_height - new_height) // 2
-            black_bg[offset_y:offset_y+new_height, offset_x:offset_x+new_width] = resized_frame
-            
-            rgb_bg = cv2.cvtColor(black_bg, cv2.COLOR_BGR2RGB)
+            rgb_bg[offset_y:offset_y+new_height, offset_x:offset_x+new_width] = cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB)
+            self.preview_layout = (offset_x, offset_y, new_width, new_height)
+            self.preview_rgb = rgb_bg
             img = Image.fromarray(rgb_bg)
             imgtk = ImageTk.PhotoImage(image=img)
             self.video_label.configure(image=imgtk)
@@ -2027,22 +5765,111 @@ class MosaicRemoverApp:
         self.after_id = self.root.after(100, self.update_preview)
 
     def update_preview(self):
-        if self.cap and self.cap.isOpened():
-            with self.cap_lock:
-                try:
-                    current_frame = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
-                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, current_frame)
-                    ret, frame = self.cap.read()
-                    if ret:
-                        self.display_frame(frame)
-                    else:
-                        self.display_black_frame()
-                except Exception as e:
-                    self.write_log(f"プレビュー更新エラー: {e}")
+        if self.decoders:
+            try:
+                ret, frame = self.decoders.frame_at(self.current_frame)
+                if ret:
+                    self.display_frame(frame)
+                else:
                     self.display_black_frame()
+            except Exception as e:
+                self.write_log(f"プレビュー更新エラー: {e}")
+                self.display_black_frame()
         else:
             self.display_black_frame()
 
+    def preview_settings_key(self, file_path):
+        return os.path.normcase(os.path.abspath(file_path))
+
+    def load_preview_settings(self):
+        if os.path.exists(self.preview_settings_file):
+            try:
+                with open(self.preview_settings_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                self.write_log(f"プレビュー設定の読み込みエラー: {str(e)}")
+        return {}
+
+    def save_preview_settings(self):
+        try:
+            with open(self.preview_settings_file, 'w', encoding='utf-8') as f:
+                json.dump(self.preview_settings, f, ensure_ascii=False)
+        except OSError as e:
+            self.write_log(f"プレビュー設定の保存エラー: {str(e)}")
+
+    def set_preview_view(self, view):
+        """表示中の動画のプレビュー表示範囲を変更して保存する"""
+        if not self.video_path or not self.decoders:
+            return
+        key = self.preview_settings_key(self.video_path)
+        # 最近変更した動画を後ろに並べ、上限を超えたら古いものから捨てる
+        self.preview_settings.pop(key, None)
+        if view.get('mode') != 'full' or view.get('viewport'):
+            self.preview_settings[key] = view
+        while len(self.preview_settings) > PREVIEW_SETTINGS_LIMIT:
+            del self.preview_settings[next(iter(self.preview_settings))]
+        self.save_preview_settings()
+        self.preview_view = view
+        self.preview_view_var.set(PREVIEW_VIEWS[view.get('mode', 'full')])
+        self.decoders.set_view(view)
+        if self.paused:
+            self.show_frame_at(self.current_frame, "表示範囲変更エラー")
+
+    def on_preview_view_change(self, label):
+        mode = next((key for key, value in PREVIEW_VIEWS.items() if value == label), 'full')
+        view = dict(self.preview_view or {}, mode=mode)
+        if mode == 'viewport' and not view.get('viewport'):
+            self.write_log("表示範囲: プレビュー上をShift+ドラッグして範囲を指定してください")
+        self.set_preview_view(view)
+
+    def cycle_preview_view(self):
+        """vキー: 全体 → 左目 → 右目 → 指定範囲（指定済みの場合）の順に切り替える"""
+        modes = ['full', 'left', 'right'] + (['viewport'] if (self.preview_view or {}).get('viewport') else [])
+        mode = (self.preview_view or {}).get('mode', 'full')
+        mode = modes[(modes.index(mode) + 1) % len(modes)] if mode in modes else 'full'
+        self.set_preview_view(dict(self.preview_view or {}, mode=mode))
+
+    def preview_point(self, event):
+        """プレビュー上の位置を動画に対する比率 (x, y) に変換する（表示範囲外はNone）"""
+        if not self.preview_layout or not self.decoders:
+            return None
+        offset_x, offset_y, width, height = self.preview_layout
+        box = preview_view_box(self.preview_view)
+        u = min(1.0, max(0.0, (event.x - offset_x) / width))
+        v = min(1.0, max(0.0, (event.y - offset_y) / height))
+        return (box[0] + u * box[2], box[1] + v * box[3])
+
+    def on_preview_drag_start(self, event):
+        point = self.preview_point(event)
+        self.preview_drag = (event.x, event.y, point) if point else None
+        return "break"
+
+    def on_preview_drag_move(self, event):
+        """ドラッグ中の範囲を表示中の画像に枠で描く"""
+        if not self.preview_drag or self.preview_rgb is None:
+            return "break"
+        image = self.preview_rgb.copy()
+        cv2.rectangle(image, self.preview_drag[:2], (event.x, event.y), (255, 255, 0), 2)
+        imgtk = ImageTk.PhotoImage(image=Image.fromarray(image))
+        self.video_label.configure(image=imgtk)
+        self.video_label.image = imgtk
+        return "break"
+
+    def on_preview_drag_end(self, event):
+        drag, self.preview_drag = self.preview_drag, None
+        point = self.preview_point(event)
+        if not drag or not point:
+            return "break"
+        x0, x1 = sorted((drag[2][0], point[0]))
+        y0, y1 = sorted((drag[2][1], point[1]))
+        if abs(event.x - drag[0]) < 16 or abs(event.y - drag[1]) < 16:
+            # 小さすぎる範囲はクリックの誤操作とみなして元の表示に戻す
+            self.update_preview()
+            return "break"
+        self.set_preview_view({'mode': 'viewport', 'viewport': [round(x0, 4), round(y0, 4), round(x1 - x0, 4), round(y1 - y0, 4)]})
+        self.write_log(f"表示範囲を指定: {self.preview_view['viewport']}")
+        return "break"
+
     def display_black_frame(self):
         try:
             self.root.update_idletasks()
@@ -2050,12 +5877,10 @@ class MosaicRemoverApp:
             label_height = self.video_label.winfo_height()
             
             if label_width > 0 and label_height > 0:
-                black_bg = np.zeros((label_height, label_width, 3), dtype=np.uint8)
-                rgb_bg = cv2.cvtColor(black_bg, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(rgb_bg)
-                imgtk = ImageTk.PhotoImage(image=img)
-                self.video_label.configure(image=imgtk)
-                self.video_label.image = imgtk
+                # ラベルの背景が黒なので画像を外すだけでよい（起動時にOpenCV等を読み込まずに済む）
+                self.video_label.configure(image='')
+                self.video_label.image = None
+                self.preview_layout = None
         except Exception as e:
             self.write_log(f"黒フレーム表示エラー: {e}")
 
@@ -2100,29 +5925,53 @@ class MosaicRemoverApp:
             self.write_log(f"時間ラベル更新エラー: {e}")
 
     def on_closing(self):
+        if (hasattr(self, 'is_running') and self.is_running) or \
+           (hasattr(self, 'is_batch_processing') and self.is_batch_processing):
+            if messagebox.askyesno("確認", "現在、処理が実行中です。中断して終了しますか?"):
+                self.shutdown_background_tasks()
+                for process in [self.process, *self.active_processes]:
+                    if process and process.poll() is None:
+                        process.kill()
+                        self.write_log("サブプロセスを強制終了しました")
+                self.root.destroy()
+        else:
+            self.shutdown_background_tasks()
+            self.root.destroy()
+
+    def shutdown_background_tasks(self):
+        """終了が確定した後に、プレビュー・シーン検出・ホットフォルダー監視などのバックグラウンド処理を止める
+        
+        終了の確認で「いいえ」を選んだ場合は一括処理もホットフォルダー監視もそのまま続ける。
+        """
         self.buffer_running = False
+        self.stop_scene_analysis()
+        self.stop_hot_folder()
+        if self.quick_look_worker:
+            self.quick_look_worker.stop()
+        if self.quick_look_process and self.quick_look_process.poll() is None:
+            self.quick_look_process.kill()
+        self.close_quick_look_caps()
+        self.proxy_manager.cancel()
+        # ステージング済みのコピーは実行中・次の項目が使うため、終了が確定してから消す
+        if self.stager:
+            self.stager.clear()
         with self.cap_lock:
-            if self.cap:
+            if self.decoders:
                 try:
-                    self.cap.release()
+                    self.decoders.release()
                     cv2.destroyAllWindows()
                 except:
                     pass
+                self.decoders = None
                 self.cap = None
-        if (hasattr(self, 'is_running') and self.is_running) or \
-           (hasattr(self, 'is_batch_processing') and self.is_batch_processing):
-            if messagebox.askyesno("確認", "現在、処理が実行中です。中断して終了しますか?"):
-                if self.process and self.process.poll() is None:
-                    self.process.kill()
-                    self.write_log("サブプロセスを強制終了しました")
-                self.root.destroy()
-        else:
-            self.root.destroy()
 
 if __name__ == "__main__":
-    root = TkinterDnD.Tk()
+    STARTUP_TIMINGS.append(("モジュール読み込み", time.perf_counter() - MODULE_LOAD_STARTED))
+    with startup_phase("ウィンドウ作成 (TkinterDnD.Tk)"):
+        root = TkinterDnD.Tk()
     try:
-        app = MosaicRemoverApp(root)
+        with startup_phase("MosaicRemoverApp初期化"):
+            app = MosaicRemoverApp(root, profile_startup='--profile-startup' in sys.argv[1:])
         if app.root is not None:
             root.mainloop()
     except Exception as e:
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# lada_gui.py はリポジトリ直下の単一ファイルなので、テストから import できるようにする
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
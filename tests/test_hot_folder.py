@@ -0,0 +1,153 @@
+"""監視フォルダの書き込み完了判定のテスト"""
+import os
+import types
+
+import pytest
+
+pytest.importorskip('tkinterdnd2')
+
+import lada_gui  # noqa: E402
+
+
+class SyncExecutor:
+    """メタデータ取得をその場で実行する（スレッドプールの代わり）"""
+    def submit(self, fn, *args):
+        fn(*args)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(lada_gui, 'time', types.SimpleNamespace(time=clock.time))
+    monkeypatch.setattr(lada_gui, 'probe_video_info', lambda path: (300, 30.0, 1920, 1080))
+    return clock
+
+
+@pytest.fixture
+def make_watcher(tmp_path):
+    def make(seen=None, baseline=False, exclude=()):
+        ready = []
+        watcher = lada_gui.HotFolderWatcher(str(tmp_path), {} if seen is None else seen,
+                                            lambda path, info: ready.append((path, info)),
+                                            lambda message: None, exclude=exclude, baseline=baseline)
+        watcher.executor = SyncExecutor()
+        return watcher, ready
+    return make
+
+
+def touch_dir(path):
+    # 同じ時刻の単位内での追加でもフォルダの変化として扱われるよう、更新時刻を進める
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def poll(watcher):
+    watcher.scan()
+    watcher.baseline = False
+    watcher.check_pending()
+
+
+def test_waits_until_stable(tmp_path, clock, make_watcher):
+    video = tmp_path / 'a.mp4'
+    video.write_bytes(b'x' * 100)
+    (tmp_path / 'notes.txt').write_text('skip')
+    watcher, ready = make_watcher()
+    poll(watcher)
+    assert ready == [] and list(watcher.pending) == [str(video)]
+    clock.now += lada_gui.HOTFOLDER_STABLE_SECONDS - 1
+    poll(watcher)
+    assert ready == []
+    clock.now += 1
+    poll(watcher)
+    assert ready == [(str(video), (300, 30.0, 1920, 1080))]
+    stat = video.stat()
+    assert watcher.seen[str(video)] == [stat.st_size, stat.st_mtime_ns]
+    # 通知済みのファイルは再び通知しない
+    touch_dir(tmp_path)
+    clock.now += lada_gui.HOTFOLDER_STABLE_SECONDS
+    poll(watcher)
+    assert len(ready) == 1 and not watcher.pending
+
+
+def test_growing_file_restarts_wait(tmp_path, clock, make_watcher):
+    video = tmp_path / 'a.mkv'
+    video.write_bytes(b'x' * 100)
+    watcher, ready = make_watcher()
+    poll(watcher)
+    clock.now += lada_gui.HOTFOLDER_STABLE_SECONDS - 1
+    with open(video, 'ab') as f:
+        f.write(b'x' * 100)
+    poll(watcher)
+    clock.now += lada_gui.HOTFOLDER_STABLE_SECONDS - 1
+    poll(watcher)
+    assert ready == []
+    clock.now += 1
+    poll(watcher)
+    assert [path for path, info in ready] == [str(video)]
+    assert watcher.seen[str(video)][0] == 200
+
+
+def test_empty_file_stays_pending(tmp_path, clock, make_watcher):
+    (tmp_path / 'empty.mp4').write_bytes(b'')
+    watcher, ready = make_watcher()
+    for _ in range(3):
+        poll(watcher)
+        clock.now += lada_gui.HOTFOLDER_STABLE_SECONDS
+    assert ready == [] and str(tmp_path / 'empty.mp4') in watcher.pending
+
+
+def test_deleted_file_is_dropped(tmp_path, clock, make_watcher):
+    video = tmp_path / 'a.mp4'
+    video.write_bytes(b'x')
+    watcher, ready = make_watcher()
+    poll(watcher)
+    video.unlink()
+    clock.now += lada_gui.HOTFOLDER_STABLE_SECONDS
+    poll(watcher)
+    assert ready == [] and not watcher.pending
+
+
+def test_baseline_skips_existing_files(tmp_path, clock, make_watcher):
+    (tmp_path / 'old.mp4').write_bytes(b'x')
+    watcher, ready = make_watcher(baseline=True)
+    poll(watcher)
+    assert not watcher.pending and str(tmp_path / 'old.mp4') in watcher.seen
+    (tmp_path / 'new.mp4').write_bytes(b'x')
+    touch_dir(tmp_path)
+    poll(watcher)
+    clock.now += lada_gui.HOTFOLDER_STABLE_SECONDS
+    poll(watcher)
+    assert [path for path, info in ready] == [str(tmp_path / 'new.mp4')]
+
+
+def test_subfolders_and_exclude(tmp_path, clock, make_watcher):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'out').mkdir()
+    (tmp_path / 'sub' / 'a.mp4').write_bytes(b'x')
+    (tmp_path / 'out' / 'result.mp4').write_bytes(b'x')
+    watcher, ready = make_watcher(exclude=[str(tmp_path / 'out')])
+    poll(watcher)
+    assert list(watcher.pending) == [str(tmp_path / 'sub' / 'a.mp4')]
+
+
+def test_probe_error_reports_none(tmp_path, clock, make_watcher, monkeypatch):
+    def broken(path):
+        raise RuntimeError('broken')
+    monkeypatch.setattr(lada_gui, 'probe_video_info', broken)
+    (tmp_path / 'a.mp4').write_bytes(b'x')
+    watcher, ready = make_watcher()
+    poll(watcher)
+    clock.now += lada_gui.HOTFOLDER_STABLE_SECONDS
+    poll(watcher)
+    assert ready == [(str(tmp_path / 'a.mp4'), None)]
@@ -0,0 +1,97 @@
+"""モザイク領域検出（タイル判定、サンプルフレームの選び方、矩形の丸めと余白）のテスト"""
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('tkinterdnd2')
+
+import lada_gui  # noqa: E402
+
+
+def mosaic_image(size=256, box=(64, 64, 128, 128), block=8, seed=0):
+    """ノイズの背景に、block画素の平坦なブロックを並べたモザイクを置いた画像"""
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 256, (size, size), dtype=np.uint8)
+    x, y, w, h = box
+    blocks = rng.integers(0, 256, (h // block, w // block), dtype=np.uint8)
+    image[y:y + h, x:x + w] = np.kron(blocks, np.ones((block, block), dtype=np.uint8))
+    return image
+
+
+class TestMosaicTileMask:
+    @pytest.fixture(autouse=True)
+    def need_cv2(self):
+        pytest.importorskip('cv2')
+
+    def test_detects_block_mosaic(self):
+        mask = lada_gui.mosaic_tile_mask(mosaic_image())
+        tile = lada_gui.MOSAIC_TILE
+        inner = slice(64 // tile + 1, 192 // tile - 1)
+        assert mask[inner, inner].all()
+        assert not mask[:64 // tile - 1].any()
+        assert not mask[:, :64 // tile - 1].any()
+        assert not mask[192 // tile + 1:].any()
+        assert not mask[:, 192 // tile + 1:].any()
+
+    def test_flat_image_has_no_mosaic(self):
+        assert not lada_gui.mosaic_tile_mask(np.full((256, 256), 128, dtype=np.uint8)).any()
+
+    def test_noise_has_no_mosaic(self):
+        noise = np.random.default_rng(1).integers(0, 256, (256, 256), dtype=np.uint8)
+        assert not lada_gui.mosaic_tile_mask(noise).any()
+
+    def test_small_image(self):
+        mask = lada_gui.mosaic_tile_mask(np.zeros((8, 8), dtype=np.uint8))
+        assert mask.shape == (1, 1) and not mask.any()
+
+
+class TestMosaicSampleIndices:
+    def test_short_range_uses_minimum(self):
+        samples = lada_gui.mosaic_sample_indices(90, 30.0)
+        assert len(samples) == lada_gui.MOSAIC_MIN_SAMPLES
+        assert samples[0] == 0 and samples[-1] == 89
+
+    def test_scales_with_duration(self):
+        fps = 30.0
+        samples = lada_gui.mosaic_sample_indices(int(600 * fps), fps)
+        assert len(samples) == int(600 / lada_gui.MOSAIC_SAMPLE_SECONDS) + 1
+        gaps = np.diff(samples)
+        assert gaps.max() <= lada_gui.MOSAIC_SAMPLE_SECONDS * fps
+
+    def test_long_range_is_capped(self):
+        samples = lada_gui.mosaic_sample_indices(int(4 * 3600 * 30), 30.0)
+        assert len(samples) == lada_gui.MOSAIC_MAX_SAMPLES
+        assert samples[-1] == 4 * 3600 * 30 - 1
+
+    def test_unknown_fps_and_tiny_ranges(self):
+        assert len(lada_gui.mosaic_sample_indices(3000, 0)) == int(100 / lada_gui.MOSAIC_SAMPLE_SECONDS) + 1
+        assert lada_gui.mosaic_sample_indices(5, 30.0) == [0, 1, 2, 3, 4]
+        assert lada_gui.mosaic_sample_indices(0, 30.0) == []
+
+
+class TestMosaicRoiRect:
+    def union(self, rows, cols, shape=(34, 60)):
+        union = np.zeros(shape, dtype=bool)
+        union[rows, cols] = True
+        return union
+
+    def test_empty_union(self):
+        assert lada_gui.mosaic_roi_rect(np.zeros((34, 60), dtype=bool), 0.5, 1920, 1080) is None
+
+    def test_padding_and_alignment(self):
+        # 解析画像（0.5倍）のタイル 行10-13・列30-39 = 元画像の x 960-1280, y 320-448
+        x, y, w, h = lada_gui.mosaic_roi_rect(self.union(slice(10, 14), slice(30, 40)), 0.5, 1920, 1080)
+        padding = int(0.04 * 1920)
+        assert (x, y, w, h) == (880, 240, 480, 288)
+        assert x % 16 == 0 and y % 16 == 0 and w % 16 == 0 and h % 16 == 0
+        assert x <= 960 - padding and y <= 320 - padding
+        assert x + w >= 1280 + padding and y + h >= 448 + padding
+
+    def test_clamped_to_frame_with_even_size(self):
+        # 右下の端に接する領域は画面内に収め、幅と高さは偶数にする
+        x, y, w, h = lada_gui.mosaic_roi_rect(self.union(slice(30, 34), slice(55, 60)), 1.0, 950, 540)
+        assert x + w <= 950 and y + h <= 540
+        assert w % 2 == 0 and h % 2 == 0
+        assert x + w >= 950 - 1 and y + h >= 540 - 1
+
+    def test_too_large_area(self):
+        assert lada_gui.mosaic_roi_rect(np.ones((34, 60), dtype=bool), 1.0, 960, 540) is None
@@ -0,0 +1,86 @@
+"""処理設定の署名と結果キャッシュのキーのテスト"""
+import pytest
+
+pytest.importorskip('tkinterdnd2')
+
+import lada_gui  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = lada_gui.MosaicRemoverApp.__new__(lada_gui.MosaicRemoverApp)
+    app.ps_script_path = str(tmp_path / 'launcher.ps1')
+    with open(app.ps_script_path, 'w', encoding='utf-8') as f:
+        f.write('# launcher v1\n')
+    return app
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'source.mp4'
+    path.write_bytes(bytes(range(256)) * 1024)
+    return str(path)
+
+
+class TestSettingsSignature:
+    def test_defaults(self, app):
+        signature = app.settings_signature(app.get_entry_settings({}))
+        assert signature == {'model': '1', 'tvai': '2', 'quality': 15, 'crf_value': 19,
+                             'ffmpeg_option': 're_encode', 'vr_processing': False}
+
+    def test_save_trimmed_is_ignored(self, app):
+        assert (app.settings_signature(app.get_entry_settings({'save_trimmed': True}))
+                == app.settings_signature(app.get_entry_settings({})))
+
+    def test_vr_options_only_with_vr(self, app):
+        off = app.settings_signature(app.get_entry_settings({'vr_per_eye': True, 'vr_projection': 'fisheye'}))
+        assert 'vr_per_eye' not in off and 'vr_projection' not in off and 'vr_simple_mode' not in off
+        on = app.settings_signature(app.get_entry_settings(
+            {'vr_processing': True, 'vr_per_eye': True, 'vr_projection': 'fisheye'}))
+        assert on['vr_per_eye'] is True and on['vr_projection'] == 'fisheye'
+
+    def test_default_vr_options_are_dropped(self, app):
+        # 古いキューファイル（項目なし）と既定値を明示した項目を同じジョブとみなす
+        explicit = app.get_entry_settings({'vr_processing': True, 'vr_per_eye': False, 'vr_projection': 'crop'})
+        implicit = app.get_entry_settings({'vr_processing': True})
+        assert app.settings_signature(explicit) == app.settings_signature(implicit)
+
+    def test_crf_only_when_encoding(self, app):
+        assert 'crf_value' in app.settings_signature(app.get_entry_settings({'ffmpeg_option': 'auto'}))
+        copy = app.settings_signature(app.get_entry_settings({'ffmpeg_option': 'copy', 'crf_value': 30}))
+        assert 'crf_value' not in copy
+
+    def test_roi_crop(self, app):
+        assert 'roi_crop' not in app.settings_signature(app.get_entry_settings({'roi_crop': False}))
+        assert app.settings_signature(app.get_entry_settings({'roi_crop': True}))['roi_crop'] is True
+
+
+class TestResultCacheKey:
+    def key(self, app, source, start='00:00:00', end='00:01:00', **entry):
+        return app.build_result_cache_key(source, start, end, app.get_entry_settings(entry))
+
+    def test_stable(self, app, source):
+        assert self.key(app, source) == self.key(app, source)
+        assert self.key(app, source) == self.key(app, source, save_trimmed=True)
+
+    def test_range_and_settings_change_key(self, app, source):
+        base = self.key(app, source)
+        assert self.key(app, source, end='00:02:00') != base
+        assert self.key(app, source, quality=20) != base
+        assert self.key(app, source, roi_crop=True) != base
+
+    def test_source_change(self, app, source):
+        base = self.key(app, source)
+        with open(source, 'r+b') as f:
+            f.seek(128 * 1024)
+            f.write(b'\xff' * 16)
+        assert self.key(app, source) != base
+
+    def test_launcher_change(self, app, source):
+        base = self.key(app, source)
+        with open(app.ps_script_path, 'w', encoding='utf-8') as f:
+            f.write('# launcher v2\n')
+        assert self.key(app, source) != base
+
+    def test_missing_source(self, app, tmp_path):
+        assert self.key(app, str(tmp_path / 'missing.mp4')) is None
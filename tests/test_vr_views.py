@@ -0,0 +1,62 @@
+"""VR映像のビュー（向きと視野角）の算出のテスト"""
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('tkinterdnd2')
+
+import lada_gui  # noqa: E402
+
+WIDTH, HEIGHT = 3840, 1920  # 左右の目がそれぞれ 1920x1920 のSBS
+
+
+@pytest.fixture
+def app():
+    return lada_gui.MosaicRemoverApp.__new__(lada_gui.MosaicRemoverApp)
+
+
+def test_no_roi(app):
+    assert app.vr_views(WIDTH, HEIGHT) is None
+    assert app.vr_views(WIDTH, HEIGHT, None, 'fisheye') is None
+
+
+def test_small_roi_in_one_eye(app):
+    views = app.vr_views(WIDTH, HEIGHT, (860, 860, 200, 200))
+    assert len(views) == 1
+    view = views[0]
+    assert view['eye'] == 'left' and view['offset'] == 0
+    assert view['yaw'] == pytest.approx(0, abs=0.5)
+    assert view['pitch'] == pytest.approx(0, abs=0.5)
+    # 200画素 = 180度 * 200 / 1920 を覆い、余白を加えても上限よりずっと狭い
+    span = 180 * 200 / 1920
+    assert all(span < fov < lada_gui.VR_MAX_VIEW_FOV for fov in view['fov'])
+
+
+def test_roi_across_both_eyes(app):
+    views = app.vr_views(WIDTH, HEIGHT, (1800, 800, 400, 200))
+    assert [(v['eye'], v['offset']) for v in views] == [('left', 0), ('right', 1920)]
+    # 左目は右端、右目は左端を向く
+    assert views[0]['yaw'] > 0 > views[1]['yaw']
+
+
+def test_narrow_overlap_is_skipped(app):
+    views = app.vr_views(WIDTH, HEIGHT, (1910, 800, 200, 200))
+    assert [v['eye'] for v in views] == ['right']
+
+
+def test_fov_grows_with_roi(app):
+    small = app.vr_views(WIDTH, HEIGHT, (860, 860, 200, 200))[0]['fov']
+    large = app.vr_views(WIDTH, HEIGHT, (560, 560, 800, 800))[0]['fov']
+    assert large[0] > small[0] and large[1] > small[1]
+
+
+def test_too_wide_fov(app):
+    # 各目のほぼ全体は透視投影1枚で覆えないので中央切り出しにする
+    assert app.vr_views(WIDTH, HEIGHT, (200, 200, 1500, 1500)) is None
+
+
+def test_fisheye_outside_circle(app):
+    # 魚眼の円の外（四隅）を中心とするビューは作れない
+    assert app.vr_views(WIDTH, HEIGHT, (0, 0, 64, 64), 'fisheye') is None
+    views = app.vr_views(WIDTH, HEIGHT, (860, 860, 200, 200), 'fisheye')
+    assert views[0]['projection'] == 'fisheye'
+    assert max(views[0]['fov']) < lada_gui.VR_MAX_VIEW_FOV